@@ -1,10 +1,11 @@
 import discord
 from discord.ext import commands, tasks
 from mcstatus import JavaServer
-from mcrcon import MCRcon
 from selenium.webdriver.firefox.options import Options
 from selenium.webdriver.firefox.service import Service
 from selenium import webdriver
+from selenium.webdriver.support.ui import WebDriverWait
+from selenium.common.exceptions import TimeoutException
 import os
 import asyncio
 from discord.ui import View, Button
@@ -13,11 +14,22 @@ import re
 from discord.ui import View, Button, Modal, TextInput
 from functools import partial
 from discord.ext.commands import Context
+from discord.ext.commands.view import StringView
 from datetime import datetime
 import aiofiles
 from pathlib import Path
 from pathlib import Path
 import subprocess
+import itertools
+import struct
+import io
+import copy
+import math
+import threading
+from collections import OrderedDict, deque
+import aiohttp
+from PIL import Image, ImageDraw
+from array import array
 
 intents = discord.Intents.default()
 intents.message_content = True  # Enables command recognition
@@ -34,18 +46,1324 @@ CHAT_CHANNEL_ID = 1382447521531433150  # Channel for chat messages (can be same
 
 RCON_HOST = "140.238.156.90"
 RCON_PORT = 25575
+RCON_POOL_SIZE = 3        # Persistent authenticated sockets kept open
+RCON_TIMEOUT = 10         # Seconds to wait for a single command response
 user_cooldowns = {}
 
+# --- Async RCON client ---
+# One pool of persistent, authenticated connections shared by every command.
+# Each connection multiplexes requests by packet id, so several commands can be
+# in flight on the same socket without paying a TCP handshake + auth each time.
+
+RCON_TYPE_RESPONSE = 0
+RCON_TYPE_COMMAND = 2
+RCON_TYPE_AUTH = 3
+
+class RconError(Exception):
+    """Raised when the RCON server can't be reached or rejects a request"""
+
+class RconTimeout(RconError):
+    """A single command got no reply in time; the connection may still be fine"""
+
+class RconConnection:
+    """A single authenticated RCON socket with a background packet reader"""
+    def __init__(self, host, port, password, timeout=RCON_TIMEOUT):
+        self.host = host
+        self.port = port
+        self.password = password
+        self.timeout = timeout
+        self.reader = None
+        self.writer = None
+        self.read_task = None
+        self.write_lock = asyncio.Lock()
+        self.request_ids = itertools.count(1)
+        self.pending = {}    # command id -> (future, fragments)
+        self.sentinels = {}  # sentinel id -> command id
+
+    @property
+    def connected(self):
+        return self.writer is not None and not self.writer.is_closing()
+
+    @property
+    def in_flight(self):
+        return len(self.pending)
+
+    @staticmethod
+    def encode_packet(request_id, packet_type, body):
+        payload = struct.pack("<ii", request_id, packet_type) + body.encode("utf-8") + b"\x00\x00"
+        return struct.pack("<i", len(payload)) + payload
+
+    async def read_packet(self):
+        header = await self.reader.readexactly(4)
+        (length,) = struct.unpack("<i", header)
+        payload = await self.reader.readexactly(length)
+        request_id, packet_type = struct.unpack("<ii", payload[:8])
+        body = payload[8:-2].decode("utf-8", errors="replace")
+        return request_id, packet_type, body
+
+    async def connect(self):
+        self.reader, self.writer = await asyncio.wait_for(
+            asyncio.open_connection(self.host, self.port), self.timeout
+        )
+        try:
+            auth_id = next(self.request_ids)
+            self.writer.write(self.encode_packet(auth_id, RCON_TYPE_AUTH, self.password))
+            await self.writer.drain()
+
+            # Wait for the auth response (type 2); an id of -1 means bad password
+            while True:
+                request_id, packet_type, _ = await asyncio.wait_for(self.read_packet(), self.timeout)
+                if packet_type == RCON_TYPE_COMMAND:
+                    break
+            if request_id == -1:
+                raise RconError("RCON authentication failed")
+        except BaseException:
+            await self.close()
+            raise
+
+        self.read_task = asyncio.create_task(self.read_loop())
+
+    async def read_loop(self):
+        try:
+            while True:
+                request_id, _, body = await self.read_packet()
+
+                if request_id in self.pending:
+                    # Long responses are split over several packets
+                    self.pending[request_id][1].append(body)
+                elif request_id in self.sentinels:
+                    # The server answers in order, so the sentinel reply marks
+                    # the end of the command response sent just before it
+                    command_id = self.sentinels.pop(request_id)
+                    entry = self.pending.pop(command_id, None)
+                    if entry and not entry[0].done():
+                        entry[0].set_result("".join(entry[1]))
+                # Anything else is a late reply to a request that timed out
+        except asyncio.CancelledError:
+            raise
+        except Exception as e:
+            self.fail_pending(RconError(f"RCON connection lost: {e}"))
+            await self.close()
+
+    def fail_pending(self, error):
+        for future, _ in self.pending.values():
+            if not future.done():
+                future.set_exception(error)
+        self.pending.clear()
+        self.sentinels.clear()
+
+    async def command(self, cmd):
+        if not self.connected:
+            raise RconError("RCON connection is closed")
+
+        command_id = next(self.request_ids)
+        sentinel_id = next(self.request_ids)
+        future = asyncio.get_running_loop().create_future()
+        self.pending[command_id] = (future, [])
+        self.sentinels[sentinel_id] = command_id
+
+        try:
+            async with self.write_lock:
+                # The reader may have dropped the socket while we waited for the lock
+                if not self.connected:
+                    raise RconError("RCON connection is closed")
+                try:
+                    self.writer.write(
+                        self.encode_packet(command_id, RCON_TYPE_COMMAND, cmd)
+                        + self.encode_packet(sentinel_id, RCON_TYPE_RESPONSE, "")
+                    )
+                    await self.writer.drain()
+                except OSError as e:  # ConnectionError included
+                    raise RconError(f"RCON connection lost: {e}")
+            return await asyncio.wait_for(future, self.timeout)
+        except asyncio.TimeoutError:
+            raise RconTimeout(f"RCON command timed out after {self.timeout}s")
+        finally:
+            self.pending.pop(command_id, None)
+            self.sentinels.pop(sentinel_id, None)
+
+    async def close(self):
+        if self.read_task and self.read_task is not asyncio.current_task():
+            self.read_task.cancel()
+        self.read_task = None
+        if self.writer is not None:
+            self.writer.close()
+            try:
+                await self.writer.wait_closed()
+            except Exception:
+                pass
+        self.reader = None
+        self.writer = None
+        self.fail_pending(RconError("RCON connection closed"))
+
+class RconPool:
+    """Small pool of persistent RCON connections with reconnect backoff"""
+    def __init__(self, host, port, password, size=RCON_POOL_SIZE, timeout=RCON_TIMEOUT,
+                 backoff_base=1.0, backoff_max=60.0):
+        self.connections = [RconConnection(host, port, password, timeout) for _ in range(size)]
+        self.connect_locks = [asyncio.Lock() for _ in range(size)]
+        self.failures = [0] * size
+        self.waiting = [0] * size
+        self.retry_at = [0.0] * size
+        self.backing_off = [False] * size  # Someone is already waiting out this slot's backoff
+        self.backoff_base = backoff_base
+        self.backoff_max = backoff_max
+        self.results = {}   # command -> (fetched_at, response) for cached_command
+        self.inflight = {}  # command -> task, so identical cached queries share one round-trip
+
+    def load(self, slot):
+        return self.connections[slot].in_flight + self.waiting[slot]
+
+    def pick_slot(self):
+        # Spread requests over live sockets and slots whose backoff has expired,
+        # least busy first; only fall back to a slot still in backoff
+        now = time.monotonic()
+        usable = [i for i, conn in enumerate(self.connections)
+                  if conn.connected or self.retry_at[i] <= now]
+        if usable:
+            return min(usable, key=lambda i: (self.load(i), not self.connections[i].connected))
+        return min(range(len(self.connections)), key=lambda i: self.retry_at[i])
+
+    async def ensure_connected(self, slot):
+        conn = self.connections[slot]
+        if conn.connected:
+            return conn
+
+        # One caller waits out the backoff, without holding the connect lock;
+        # anyone else asking for the slot meanwhile fails straight away
+        wait = self.retry_at[slot] - time.monotonic()
+        if wait > 0:
+            if self.backing_off[slot]:
+                raise RconError(f"RCON is reconnecting, try again in {wait:.0f}s")
+            self.backing_off[slot] = True
+            try:
+                await asyncio.sleep(wait)
+            finally:
+                self.backing_off[slot] = False
+
+        async with self.connect_locks[slot]:
+            if conn.connected:
+                return conn
+            # The attempt we queued behind failed; don't hammer the server again
+            wait = self.retry_at[slot] - time.monotonic()
+            if wait > 0:
+                raise RconError(f"RCON is reconnecting, try again in {wait:.0f}s")
+
+            try:
+                await conn.connect()
+            except RconError:
+                self.mark_failed(slot)
+                raise
+            except Exception as e:
+                self.mark_failed(slot)
+                raise RconError(f"Could not connect to RCON at {conn.host}:{conn.port}: {e}")
+
+            self.failures[slot] = 0
+            self.retry_at[slot] = 0.0
+            return conn
+
+    def mark_failed(self, slot):
+        self.failures[slot] += 1
+        delay = min(self.backoff_base * 2 ** (self.failures[slot] - 1), self.backoff_max)
+        self.retry_at[slot] = time.monotonic() + delay
+
+    async def command(self, cmd):
+        """Run an RCON command on a pooled connection and return the response text"""
+        slot = self.pick_slot()
+        self.waiting[slot] += 1
+        try:
+            conn = await self.ensure_connected(slot)
+        finally:
+            self.waiting[slot] -= 1
+        try:
+            return await conn.command(cmd)
+        except RconTimeout:
+            # Only this command is lost; other requests on the socket carry on
+            if not conn.connected:
+                self.mark_failed(slot)
+            raise
+        except RconError:
+            # Drop the socket; the next request on this slot reconnects
+            await conn.close()
+            self.mark_failed(slot)
+            raise
+
+    async def cached_command(self, cmd, ttl):
+        """Like command(), but reuses a successful response for ttl seconds.
+        Only meant for read-only queries whose output rarely changes."""
+        cached = self.results.get(cmd)
+        if cached and time.monotonic() - cached[0] <= ttl:
+            return cached[1]
+
+        task = self.inflight.get(cmd)
+        if task is None or task.done():
+            task = asyncio.create_task(self.command(cmd))
+            self.inflight[cmd] = task
+        try:
+            response = await asyncio.shield(task)
+        finally:
+            if task.done() and self.inflight.get(cmd) is task:
+                del self.inflight[cmd]
+        self.results[cmd] = (time.monotonic(), response)
+        return response
+
+    async def close(self):
+        for conn in self.connections:
+            await conn.close()
+
+# Seconds a read-only RCON query's result is reused by cached_command
+RCON_RESULT_TTL = {
+    "seed": 3600,
+    "plugins": 300,
+    "mv list": 60,
+}
+
+rcon = RconPool(RCON_HOST, RCON_PORT, RCON_PASSWORD)
+# Cogs reach the server through the bot rather than importing this module
+bot.rcon = rcon
+
+# --- Cached server status ---
+# status/players/check_server_status all read from one in-memory snapshot that a
+# background loop keeps fresh. Concurrent refreshes share a single probe.
+
+STATUS_POLL_INTERVAL = 30  # Seconds between background status probes
+STATUS_STALE_AFTER = 60    # Snapshots older than this trigger a fresh probe
+STATUS_TIMEOUT = 5         # Seconds before a probe counts as unreachable
+
+class StatusSnapshot:
+    """Result of one status probe: either a status response or the error it raised"""
+    def __init__(self, status=None, error=None, fetched_at=None):
+        self.status = status
+        self.error = error
+        self.fetched_at = fetched_at if fetched_at is not None else time.time()
+
+    @property
+    def online(self):
+        return self.status is not None
+
+    @property
+    def age(self):
+        return time.time() - self.fetched_at
+
+class ServerStatusService:
+    """Polls mcstatus asynchronously and serves the last snapshot from memory"""
+    def __init__(self, address, stale_after=STATUS_STALE_AFTER, timeout=STATUS_TIMEOUT):
+        self.address = address
+        self.stale_after = stale_after
+        self.timeout = timeout
+        self.server = None
+        self.snapshot = None
+        self.inflight = None
+
+    async def probe(self):
+        try:
+            if self.server is None:
+                self.server = await JavaServer.async_lookup(self.address, timeout=self.timeout)
+            status = await self.server.async_status()
+            self.snapshot = StatusSnapshot(status=status)
+        except Exception as e:
+            self.snapshot = StatusSnapshot(error=e)
+        return self.snapshot
+
+    async def refresh(self):
+        """Probe the server now, joining a probe that is already in flight"""
+        if self.inflight is None or self.inflight.done():
+            self.inflight = asyncio.create_task(self.probe())
+        # Shield so one caller giving up doesn't cancel the probe for everyone else
+        return await asyncio.shield(self.inflight)
+
+    async def get(self, max_age=None):
+        """Return the cached snapshot, refreshing it only if it is stale"""
+        max_age = self.stale_after if max_age is None else max_age
+        if self.snapshot is not None and self.snapshot.age <= max_age:
+            return self.snapshot
+        return await self.refresh()
+
+status_service = ServerStatusService(f"{SERVER_IP}:{SERVER_PORT}")
+
+@tasks.loop(seconds=STATUS_POLL_INTERVAL)
+async def poll_server_status():
+    await status_service.refresh()
+
+# --- Dynmap snapshots ---
+# Browsers stay warm between clicks and run in worker threads so the event loop
+# never blocks on Selenium. Clicks that land while a render is fresh share it.
+
+DYNMAP_URL = "http://140.238.156.90:8123"
+GECKODRIVER_PATH = '/usr/local/bin/geckodriver'
+DYNMAP_BROWSER_POOL_SIZE = 1   # Warm Firefox instances kept running
+DYNMAP_RENDER_TIMEOUT = 15     # Max seconds to wait for map tiles to finish loading
+DYNMAP_SNAPSHOT_MAX_AGE = 30   # Renders younger than this are reused
+
+# Leaflet marks each tile with leaflet-tile-loaded once its image has arrived
+DYNMAP_TILES_READY_JS = """
+const tiles = document.querySelectorAll('.leaflet-tile');
+return document.readyState === 'complete' && tiles.length > 0 &&
+    document.querySelectorAll('.leaflet-tile:not(.leaflet-tile-loaded)').length === 0;
+"""
+
+class DynmapSnapshotter:
+    """Pool of warm headless browsers that render Dynmap screenshots off the event loop"""
+    def __init__(self, url, pool_size=DYNMAP_BROWSER_POOL_SIZE, max_age=DYNMAP_SNAPSHOT_MAX_AGE,
+                 render_timeout=DYNMAP_RENDER_TIMEOUT):
+        self.url = url
+        self.max_age = max_age
+        self.render_timeout = render_timeout
+        # None marks a slot whose browser hasn't been started (or had to be discarded)
+        self.drivers = asyncio.Queue()
+        for _ in range(pool_size):
+            self.drivers.put_nowait(None)
+        self.last_png = None
+        self.last_rendered_at = 0.0
+        self.inflight = None
+
+    def start_driver(self):
+        options = Options()
+        options.add_argument("--headless")
+        options.add_argument("--width=1280")
+        options.add_argument("--height=720")
+        service = Service(GECKODRIVER_PATH)
+
+        driver = webdriver.Firefox(service=service, options=options)
+        try:
+            driver.set_window_size(1280, 720)
+            driver.get(self.url)
+        except Exception:
+            # Firefox is already running; don't leave it behind
+            self.quit_driver(driver)
+            raise
+        return driver
+
+    def render_blocking(self, driver):
+        """Runs in a worker thread; returns the (possibly new) driver and PNG bytes"""
+        fresh = driver is None
+        try:
+            if fresh:
+                driver = self.start_driver()
+            else:
+                driver.refresh()
+
+            try:
+                WebDriverWait(driver, self.render_timeout, poll_frequency=0.25).until(
+                    lambda d: d.execute_script(DYNMAP_TILES_READY_JS)
+                )
+            except TimeoutException:
+                pass  # Some tiles never load (e.g. unexplored chunks); capture what we have
+
+            return driver, driver.get_screenshot_as_png()
+        except Exception:
+            if driver is not None:
+                self.quit_driver(driver)
+            raise
+
+    @staticmethod
+    def quit_driver(driver):
+        try:
+            driver.quit()
+        except Exception:
+            pass
+
+    async def render(self):
+        driver = await self.drivers.get()
+        try:
+            driver, png = await asyncio.to_thread(self.render_blocking, driver)
+        except Exception:
+            driver = None  # render_blocking already quit it
+            raise
+        finally:
+            self.drivers.put_nowait(driver)
+
+        self.last_png = png
+        self.last_rendered_at = time.time()
+        return png
+
+    async def snapshot(self):
+        """Return PNG bytes of the map, reusing a recent or in-flight render"""
+        if self.last_png and time.time() - self.last_rendered_at <= self.max_age:
+            return self.last_png
+        if self.inflight is None or self.inflight.done():
+            self.inflight = asyncio.create_task(self.render())
+        return await asyncio.shield(self.inflight)
+
+    async def close(self):
+        while not self.drivers.empty():
+            driver = self.drivers.get_nowait()
+            if driver is not None:
+                await asyncio.to_thread(self.quit_driver, driver)
+
+dynmap_snapshotter = DynmapSnapshotter(DYNMAP_URL)
+
+# --- Dynmap tile compositor ---
+# Builds a snapshot straight from Dynmap's tiles instead of rendering the web UI.
+# Tiles are read from the plugin's tile folder when it's on this machine and from
+# the Dynmap web server otherwise, and decoded tiles are cached by path + mtime.
+
+DYNMAP_SNAPSHOT_ENGINE = "tiles"  # "tiles" (compositor) or "browser" (Firefox screenshot)
+DYNMAP_TILES_PATH = "/mnt/minecraft-data/minecraft/plugins/dynmap/web/tiles"
+DYNMAP_TILES_URL = f"{DYNMAP_URL}/tiles"
+DYNMAP_DEFAULT_WORLD = "world"
+DYNMAP_DEFAULT_MAP = "flat"
+DYNMAP_DEFAULT_ZOOM = 2          # 0 is the most detailed level
+DYNMAP_TILE_FORMAT = "png"       # Matches image-format in Dynmap's configuration.txt
+DYNMAP_TILE_SIZE = 128           # Pixels per tile
+DYNMAP_BLOCKS_PER_TILE = 32      # Blocks covered by one zoom-0 tile (flat map, 4 px/block)
+DYNMAP_SNAPSHOT_COLUMNS = 7
+DYNMAP_SNAPSHOT_ROWS = 5
+DYNMAP_TILE_CACHE_SIZE = 1024    # Decoded tiles kept in memory
+DYNMAP_BACKGROUND = (17, 17, 17, 255)
+
+class DynmapTileCache:
+    """LRU of decoded tiles, each stored with the version (mtime / Last-Modified) it was read at"""
+    def __init__(self, max_tiles=DYNMAP_TILE_CACHE_SIZE):
+        self.max_tiles = max_tiles
+        self.tiles = OrderedDict()
+        self.lock = threading.Lock()  # Disk tiles are loaded from worker threads
+
+    def get(self, key, version=None):
+        with self.lock:
+            entry = self.tiles.get(key)
+            if entry is None or (version is not None and entry[0] != version):
+                return None
+            self.tiles.move_to_end(key)
+            return entry
+
+    def put(self, key, version, image):
+        with self.lock:
+            self.tiles[key] = (version, image)
+            self.tiles.move_to_end(key)
+            while len(self.tiles) > self.max_tiles:
+                self.tiles.popitem(last=False)
+
+class DynmapTileCompositor:
+    """Stitches Dynmap tiles around a block position into a single PNG"""
+    def __init__(self, tiles_path=DYNMAP_TILES_PATH, tiles_url=DYNMAP_TILES_URL):
+        self.tiles_path = Path(tiles_path)
+        self.tiles_url = tiles_url
+        self.cache = DynmapTileCache()
+        self.session = None
+
+    @staticmethod
+    def tile_name(tx, ty, zoom):
+        # Same layout as Dynmap's hdmap.js: tiles are grouped 32x32 per folder
+        # and zoomed-out tiles carry one "z" per zoom level as a prefix
+        prefix = "z" * zoom + "_" if zoom else ""
+        return f"{tx >> 5}_{ty >> 5}/{prefix}{tx}_{ty}.{DYNMAP_TILE_FORMAT}"
+
+    @staticmethod
+    def tile_grid(x, z, zoom, columns=DYNMAP_SNAPSHOT_COLUMNS, rows=DYNMAP_SNAPSHOT_ROWS):
+        """Tile coordinates (column, row, tx, ty) centred on block x/z"""
+        step = 1 << zoom
+        span = DYNMAP_BLOCKS_PER_TILE * step
+        # Map tile y runs opposite to world z, so north (-z) has the larger ty
+        center_tx = math.floor(x / span) * step
+        center_ty = math.floor(-z / span) * step
+        grid = []
+        for row in range(rows):
+            for column in range(columns):
+                tx = center_tx + (column - columns // 2) * step
+                ty = center_ty - (row - rows // 2) * step
+                grid.append((column, row, tx, ty))
+        return grid
+
+    def load_disk_tile(self, world, map_name, name):
+        path = self.tiles_path / world / map_name / name
+        try:
+            mtime = path.stat().st_mtime_ns
+        except FileNotFoundError:
+            return None
+
+        cached = self.cache.get(str(path), mtime)
+        if cached:
+            return cached[1]
+
+        with Image.open(path) as tile:
+            image = tile.convert("RGBA")
+        self.cache.put(str(path), mtime, image)
+        return image
+
+    async def load_http_tile(self, world, map_name, name):
+        url = f"{self.tiles_url}/{world}/{map_name}/{name}"
+        if self.session is None or self.session.closed:
+            self.session = aiohttp.ClientSession(timeout=aiohttp.ClientTimeout(total=10))
+
+        cached = self.cache.get(url)
+        headers = {"If-Modified-Since": cached[0]} if cached and cached[0] else {}
+        async with self.session.get(url, headers=headers) as response:
+            if response.status == 304 and cached:
+                return cached[1]
+            if response.status != 200:
+                return None
+            data = await response.read()
+            last_modified = response.headers.get("Last-Modified")
+
+        with Image.open(io.BytesIO(data)) as tile:
+            image = tile.convert("RGBA")
+        self.cache.put(url, last_modified, image)
+        return image
+
+    def compose(self, grid, tiles, columns, rows):
+        canvas = Image.new("RGBA", (columns * DYNMAP_TILE_SIZE, rows * DYNMAP_TILE_SIZE), DYNMAP_BACKGROUND)
+        for (column, row, _, _), tile in zip(grid, tiles):
+            if tile is not None:
+                if tile.size != (DYNMAP_TILE_SIZE, DYNMAP_TILE_SIZE):
+                    tile = tile.resize((DYNMAP_TILE_SIZE, DYNMAP_TILE_SIZE))
+                canvas.paste(tile, (column * DYNMAP_TILE_SIZE, row * DYNMAP_TILE_SIZE), tile)
+        buffer = io.BytesIO()
+        canvas.save(buffer, format="PNG")
+        return buffer.getvalue()
+
+    def load_disk_tiles(self, world, map_name, zoom, grid):
+        return [self.load_disk_tile(world, map_name, self.tile_name(tx, ty, zoom))
+                for _, _, tx, ty in grid]
+
+    async def snapshot(self, world=DYNMAP_DEFAULT_WORLD, x=0, z=0, zoom=DYNMAP_DEFAULT_ZOOM,
+                       map_name=DYNMAP_DEFAULT_MAP, columns=DYNMAP_SNAPSHOT_COLUMNS, rows=DYNMAP_SNAPSHOT_ROWS):
+        """Return PNG bytes of the map around block x/z"""
+        grid = self.tile_grid(x, z, zoom, columns, rows)
+
+        if (self.tiles_path / world / map_name).is_dir():
+            tiles = await asyncio.to_thread(self.load_disk_tiles, world, map_name, zoom, grid)
+        else:
+            tiles = await asyncio.gather(
+                *(self.load_http_tile(world, map_name, self.tile_name(tx, ty, zoom)) for _, _, tx, ty in grid),
+                return_exceptions=True
+            )
+            tiles = [None if isinstance(tile, Exception) else tile for tile in tiles]
+        if all(tile is None for tile in tiles):
+            raise RuntimeError(f"No Dynmap tiles found for {world}/{map_name} around ({x}, {z})")
+        return await asyncio.to_thread(self.compose, grid, tiles, columns, rows)
+
+    async def close(self):
+        if self.session is not None:
+            await self.session.close()
+
+dynmap_compositor = DynmapTileCompositor()
+
+async def take_dynmap_snapshot():
+    """PNG for the snapshot button, preferring the tile compositor over a browser render"""
+    if DYNMAP_SNAPSHOT_ENGINE == "tiles":
+        try:
+            return await dynmap_compositor.snapshot()
+        except Exception as e:
+            print(f"⚠️ Tile compositor failed, falling back to browser: {e}")
+    return await dynmap_snapshotter.snapshot()
+
+# --- Minecraft log follower / chat bridge ---
+# Follows latest.log from its current end, only reading bytes appended since the
+# last poll, and relays chat, joins, leaves and deaths to CHAT_CHANNEL_ID in
+# batched messages rather than one API call per line.
+
+LOG_POLL_INTERVAL = 0.5       # Seconds between checks for new log data
+LOG_FLUSH_INTERVAL_MS = 2000  # Max time a relayed line waits before being sent
+LOG_FLUSH_MAX_LINES = 20      # Send immediately once this many lines are queued
+DISCORD_MESSAGE_LIMIT = 2000
+
+LOG_PREFIX = r"^\[[\d:]+\] \[[^\]]+/INFO\]: "
+LOG_CHAT_RE = re.compile(LOG_PREFIX + r"(?:\[Not Secure\] )?<(?P<player>[\w.]+)> (?P<message>.*)$")
+LOG_JOIN_RE = re.compile(LOG_PREFIX + r"(?P<player>[\w.]+) joined the game$")
+LOG_LEAVE_RE = re.compile(LOG_PREFIX + r"(?P<player>[\w.]+) left the game$")
+LOG_DEATH_RE = re.compile(
+    LOG_PREFIX + r"(?P<message>(?P<player>[\w.]+) (?:was (?:slain|shot|killed|blown up|fireballed|pummeled|"
+    r"squashed|impaled|skewered|stung|squished|obliterated|pricked|poked|struck by lightning|roasted)"
+    r"|drowned|died|blew up|burned to death|went up in flames|walked into (?:fire|a cactus|danger zone)"
+    r"|tried to swim in lava|fell |hit the ground too hard|starved to death|suffocated|withered away"
+    r"|froze to death|experienced kinetic energy|discovered the floor was lava|didn't want to live)"
+    r".*)$"
+)
+
+def parse_log_line(line):
+    """Turn a server log line into a Discord-ready string, or None if it isn't relayed"""
+    line = strip_minecraft_colors(line.rstrip("\r\n"))
+
+    match = LOG_CHAT_RE.match(line)
+    if match:
+        player = discord.utils.escape_markdown(match["player"])
+        message = discord.utils.escape_mentions(discord.utils.escape_markdown(match["message"]))
+        return f"💬 **{player}**: {message}"
+
+    match = LOG_JOIN_RE.match(line)
+    if match:
+        return f"➡️ **{discord.utils.escape_markdown(match['player'])}** joined the game"
+
+    match = LOG_LEAVE_RE.match(line)
+    if match:
+        return f"⬅️ **{discord.utils.escape_markdown(match['player'])}** left the game"
+
+    match = LOG_DEATH_RE.match(line)
+    if match:
+        return f"💀 {discord.utils.escape_mentions(discord.utils.escape_markdown(match['message']))}"
+
+    return None
+
+class MinecraftLogTailer:
+    """Incrementally follows the server log and relays parsed events in batches"""
+    def __init__(self, path, channel_id, poll_interval=LOG_POLL_INTERVAL,
+                 flush_interval_ms=LOG_FLUSH_INTERVAL_MS, flush_max_lines=LOG_FLUSH_MAX_LINES):
+        self.path = path
+        self.channel_id = channel_id
+        self.poll_interval = poll_interval
+        self.flush_interval = flush_interval_ms / 1000
+        self.flush_max_lines = flush_max_lines
+        self.file = None
+        self.inode = None
+        self.position = 0
+        self.partial = b""
+        self.pending = []
+        self.first_pending_at = None
+        self.task = None
+
+    def start(self):
+        if self.task is None or self.task.done():
+            self.task = asyncio.create_task(self.run())
+
+    async def stop(self):
+        if self.task:
+            self.task.cancel()
+        await self.close_file()
+
+    async def close_file(self):
+        if self.file is not None:
+            await self.file.close()
+        self.file = None
+
+    async def open_file(self, stat, position):
+        await self.close_file()
+        self.file = await aiofiles.open(self.path, "rb")
+        if position != self.position or stat.st_ino != self.inode:
+            self.partial = b""
+        self.inode = stat.st_ino
+        self.position = position
+        await self.file.seek(position)
+
+    async def read_new_lines(self):
+        """Return complete lines appended since the last call"""
+        try:
+            stat = os.stat(self.path)
+        except FileNotFoundError:
+            return []
+
+        rotated = self.inode is not None and (stat.st_ino != self.inode or stat.st_size < self.position)
+        if rotated:
+            # latest.log was rotated (new inode) or truncated: start the new file from the top
+            await self.open_file(stat, 0)
+        elif self.file is None:
+            # First open starts at the end so old history isn't replayed;
+            # reopening after an error resumes where we left off
+            await self.open_file(stat, stat.st_size if self.inode is None else self.position)
+
+        if stat.st_size == self.position:
+            return []
+
+        data = await self.file.read()
+        self.position += len(data)
+        data = self.partial + data
+        *lines, self.partial = data.split(b"\n")
+        return [line.decode("utf-8", errors="replace") for line in lines]
+
+    def queue(self, text):
+        if not self.pending:
+            self.first_pending_at = time.monotonic()
+        self.pending.append(text)
+
+    def should_flush(self):
+        if not self.pending:
+            return False
+        return (len(self.pending) >= self.flush_max_lines
+                or time.monotonic() - self.first_pending_at >= self.flush_interval)
+
+    async def flush(self, channel):
+        lines, self.pending = self.pending, []
+        chunk = ""
+        for line in lines:
+            line = line[:DISCORD_MESSAGE_LIMIT]
+            if chunk and len(chunk) + len(line) + 1 > DISCORD_MESSAGE_LIMIT:
+                await channel.send(chunk, allowed_mentions=discord.AllowedMentions.none())
+                chunk = ""
+            chunk = f"{chunk}\n{line}" if chunk else line
+        if chunk:
+            await channel.send(chunk, allowed_mentions=discord.AllowedMentions.none())
+
+    async def run(self):
+        await bot.wait_until_ready()
+        while True:
+            try:
+                for line in await self.read_new_lines():
+                    text = parse_log_line(line)
+                    if text:
+                        self.queue(text)
+
+                if self.should_flush():
+                    channel = bot.get_channel(self.channel_id)
+                    if channel:
+                        await self.flush(channel)
+                    else:
+                        self.pending.clear()
+            except asyncio.CancelledError:
+                raise
+            except Exception as e:
+                print(f"❌ Log follower error: {e}")
+                await self.close_file()
+            await asyncio.sleep(self.poll_interval)
+
+log_tailer = MinecraftLogTailer(MINECRAFT_LOG_PATH, CHAT_CHANNEL_ID)
+
+# --- Folder size index ---
+# sizeworld/sizemine/sizemap answer from an in-process index instead of running
+# du. Each directory's listing is cached against its mtime so a rescan only
+# re-reads directories whose entries changed, and top-level folders are
+# scanned concurrently in worker threads.
+
+MINECRAFT_ROOT = "/mnt/minecraft-data/minecraft"
+DYNMAP_PATH = f"{MINECRAFT_ROOT}/plugins/dynmap"
+WORLD_PATHS = {
+    "World": f"{MINECRAFT_ROOT}/world",
+    "Ganatcho": f"{MINECRAFT_ROOT}/Ganatcho",
+    "PixlP": f"{MINECRAFT_ROOT}/PixlP",
+    "Sanctuary": f"{MINECRAFT_ROOT}/Sanctuary",
+    "Mordor": f"{MINECRAFT_ROOT}/Mordor",
+    "Nether": f"{MINECRAFT_ROOT}/world_nether",
+    "The End": f"{MINECRAFT_ROOT}/world_the_end"
+}
+SIZE_INDEX_REFRESH_MINUTES = 15
+# A directory whose mtime hasn't changed has the same entries, so its files
+# aren't re-stat'ed. Dynmap replaces tiles by rename, so there that also means
+# the sizes are unchanged. World region files grow in place without touching
+# the directory mtime, so every SIZE_INDEX_RESTAT_EVERY-th scan re-stats the
+# files everywhere else.
+SIZE_INDEX_TRUSTED_MTIME_PATHS = (DYNMAP_PATH,)
+SIZE_INDEX_RESTAT_EVERY = 4
+
+class DirectoryEntry:
+    __slots__ = ("mtime", "files", "subdirs", "file_bytes", "total")
+
+    def __init__(self, mtime, files, subdirs, file_bytes, total):
+        self.mtime = mtime
+        self.files = files
+        self.subdirs = subdirs
+        self.file_bytes = file_bytes
+        self.total = total
+
+class FolderSizeIndex:
+    """Per-directory size totals for a folder tree, refreshed incrementally"""
+    def __init__(self, root, trusted_paths=SIZE_INDEX_TRUSTED_MTIME_PATHS, restat_every=SIZE_INDEX_RESTAT_EVERY):
+        self.root = root
+        self.trusted_paths = tuple(trusted_paths)
+        self.restat_every = restat_every
+        self.scans = 0
+        self.dirs = {}
+        self.previous_totals = {}
+        self.scanned_at = None
+        self.inflight = None
+
+    def scan_dir(self, path, found, restat=False):
+        """Total bytes under path. Runs in a worker thread: entries go into found,
+        the worker's own dict, and self.dirs is only read."""
+        try:
+            mtime = os.stat(path, follow_symlinks=False).st_mtime_ns
+        except OSError:
+            return 0
+
+        cached = self.dirs.get(path)
+        unchanged = cached is not None and cached.mtime == mtime
+        if unchanged:
+            files, subdirs = cached.files, cached.subdirs
+        else:
+            files, subdirs = [], []
+            try:
+                with os.scandir(path) as entries:
+                    for entry in entries:
+                        if entry.is_dir(follow_symlinks=False):
+                            subdirs.append(entry.name)
+                        elif entry.is_file(follow_symlinks=False):
+                            files.append(entry.name)
+            except OSError:
+                pass
+
+        trusted = not restat or path.startswith(self.trusted_paths)
+        if unchanged and trusted:
+            file_bytes = cached.file_bytes
+        else:
+            file_bytes = 0
+            for name in files:
+                try:
+                    file_bytes += os.stat(os.path.join(path, name), follow_symlinks=False).st_size
+                except OSError:
+                    pass  # Deleted between listing and stat
+
+        total = file_bytes + sum(self.scan_dir(os.path.join(path, name), found, restat) for name in subdirs)
+        found[path] = DirectoryEntry(mtime, files, subdirs, file_bytes, total)
+        return total
+
+    async def scan(self):
+        started = time.monotonic()
+        previous = {path: entry.total for path, entry in self.dirs.items()}
+
+        try:
+            mtime = os.stat(self.root).st_mtime_ns
+            with os.scandir(self.root) as entries:
+                children = [(entry.name, entry.is_dir(follow_symlinks=False)) for entry in entries]
+        except OSError as e:
+            print(f"❌ Size index can't read {self.root}: {e}")
+            return self
+
+        # Each top-level folder (worlds, plugins, logs...) gets its own worker thread
+        subdirs = [name for name, is_dir in children if is_dir]
+        files = [name for name, is_dir in children if not is_dir]
+        found = [{} for _ in subdirs]
+        self.scans += 1
+        restat = self.scans % self.restat_every == 0
+        totals = await asyncio.gather(*(
+            asyncio.to_thread(self.scan_dir, os.path.join(self.root, name), found[i], restat)
+            for i, name in enumerate(subdirs)
+        ))
+        file_bytes = 0
+        for name in files:
+            try:
+                file_bytes += os.stat(os.path.join(self.root, name), follow_symlinks=False).st_size
+            except OSError:
+                pass
+        # Merge the workers' results here on the event loop. Directories removed
+        # since the last scan aren't carried over.
+        dirs = {self.root: DirectoryEntry(mtime, files, subdirs, file_bytes, file_bytes + sum(totals))}
+        for entries in found:
+            dirs.update(entries)
+        self.dirs = dirs
+
+        self.previous_totals = previous
+        self.scanned_at = time.time()
+        print(f"✅ Size index refreshed in {time.monotonic() - started:.1f}s ({len(self.dirs)} folders)")
+        return self
+
+    async def refresh(self):
+        if self.inflight is None or self.inflight.done():
+            self.inflight = asyncio.create_task(self.scan())
+        return await asyncio.shield(self.inflight)
+
+    async def get(self):
+        """Return the index, only scanning if it has never been built"""
+        if self.scanned_at is None:
+            await self.refresh()
+        return self
+
+    def size(self, path):
+        entry = self.dirs.get(path.rstrip("/"))
+        return entry.total if entry else None
+
+    def growth(self, path):
+        path = path.rstrip("/")
+        if path not in self.previous_totals or path not in self.dirs:
+            return None
+        return self.dirs[path].total - self.previous_totals[path]
+
+    def scan_age(self):
+        return time.time() - self.scanned_at if self.scanned_at else 0
+
+def format_bytes(size_bytes):
+    size = float(size_bytes)
+    for unit in ("B", "KB", "MB", "GB"):
+        if abs(size) < 1024:
+            return f"{size:.1f} {unit}" if unit != "B" else f"{int(size)} B"
+        size /= 1024
+    return f"{size:.2f} TB"
+
+def format_growth(delta):
+    """' (+12.0 MB since last scan)' style suffix, or '' when there's nothing to compare"""
+    if not delta:
+        return ""
+    sign = "+" if delta > 0 else "-"
+    return f" ({sign}{format_bytes(abs(delta))} since last scan)"
+
+size_index = FolderSizeIndex(MINECRAFT_ROOT)
+
+@tasks.loop(minutes=SIZE_INDEX_REFRESH_MINUTES)
+async def refresh_size_index():
+    await size_index.refresh()
+
+# --- Performance history ---
+# A background sampler records TPS, MSPT, online players and ping. Samples live
+# in fixed-size in-memory rings and append-only binary files at three
+# resolutions: raw for a day, 1-minute averages for a week and hourly averages
+# for a year. !history charts them without touching the server.
+
+METRICS_DIR = "metrics"
+METRICS_SAMPLE_SECONDS = 30
+METRICS_COMPACT_HOURS = 6  # How often expired records are trimmed from the files
+# (name, bucket seconds, retention seconds)
+METRICS_RESOLUTIONS = (
+    ("raw", 0, 24 * 3600),
+    ("1m", 60, 7 * 24 * 3600),
+    ("1h", 3600, 365 * 24 * 3600),
+)
+METRIC_FIELDS = ("timestamp", "tps", "mspt", "players", "ping")
+METRIC_RECORD = struct.Struct("<d4f")  # 24 bytes per sample on disk
+NAN = float("nan")
+
+TPS_RE = re.compile(r":\s*\*?([\d.]+)")
+MSPT_RE = re.compile(r"([\d.]+)/[\d.]+/[\d.]+")
+
+def parse_tps(response):
+    """1-minute TPS from Paper's `tps` output"""
+    match = TPS_RE.search(strip_minecraft_colors(response))
+    return float(match.group(1)) if match else NAN
+
+def parse_mspt(response):
+    """5-second average MSPT from Paper's `mspt` output"""
+    match = MSPT_RE.search(strip_minecraft_colors(response))
+    return float(match.group(1)) if match else NAN
+
+class MetricRing:
+    """Fixed-capacity ring of samples packed into one flat array of doubles"""
+    def __init__(self, capacity):
+        self.capacity = capacity
+        self.width = len(METRIC_FIELDS)
+        self.data = array("d", [NAN]) * (capacity * self.width)
+        self.start = 0
+        self.count = 0
+
+    def append(self, sample):
+        if self.count < self.capacity:
+            slot = (self.start + self.count) % self.capacity
+            self.count += 1
+        else:
+            # Full: overwrite the oldest sample
+            slot = self.start
+            self.start = (self.start + 1) % self.capacity
+        offset = slot * self.width
+        self.data[offset:offset + self.width] = array("d", sample)
+
+    def samples(self, since=0.0):
+        for i in range(self.count):
+            offset = ((self.start + i) % self.capacity) * self.width
+            if self.data[offset] >= since:
+                yield tuple(self.data[offset:offset + self.width])
+
+    def last(self):
+        if not self.count:
+            return None
+        offset = ((self.start + self.count - 1) % self.capacity) * self.width
+        return tuple(self.data[offset:offset + self.width])
+
+def average_samples(timestamp, samples):
+    """Average each metric over samples, ignoring missing (NaN) readings"""
+    averaged = [timestamp]
+    for column in range(1, len(METRIC_FIELDS)):
+        values = [s[column] for s in samples if not math.isnan(s[column])]
+        averaged.append(sum(values) / len(values) if values else NAN)
+    return tuple(averaged)
+
+class MetricsStore:
+    """Multi-resolution sample history kept in memory and in append-only files"""
+    def __init__(self, directory=METRICS_DIR, sample_seconds=METRICS_SAMPLE_SECONDS):
+        self.directory = Path(directory)
+        self.rings = {}
+        self.buckets = {}  # resolution -> (bucket start, samples waiting to be averaged)
+        for name, bucket, retention in METRICS_RESOLUTIONS:
+            step = bucket or sample_seconds
+            self.rings[name] = MetricRing(retention // step + 1)
+            self.buckets[name] = (None, [])
+        self.last_compacted = time.time()
+
+    def path(self, name):
+        return self.directory / f"metrics_{name}.bin"
+
+    def load(self):
+        """Fill the rings from disk, skipping records past their retention"""
+        self.directory.mkdir(parents=True, exist_ok=True)
+        now = time.time()
+        for name, _, retention in METRICS_RESOLUTIONS:
+            try:
+                data = self.path(name).read_bytes()
+            except FileNotFoundError:
+                continue
+            usable = len(data) - len(data) % METRIC_RECORD.size  # Ignore a torn final write
+            for sample in METRIC_RECORD.iter_unpack(data[:usable]):
+                if sample[0] >= now - retention:
+                    self.rings[name].append(sample)
+
+    def add(self, sample):
+        """Record a raw sample; returns {resolution: [records]} that need appending to disk"""
+        writes = {"raw": [sample]}
+        self.rings["raw"].append(sample)
+
+        # Roll samples up into coarser buckets as each bucket closes
+        pending = [sample]
+        for name, bucket, _ in METRICS_RESOLUTIONS[1:]:
+            rolled_up = []
+            for item in pending:
+                bucket_start = item[0] - item[0] % bucket
+                current, items = self.buckets[name]
+                if current is not None and bucket_start != current and items:
+                    rolled_up.append(average_samples(current, items))
+                    items = []
+                self.buckets[name] = (bucket_start, items + [item])
+            for record in rolled_up:
+                self.rings[name].append(record)
+            if not rolled_up:
+                break
+            writes[name] = rolled_up
+            pending = rolled_up
+        return writes
+
+    def append_records(self, writes):
+        for name, records in writes.items():
+            with open(self.path(name), "ab") as f:
+                f.write(b"".join(METRIC_RECORD.pack(*record) for record in records))
+
+    def compact(self):
+        """Rewrite each file with only the records still inside its retention window"""
+        now = time.time()
+        for name, _, retention in METRICS_RESOLUTIONS:
+            records = list(self.rings[name].samples(since=now - retention))
+            tmp = self.path(name).with_suffix(".tmp")
+            tmp.write_bytes(b"".join(METRIC_RECORD.pack(*record) for record in records))
+            os.replace(tmp, self.path(name))
+        self.last_compacted = now
+
+    def history(self, seconds):
+        """Samples from the finest resolution that still covers the requested span"""
+        since = time.time() - seconds
+        for name, _, retention in METRICS_RESOLUTIONS:
+            if seconds <= retention:
+                return name, list(self.rings[name].samples(since=since))
+        name = METRICS_RESOLUTIONS[-1][0]
+        return name, list(self.rings[name].samples(since=since))
+
+metrics_store = MetricsStore()
+
+async def collect_metrics_sample():
+    """Take one TPS/MSPT/players/ping reading"""
+    tps_out, mspt_out = await asyncio.gather(
+        rcon.command("tps"), rcon.command("mspt"), return_exceptions=True
+    )
+    tps_value = NAN if isinstance(tps_out, Exception) else parse_tps(tps_out)
+    mspt_value = NAN if isinstance(mspt_out, Exception) else parse_mspt(mspt_out)
+
+    # The status poller already probes regularly; reuse its snapshot
+    snapshot = await status_service.get(max_age=METRICS_SAMPLE_SECONDS)
+    players = snapshot.status.players.online if snapshot.online else 0
+    ping = snapshot.status.latency if snapshot.online else NAN
+
+    return (time.time(), tps_value, mspt_value, float(players), ping)
+
+@tasks.loop(seconds=METRICS_SAMPLE_SECONDS)
+async def sample_metrics():
+    try:
+        sample = await collect_metrics_sample()
+        writes = metrics_store.add(sample)
+        await asyncio.to_thread(metrics_store.append_records, writes)
+        if time.time() - metrics_store.last_compacted >= METRICS_COMPACT_HOURS * 3600:
+            await asyncio.to_thread(metrics_store.compact)
+    except Exception as e:
+        print(f"❌ Metrics sample failed: {e}")
+
+@sample_metrics.before_loop
+async def load_metrics_history():
+    await asyncio.to_thread(metrics_store.load)
+
+# --- Lag watchdog ---
+# Samples TPS and ping every few seconds and runs them through threshold rules
+# with hysteresis: an alert fires once a value has stayed past its threshold for
+# the rule's duration, and re-arms only after it has been back past a separate
+# clear threshold for a while, so one lag spike means one alert.
+
+WATCHDOG_SAMPLE_SECONDS = 5
+WATCHDOG_RECENT_SAMPLES = 12  # Readings included in an alert
+
+class LagRule:
+    """Fires when a metric stays past threshold for duration seconds"""
+    def __init__(self, name, metric, threshold, duration, clear_threshold, clear_duration=None, above=False):
+        self.name = name
+        self.metric = metric
+        self.threshold = threshold
+        self.duration = duration
+        self.clear_threshold = clear_threshold
+        self.clear_duration = duration if clear_duration is None else clear_duration
+        self.above = above  # True for "too high" rules (ping), False for "too low" (TPS)
+        self.active = False
+        self.breach_since = None
+        self.clear_since = None
+
+    def breached(self, value):
+        return value > self.threshold if self.above else value < self.threshold
+
+    def cleared(self, value):
+        return value < self.clear_threshold if self.above else value > self.clear_threshold
+
+    def update(self, now, value):
+        """Feed one reading; returns "alert", "recovered" or None"""
+        if math.isnan(value):
+            return None  # A missed reading neither confirms nor clears a spike
+
+        if not self.active:
+            if self.breached(value):
+                self.breach_since = self.breach_since or now
+                if now - self.breach_since >= self.duration:
+                    self.active = True
+                    self.clear_since = None
+                    return "alert"
+            else:
+                self.breach_since = None
+        else:
+            if self.cleared(value):
+                self.clear_since = self.clear_since or now
+                if now - self.clear_since >= self.clear_duration:
+                    self.active = False
+                    self.breach_since = None
+                    return "recovered"
+            else:
+                self.clear_since = None
+        return None
+
+    def describe(self):
+        comparison = ">" if self.above else "<"
+        return f"{self.metric.upper()} {comparison} {self.threshold:g} for {self.duration}s"
+
+WATCHDOG_RULES = [
+    LagRule("Low TPS", "tps", threshold=15, duration=30, clear_threshold=18, clear_duration=60),
+    LagRule("High ping", "ping", threshold=250, duration=60, clear_threshold=150, above=True),
+]
+
+class LagWatchdog:
+    """Evaluates WATCHDOG_RULES against a stream of readings"""
+    def __init__(self, rules):
+        self.rules = rules
+        self.recent = deque(maxlen=WATCHDOG_RECENT_SAMPLES)
+        self.last_snapshot = None  # Status snapshot whose ping was last fed in
+
+    def observe(self, now, readings):
+        self.recent.append((now, readings))
+        events = []
+        for rule in self.rules:
+            event = rule.update(now, readings.get(rule.metric, NAN))
+            if event:
+                events.append((rule, event))
+        return events
+
+    def recent_table(self):
+        lines = ["time      tps    ping"]
+        for timestamp, readings in self.recent:
+            tps_value, ping = readings.get("tps", NAN), readings.get("ping", NAN)
+            lines.append(
+                f"{datetime.fromtimestamp(timestamp).strftime('%H:%M:%S')}  "
+                f"{'  -- ' if math.isnan(tps_value) else f'{tps_value:5.1f}'}  "
+                f"{'  --' if math.isnan(ping) else f'{ping:4.0f}'}"
+            )
+        return "\n".join(lines)
+
+lag_watchdog = LagWatchdog(WATCHDOG_RULES)
+
+@tasks.loop(seconds=WATCHDOG_SAMPLE_SECONDS)
+async def watch_for_lag():
+    try:
+        # Ping comes from the status poller's snapshot rather than a probe of our
+        # own; each snapshot counts once, between polls ping is just missing
+        tps_out, snapshot = await asyncio.gather(
+            rcon.command("tps"), status_service.get(), return_exceptions=True
+        )
+        fresh = isinstance(snapshot, StatusSnapshot) and snapshot is not lag_watchdog.last_snapshot
+        if fresh:
+            lag_watchdog.last_snapshot = snapshot
+        readings = {
+            "tps": NAN if isinstance(tps_out, Exception) else parse_tps(tps_out),
+            "ping": snapshot.status.latency if fresh and snapshot.online else NAN,
+        }
+        events = lag_watchdog.observe(time.time(), readings)
+        if events:
+            await post_lag_events(events)
+    except Exception as e:
+        print(f"❌ Lag watchdog error: {e}")
+
+@watch_for_lag.before_loop
+async def before_watch_for_lag():
+    await bot.wait_until_ready()
+
+async def post_lag_events(events):
+    channel = bot.get_channel(YOUR_CHANNEL_ID)
+    if not channel:
+        print("❌ Channel not found.")
+        return
+
+    for rule, event in events:
+        if event == "recovered":
+            await channel.send(f"✅ **{rule.name}** has recovered.")
+            continue
+
+        embed = discord.Embed(
+            title=f"⚠️ Lag Alert: {rule.name}",
+            description=f"Triggered by rule `{rule.describe()}`",
+            color=discord.Color.orange()
+        )
+        embed.add_field(name="📈 Recent Samples", value=f"```{lag_watchdog.recent_table()}```", inline=False)
+        try:
+            players_out = strip_minecraft_colors(await rcon.command("list")).strip()
+        except Exception as e:
+            players_out = f"Unavailable: {e}"
+        embed.add_field(name="👥 Players", value=f"```{dashboard_field(players_out)}```", inline=False)
+        embed.set_footer(text="You'll get one alert per incident and a follow-up once it recovers.")
+        await channel.send(embed=embed)
+
+def render_history_chart(samples, title):
+    """PNG with one stacked line panel per metric"""
+    panels = [
+        ("TPS", 1, (46, 204, 113), 20.0),
+        ("MSPT", 2, (241, 196, 15), None),
+        ("Players", 3, (52, 152, 219), None),
+        ("Ping (ms)", 4, (155, 89, 182), None),
+    ]
+    width, panel_height, margin = 900, 130, 60
+    height = margin + panel_height * len(panels) + 30
+    image = Image.new("RGB", (width, height), (32, 34, 37))
+    draw = ImageDraw.Draw(image)
+    draw.text((margin, 15), title, fill=(255, 255, 255))
+
+    start, end = samples[0][0], samples[-1][0]
+    span = max(end - start, 1)
+    plot_width = width - margin - 20
+
+    for i, (label, column, color, fixed_max) in enumerate(panels):
+        top = margin + i * panel_height
+        bottom = top + panel_height - 25
+        values = [s[column] for s in samples if not math.isnan(s[column])]
+        y_max = fixed_max or max(max(values, default=1.0) * 1.1, 1.0)
+
+        draw.rectangle((margin, top, margin + plot_width, bottom), outline=(79, 84, 92))
+        draw.text((5, top), label, fill=color)
+        draw.text((5, top + 14), f"{y_max:.0f}", fill=(185, 187, 190))
+        draw.text((5, bottom - 12), "0", fill=(185, 187, 190))
+
+        # Break the line wherever a reading is missing
+        segment = []
+        for sample in samples + [(end, *([NAN] * (len(METRIC_FIELDS) - 1)))]:
+            value = sample[column]
+            if math.isnan(value):
+                if len(segment) > 1:
+                    draw.line(segment, fill=color, width=2)
+                elif segment:
+                    draw.point(segment, fill=color)
+                segment = []
+                continue
+            x = margin + (sample[0] - start) / span * plot_width
+            y = bottom - min(value / y_max, 1.0) * (bottom - top)
+            segment.append((x, y))
+
+    footer_y = height - 25
+    draw.text((margin, footer_y), datetime.fromtimestamp(start).strftime("%m/%d %H:%M"), fill=(185, 187, 190))
+    end_label = datetime.fromtimestamp(end).strftime("%m/%d %H:%M")
+    draw.text((width - 20 - 7 * len(end_label), footer_y), end_label, fill=(185, 187, 190))
+
+    buffer = io.BytesIO()
+    image.save(buffer, format="PNG")
+    return buffer.getvalue()
+
 # Enhanced say command that shows it came from Discord
 @bot.command()
 async def say(ctx, *, message):
     """Send a broadcast message to all players in the server"""
     try:
-        with MCRcon(RCON_HOST, RCON_PASSWORD, port=RCON_PORT) as mcr:
-            # Include Discord username in the message
-            formatted_message = f"[Discord - {ctx.author.display_name}] {message}"
-            mcr.command(f"say {formatted_message}")
-            await ctx.send(f"📢 Sent to Minecraft chat:\n> {message}")
+        # Include Discord username in the message
+        formatted_message = f"[Discord - {ctx.author.display_name}] {message}"
+        await rcon.command(f"say {formatted_message}")
+        await ctx.send(f"📢 Sent to Minecraft chat:\n> {message}")
     except Exception as e:
         await ctx.send(f"❌ Failed to broadcast message: {e}")
 
@@ -63,9 +1381,8 @@ class CustomCommandModal(Modal, title="Execute Custom Command"):
 
     async def on_submit(self, interaction: discord.Interaction):
         try:
-            with MCRcon(RCON_HOST, RCON_PASSWORD, port=RCON_PORT) as mcr:
-                response = mcr.command(str(self.command))
-                await interaction.response.send_message(f"✅ Command executed: `{self.command}`\n```{response}```")
+            response = await rcon.command(str(self.command))
+            await interaction.response.send_message(f"✅ Command executed: `{self.command}`\n```{response}```")
         except Exception as e:
             await interaction.response.send_message(f"❌ Failed to run command: {e}")
 
@@ -130,6 +1447,10 @@ class CommandPanel(View):
     async def projects_button(self, interaction: discord.Interaction, button: discord.ui.Button):
         await self.handle_command(interaction, "projects")
 
+    @discord.ui.button(label="📊 Dashboard", style=discord.ButtonStyle.primary, custom_id="auto_dashboard")
+    async def dashboard_button(self, interaction: discord.Interaction, button: discord.ui.Button):
+        await self.handle_command(interaction, "dashboard")
+
     async def handle_custom_command(self, interaction: discord.Interaction):
         """Handle custom command input via modal"""
         modal = CustomCommandModal()
@@ -137,44 +1458,74 @@ class CommandPanel(View):
 
     async def handle_command(self, interaction: discord.Interaction, command_name: str):
         await interaction.response.defer()
+        await dispatch_command(interaction, command_name)
 
-        ctx = await bot.get_context(interaction.message)
+# Seconds a panel button's replies are reused for commands whose output is the
+# same for everyone and rarely changes
+PANEL_RESULT_TTL = {
+    "seed": 3600,
+    "plugins": 300,
+    "worlds": 60,
+}
+panel_results = {}  # command name -> (sent_at, [(args, kwargs) of each reply])
 
-        # Run the command using the bot's built-in invoke mechanism
-        cmd = bot.get_command(command_name)
-        if cmd:
-            ctx.command = cmd
-            try:
-                await bot.invoke(ctx)  # This handles Cogs properly
-            except Exception as e:
-                await interaction.followup.send(f"❌ Error executing command: {str(e)}")
-        else:
-            await interaction.followup.send(f"❌ Command '{command_name}' not found.")
-        
-        # Create a mock context for the command
-        class MockContext:
-            def __init__(self, interaction):
-                self.interaction = interaction
-                self.author = interaction.user
-                self.channel = interaction.channel
-                self.guild = interaction.guild
-                self.bot = bot
-                
-            async def send(self, *args, **kwargs):
-                await self.interaction.followup.send(*args, **kwargs)
-        
-        ctx = MockContext(interaction)
-        
-        # Get and invoke the command
-        cmd = bot.get_command(command_name)
-        if cmd:
-            try:
-                # Call the command callback with just the context (no cog since these are standalone commands)
-                await cmd.callback(ctx)
-            except Exception as e:
-                await interaction.followup.send(f"❌ Error executing command: {str(e)}")
-        else:
-            await interaction.followup.send(f"❌ Command '{command_name}' not found.")
+class InteractionContext(Context):
+    """Context for a command run from a button: the user who clicked is the
+    author, and replies go to the interaction. Replies are recorded in sent."""
+    def __init__(self, interaction: discord.Interaction, command):
+        # The panel message was posted by the bot; checks must see the clicker
+        message = copy.copy(interaction.message)
+        message.author = interaction.user
+        super().__init__(message=message, bot=bot, view=StringView(""), prefix=bot.command_prefix,
+                         command=command, invoked_with=command.name, interaction=interaction)
+        self.sent = []
+
+    async def send(self, *args, **kwargs):
+        self.sent.append((args, kwargs))
+        return await super().send(*args, **kwargs)
+
+def replayable(sent):
+    # Files are consumed when sent and views hold per-message state
+    return sent and not any(kwargs.get(key) for _, kwargs in sent for key in ("file", "files", "view"))
+
+async def dispatch_command(interaction: discord.Interaction, command_name: str):
+    """Run a bot command exactly once on behalf of a (deferred) interaction, with
+    the same checks, cooldowns and converters as typing it"""
+    cmd = bot.get_command(command_name)
+    if cmd is None:
+        await interaction.followup.send(f"❌ Command '{command_name}' not found.")
+        return
+
+    ctx = InteractionContext(interaction, cmd)
+    ttl = PANEL_RESULT_TTL.get(cmd.name)
+    cached = panel_results.get(cmd.name)
+    if ttl and cached and time.monotonic() - cached[0] <= ttl:
+        # Still checked: a cached reply mustn't reach someone who can't run the command
+        try:
+            if await cmd.can_run(ctx):
+                for args, kwargs in cached[1]:
+                    await ctx.send(*args, **kwargs)
+                return
+        except commands.CommandError:
+            pass  # Fall through to invoke, which reports the failure
+
+    try:
+        await cmd.invoke(ctx)
+    except commands.CheckFailure:
+        await interaction.followup.send("❌ You don't have permission to use this command.", ephemeral=True)
+        return
+    except commands.CommandOnCooldown as e:
+        await interaction.followup.send(f"🕒 On cooldown, try again in {e.retry_after:.0f}s.", ephemeral=True)
+        return
+    except commands.CommandInvokeError as e:
+        await interaction.followup.send(f"❌ Error executing command: {e.original}")
+        return
+    except commands.CommandError as e:
+        await interaction.followup.send(f"❌ Error executing command: {e}")
+        return
+
+    if ttl and replayable(ctx.sent):
+        panel_results[cmd.name] = (time.monotonic(), ctx.sent)
 
 @bot.event
 async def on_interaction(interaction: discord.Interaction):
@@ -204,26 +1555,9 @@ async def on_interaction(interaction: discord.Interaction):
         await interaction.response.defer(thinking=True)
 
         try:
-            url = "http://140.238.156.90:8123"
-            options = Options()
-            options.headless = True
-            options.add_argument("--width=1280")
-            options.add_argument("--height=720")
-            service = Service('/usr/local/bin/geckodriver')
-
-            driver = webdriver.Firefox(service=service, options=options)
-            driver.set_window_size(1280, 720)
-            driver.get(url)
-            await asyncio.sleep(5)
-
-            screenshot_path = "/tmp/dynmap_snapshot.png"
-            driver.save_screenshot(screenshot_path)
-            driver.quit()
-
-            file = discord.File(screenshot_path, filename="dynmap.png")
+            png = await take_dynmap_snapshot()
+            file = discord.File(io.BytesIO(png), filename="dynmap.png")
             await interaction.followup.send("🖼 Snapshot of Dynmap:", file=file)
-
-            os.remove(screenshot_path)
         except Exception as e:
             await interaction.followup.send(f"❌ Failed to take snapshot:\n```{e}```")
         return
@@ -232,9 +1566,8 @@ async def on_interaction(interaction: discord.Interaction):
 async def command(ctx, *, cmd):
     """Execute a Minecraft command via RCON"""
     try:
-        with MCRcon(RCON_HOST, RCON_PASSWORD, port=RCON_PORT) as mcr:
-            response = mcr.command(cmd)
-            await ctx.send(f"✅ Command executed:\n```{response}```")
+        response = await rcon.command(cmd)
+        await ctx.send(f"✅ Command executed:\n```{response}```")
     except Exception as e:
         await ctx.send(f"❌ Failed to run command: {e}")
 
@@ -242,12 +1575,28 @@ def strip_minecraft_colors(text):
     """Remove Minecraft color/formatting codes (e.g., §a, §6, §x§e§d...)"""
     return re.sub(r'§[0-9a-fklmnorx]|§x(?:§[0-9a-f]){6}', '', text, flags=re.IGNORECASE)
 
+def clean_plugin_list(response):
+    """Plugin names from a cleaned `plugins` response, without the 'Plugins (N):' header"""
+    if "Plugins (" in response:
+        return response.split("):", 1)[-1].strip()
+    return response
+
+def clean_world_list(response):
+    """`mv list` output without Multiverse's ==== header/footer lines"""
+    cleaned_lines = [
+        line for line in response.splitlines()
+        if not line.startswith("====") and line.strip()
+    ]
+    return '\n'.join(cleaned_lines)
+
 @bot.command()
 async def status(ctx):
     """Simplified Minecraft server status"""
     try:
-        server = JavaServer.lookup(f"{SERVER_IP}:{SERVER_PORT}")
-        status = server.status()
+        snapshot = await status_service.get()
+        if snapshot.error:
+            raise snapshot.error
+        status = snapshot.status
 
         embed = discord.Embed(
             title="Oracle Minecraft Server Status",
@@ -263,6 +1612,7 @@ async def status(ctx):
             names = ', '.join([player.name for player in status.players.sample])
             embed.add_field(name="🎮 Online Players", value=names, inline=False)
 
+        embed.set_footer(text=f"Updated {snapshot.age:.0f}s ago")
         await ctx.send(embed=embed)
 
     except Exception as e:
@@ -277,8 +1627,10 @@ async def status(ctx):
 async def players(ctx):
     """List all currently online players (if visible to the query)"""
     try:
-        server = JavaServer.lookup(f"{SERVER_IP}:{SERVER_PORT}")
-        status = server.status()
+        snapshot = await status_service.get()
+        if snapshot.error:
+            raise snapshot.error
+        status = snapshot.status
         if status.players.sample:
             names = ', '.join([player.name for player in status.players.sample])
             await ctx.send(f"👥 Online players: {names}")
@@ -291,15 +1643,10 @@ async def players(ctx):
 async def plugins(ctx):
     """List installed plugins with cleaned formatting"""
     try:
-        with MCRcon(RCON_HOST, RCON_PASSWORD, port=RCON_PORT) as mcr:
-            response = strip_minecraft_colors(mcr.command("plugins")).strip()
+        response = strip_minecraft_colors(await rcon.cached_command("plugins", RCON_RESULT_TTL["plugins"])).strip()
+        plugin_list = clean_plugin_list(response)
 
-            if "Plugins (" in response:
-                plugin_list = response.split("):", 1)[-1].strip()
-            else:
-                plugin_list = response
-
-            await ctx.send(f"🔌 **Plugins Installed:**\n`{plugin_list}`")
+        await ctx.send(f"🔌 **Plugins Installed:**\n`{plugin_list}`")
     except Exception as e:
         await ctx.send(f"❌ Failed to fetch plugins: {e}")
 
@@ -307,17 +1654,10 @@ async def plugins(ctx):
 async def worlds(ctx):
     """List loaded worlds with formatting cleaned"""
     try:
-        with MCRcon(RCON_HOST, RCON_PASSWORD, port=RCON_PORT) as mcr:
-            response = strip_minecraft_colors(mcr.command("mv list")).strip()
-
-            # Remove header/footer if present
-            cleaned_lines = [
-                line for line in response.splitlines()
-                if not line.startswith("====") and line.strip()
-            ]
-            worlds_text = '\n'.join(cleaned_lines)
+        response = strip_minecraft_colors(await rcon.cached_command("mv list", RCON_RESULT_TTL["mv list"])).strip()
+        worlds_text = clean_world_list(response)
 
-            await ctx.send(f"🌍 **Worlds Loaded:**\n```{worlds_text}```")
+        await ctx.send(f"🌍 **Worlds Loaded:**\n```{worlds_text}```")
     except Exception as e:
         await ctx.send(f"❌ Failed to fetch world list: {e}")
 
@@ -325,19 +1665,101 @@ async def worlds(ctx):
 async def tps(ctx):
     """Check server TPS (ticks per second)"""
     try:
-        with MCRcon(RCON_HOST, RCON_PASSWORD, port=RCON_PORT) as mcr:
-            response = strip_minecraft_colors(mcr.command("tps")).strip()
-            await ctx.send(f"📈 **TPS Status:**\n```{response}```")
+        response = strip_minecraft_colors(await rcon.command("tps")).strip()
+        await ctx.send(f"📈 **TPS Status:**\n```{response}```")
     except Exception as e:
         await ctx.send(f"❌ Failed to fetch TPS: {e}")
 
+async def timed_query(coro):
+    """Await coro and return (result or exception, elapsed milliseconds)"""
+    started = time.perf_counter()
+    try:
+        result = await coro
+    except Exception as e:
+        result = e
+    return result, (time.perf_counter() - started) * 1000
+
+def dashboard_field(text, limit=1000):
+    text = text.strip() or "(empty)"
+    if len(text) > limit:
+        text = text[:limit - 3] + "..."
+    return text
+
+@bot.command()
+async def dashboard(ctx):
+    """Server status, TPS, players, worlds and plugins in one embed"""
+    started = time.perf_counter()
+    # Every query runs at once, so the wait is the slowest one rather than the sum
+    (snapshot, status_ms), (tps_out, tps_ms), (list_out, list_ms), (worlds_out, worlds_ms), (plugins_out, plugins_ms) = \
+        await asyncio.gather(
+            timed_query(status_service.refresh()),
+            timed_query(rcon.command("tps")),
+            timed_query(rcon.command("list")),
+            timed_query(rcon.cached_command("mv list", RCON_RESULT_TTL["mv list"])),
+            timed_query(rcon.cached_command("plugins", RCON_RESULT_TTL["plugins"])),
+        )
+    total_ms = (time.perf_counter() - started) * 1000
+
+    online = isinstance(snapshot, StatusSnapshot) and snapshot.online
+    embed = discord.Embed(
+        title="📊 Server Dashboard",
+        color=discord.Color.green() if online else discord.Color.red()
+    )
+
+    if online:
+        status = snapshot.status
+        embed.add_field(
+            name=f"📡 Status ({status_ms:.0f} ms)",
+            value=f"🟢 Online • 📶 {status.latency:.0f} ms • 👥 {status.players.online}/{status.players.max}",
+            inline=False
+        )
+    else:
+        error = snapshot.error if isinstance(snapshot, StatusSnapshot) else snapshot
+        embed.add_field(name=f"📡 Status ({status_ms:.0f} ms)", value=f"🔴 Offline or unreachable: `{error}`", inline=False)
+
+    def rcon_field(name, result, elapsed, clean=lambda text: text):
+        if isinstance(result, Exception):
+            value = f"❌ {result}"
+        else:
+            value = f"```{dashboard_field(clean(strip_minecraft_colors(result).strip()))}```"
+        embed.add_field(name=f"{name} ({elapsed:.0f} ms)", value=value, inline=False)
+
+    rcon_field("📈 TPS", tps_out, tps_ms)
+    rcon_field("👥 Players", list_out, list_ms)
+    rcon_field("🌍 Worlds", worlds_out, worlds_ms, clean_world_list)
+    rcon_field("🔌 Plugins", plugins_out, plugins_ms, clean_plugin_list)
+
+    embed.set_footer(text=f"Collected in {total_ms:.0f} ms (queries run in parallel)")
+    await ctx.send(embed=embed)
+
+@bot.command()
+async def history(ctx, hours: float = 24):
+    """Chart recorded TPS, MSPT, players and ping. Usage: !history 48"""
+    seconds = max(hours, 0.1) * 3600
+    resolution, samples = metrics_store.history(seconds)
+    if len(samples) < 2:
+        await ctx.send("📉 Not enough history recorded yet. Samples are taken every "
+                       f"{METRICS_SAMPLE_SECONDS}s.")
+        return
+
+    tps_values = [s[1] for s in samples if not math.isnan(s[1])]
+    player_values = [s[3] for s in samples if not math.isnan(s[3])]
+    title = f"Last {hours:g}h ({resolution} samples, {len(samples)} points)"
+    png = await asyncio.to_thread(render_history_chart, samples, title)
+
+    summary = []
+    if tps_values:
+        summary.append(f"📈 TPS min/avg: `{min(tps_values):.1f}` / `{sum(tps_values) / len(tps_values):.1f}`")
+    if player_values:
+        summary.append(f"👥 Peak players: `{max(player_values):.0f}`")
+    await ctx.send("\n".join(summary) or "📊 History", file=discord.File(io.BytesIO(png), filename="history.png"))
+
 @bot.command()
 async def seed(ctx):
     """Get the current world's seed"""
     try:
-        with MCRcon(RCON_HOST, RCON_PASSWORD, port=RCON_PORT) as mcr:
-            response = strip_minecraft_colors(mcr.command("seed")).strip()
-            await ctx.send(f"🌱 Seed: `{response.strip()}`")
+        response = strip_minecraft_colors(await rcon.cached_command("seed", RCON_RESULT_TTL["seed"])).strip()
+        await ctx.send(f"🌱 Seed: `{response.strip()}`")
     except Exception as e:
         await ctx.send(f"❌ Failed to get seed: {e}")
 
@@ -349,7 +1771,7 @@ async def ip(ctx):
 @bot.command()
 async def map(ctx):
     """Share Dynmap link with snapshot button."""
-    dynmap_url = "http://140.238.156.90:8123"
+    dynmap_url = DYNMAP_URL
     embed = discord.Embed(
         title="🗺️ Live Dynmap",
         description="Click below to open the live map or request a current snapshot.",
@@ -358,57 +1780,52 @@ async def map(ctx):
     embed.add_field(name="🌐 Map Link", value=f"[Open Dynmap]({dynmap_url})", inline=False)
     await ctx.send(embed=embed, view=MapView())
 
+@bot.command()
+async def mapsnap(ctx, world: str = DYNMAP_DEFAULT_WORLD, zoom: int = DYNMAP_DEFAULT_ZOOM, x: int = 0, z: int = 0):
+    """Stitch a Dynmap snapshot from tiles. Usage: !mapsnap world 2 100 -200"""
+    zoom = max(zoom, 0)
+    try:
+        png = await dynmap_compositor.snapshot(world=world, x=x, z=z, zoom=zoom)
+        file = discord.File(io.BytesIO(png), filename="dynmap.png")
+        await ctx.send(f"🖼 **{world}** around `{x}, {z}` (zoom {zoom}):", file=file)
+    except Exception as e:
+        await ctx.send(f"❌ Failed to build map snapshot:\n```{e}```")
+
 @bot.command()
 async def sizeworld(ctx):
     """Return the size of multiple Minecraft world folders and the total."""
-    world_paths = {
-    	"World": "/mnt/minecraft-data/minecraft/world",
-        "Ganatcho": "/mnt/minecraft-data/minecraft/Ganatcho",
-        "PixlP": "/mnt/minecraft-data/minecraft/PixlP",
-        "Sanctuary": "/mnt/minecraft-data/minecraft/Sanctuary",
-        "Mordor": "/mnt/minecraft-data/minecraft/Mordor",
-        "Nether": "/mnt/minecraft-data/minecraft/world_nether",
-        "The End": "/mnt/minecraft-data/minecraft/world_the_end"
-    }
-
+    index = await size_index.get()
     total_bytes = 0
+    total_growth = 0
     results = []
 
-    for name, path in world_paths.items():
-        proc = await asyncio.create_subprocess_shell(
-            f"du -sb {path}",
-            stdout=asyncio.subprocess.PIPE,
-            stderr=asyncio.subprocess.PIPE
-        )
-        stdout, stderr = await proc.communicate()
-        if proc.returncode == 0:
-            size_bytes = int(stdout.decode().split()[0])
+    for name, path in WORLD_PATHS.items():
+        size_bytes = index.size(path)
+        if size_bytes is not None:
+            growth = index.growth(path)
             total_bytes += size_bytes
+            total_growth += growth or 0
             size_gb = size_bytes / (1024 ** 3)
-            results.append(f"📁 **{name}**: `{size_gb:.2f} GB`")
+            results.append(f"📁 **{name}**: `{size_gb:.2f} GB`{format_growth(growth)}")
         else:
-            results.append(f"❌ **{name}**: Error - `{stderr.decode().strip()}`")
+            results.append(f"❌ **{name}**: Error - `folder not found: {path}`")
 
     total_gb = total_bytes / (1024 ** 3)
-    results.append(f"\n📦 **Total World Size**: `{total_gb:.2f} GB`")
+    results.append(f"\n📦 **Total World Size**: `{total_gb:.2f} GB`{format_growth(total_growth)}")
+    results.append(f"🕐 Scanned {index.scan_age():.0f}s ago")
 
     await ctx.send("🌍 **World Folder Sizes:**\n" + "\n".join(results))
 
 @bot.command()
 async def sizemine(ctx):
     """Return the size of the minecraft folder."""
-    map_path = "/mnt/minecraft-data/minecraft"  # adjust if needed
-    proc = await asyncio.create_subprocess_shell(
-        f"du -sh {map_path}",
-        stdout=asyncio.subprocess.PIPE,
-        stderr=asyncio.subprocess.PIPE
-    )
-    stdout, stderr = await proc.communicate()
-    if proc.returncode == 0:
-        size = stdout.decode().strip()
-        await ctx.send(f"Minecraft folder size:\n```{size}```")
+    index = await size_index.get()
+    size = index.size(MINECRAFT_ROOT)
+    if size is not None:
+        growth = format_growth(index.growth(MINECRAFT_ROOT))
+        await ctx.send(f"Minecraft folder size:\n```{format_bytes(size)}\t{MINECRAFT_ROOT}{growth}```")
     else:
-        await ctx.send(f"❌ Error getting size:\n```{stderr.decode().strip()}```")
+        await ctx.send(f"❌ Error getting size:\n```folder not found: {MINECRAFT_ROOT}```")
 
 @bot.command()
 async def panel(ctx):
@@ -423,18 +1840,13 @@ async def panel(ctx):
 @bot.command()
 async def sizemap(ctx):
     """Return the size of the Dynmap folder."""
-    map_path = "/mnt/minecraft-data/minecraft/plugins/dynmap"  # adjust if needed
-    proc = await asyncio.create_subprocess_shell(
-        f"du -sh {map_path}",
-        stdout=asyncio.subprocess.PIPE,
-        stderr=asyncio.subprocess.PIPE
-    )
-    stdout, stderr = await proc.communicate()
-    if proc.returncode == 0:
-        size = stdout.decode().strip()
-        await ctx.send(f"🗺️ Dynmap tiles folder size:\n```{size}```")
+    index = await size_index.get()
+    size = index.size(DYNMAP_PATH)
+    if size is not None:
+        growth = format_growth(index.growth(DYNMAP_PATH))
+        await ctx.send(f"🗺️ Dynmap tiles folder size:\n```{format_bytes(size)}\t{DYNMAP_PATH}{growth}```")
     else:
-        await ctx.send(f"❌ Error getting map size:\n```{stderr.decode().strip()}```")
+        await ctx.send(f"❌ Error getting map size:\n```folder not found: {DYNMAP_PATH}```")
 
 @bot.command()
 async def howto(ctx):
@@ -449,9 +1861,12 @@ async def howto(ctx):
     embed.add_field(name="`!players`", value="Lists currently online players.", inline=False)
     embed.add_field(name="`!plugins`", value="Lists all installed plugins (via RCON).", inline=False)
     embed.add_field(name="`!worlds`", value="Lists all loaded worlds (requires Multiverse).", inline=False)
+    embed.add_field(name="`!dashboard`", value="Status, TPS, players, worlds and plugins in one view.", inline=False)
+    embed.add_field(name="`!history [hours]`", value="Charts TPS, MSPT, players and ping over time.\nExample: `!history 48`", inline=False)
     embed.add_field(name="`!tps`", value="Shows current server TPS (performance metric).", inline=False)
     embed.add_field(name="`!ip`", value="Shows the Minecraft server IP address.", inline=False)
     embed.add_field(name="`!map`", value="Sends a live screenshot of the Dynmap web view.", inline=False)
+    embed.add_field(name="`!mapsnap [world] [zoom] [x] [z]`", value="Builds a map image straight from Dynmap tiles.\nExample: `!mapsnap world 2 100 -200`", inline=False)
     embed.add_field(name="`!seed`", value="Displays the current world's seed.", inline=False)
     embed.add_field(name="`!say <message>`", value="Broadcasts a message to all players.\nExample: `!say Hello world!`", inline=False)
     embed.add_field(name="`!command <rcon_command>`", value="Executes any RCON command directly.\nExample: `!command time set day`", inline=False)
@@ -470,9 +1885,11 @@ async def check_server_status():
         return
 
     try:
-        # Get server status first
-        server = JavaServer.lookup(f"{SERVER_IP}:{SERVER_PORT}")
-        status = server.status()
+        # Scheduled checks always want a fresh reading
+        snapshot = await status_service.refresh()
+        if snapshot.error:
+            raise snapshot.error
+        status = snapshot.status
         
         # Create status embed
         status_embed = discord.Embed(
@@ -518,7 +1935,18 @@ async def load_cogs():
 # Main function to run the bot
 async def main():
     await load_cogs()
-    await bot.start(TOKEN)
+    poll_server_status.start()
+    log_tailer.start()
+    refresh_size_index.start()
+    sample_metrics.start()
+    watch_for_lag.start()
+    try:
+        await bot.start(TOKEN)
+    finally:
+        await rcon.close()
+        await log_tailer.stop()
+        await dynmap_snapshotter.close()
+        await dynmap_compositor.close()
 
 if __name__ == "__main__":
     asyncio.run(main())
\ No newline at end of file
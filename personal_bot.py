@@ -2,11 +2,18 @@ import discord
 from discord.ext import commands, tasks
 from discord import ui, ButtonStyle, Interaction, Embed
 import json
-from datetime import datetime, timedelta
-import requests
+from datetime import date, datetime, timedelta, time as dtime
+from functools import lru_cache
+from zoneinfo import ZoneInfo
+import aiohttp
 import yfinance as yf
+import numpy as np
+from PIL import Image, ImageDraw
 import time
 import asyncio
+import io
+import os
+import re
 
 intents = discord.Intents.default()
 intents.message_content = True
@@ -26,6 +33,28 @@ WEATHER_USAGE_FILE = 'weather_usage.json'
 MAX_CALLS_PER_MINUTE = 10
 WARN_THRESHOLD = 700_000
 HARD_LIMIT = 900_000
+WEATHER_CALLS_PER_USER_HOUR = 30
+YAHOO_CALLS_PER_MINUTE = 30  # Batched quote and history downloads combined
+CHANNEL_SENDS_PER_SECOND = 0.5  # Sustained rate for bot-initiated posts, per channel...
+CHANNEL_SEND_BURST = 5  # ...after an initial burst of this many
+RATE_LIMIT_FLUSH_SECONDS = 30  # How often quota counters are written to disk
+RATE_LIMIT_PRUNE_SECONDS = 300  # How often idle per-key counters are dropped from memory
+WEATHER_URL = 'https://api.openweathermap.org/data/2.5/weather'
+WEATHER_TTL = 600  # Seconds a city's weather is served from cache
+WEATHER_TIMEOUT = 10
+DEFAULT_CITY = 'Windsor, Ontario'
+QUOTE_TTL = 60  # Seconds a fetched stock quote is reused before refetching
+STOCK_CHECK_MINUTES = 15  # How often thresholds are checked while the market is open
+ALERT_HYSTERESIS_PCT = 1.0  # How far (%) the price must move back past a threshold to re-arm its alert
+ALERTS_FILE = 'stock_alerts.json'
+MARKET_TZ = ZoneInfo('America/New_York')
+MARKET_OPEN = dtime(9, 30)
+MARKET_CLOSE = dtime(16, 0)
+PRICE_HISTORY_DIR = 'price_history'  # One <SYMBOL>.npy of daily OHLCV per symbol
+HISTORY_PERIOD = '5y'  # How far back the first download of a symbol goes
+HISTORY_TTL = 6 * 3600  # Seconds before a symbol's cached history is topped up
+CHART_PERIODS = {"1m": 21, "3m": 63, "6m": 126, "1y": 252, "2y": 504, "5y": 1260}  # in trading days
+INDICATOR_RE = re.compile(r"^sma(\d{1,3})$")
 
 # Load schedule data
 try:
@@ -74,47 +103,775 @@ def validate_datetime(datetime_str):
     except ValueError:
         return False
 
-# Load weather call tracking
-try:
-    with open(WEATHER_USAGE_FILE, 'r') as f:
-        weather_call_log = json.load(f)
-except FileNotFoundError:
-    weather_call_log = {
-        "minute_window": [],
-        "monthly_count": 0,
-        "last_reset": ""
-    }
+def join_lines(lines, limit):
+    """Join lines with newlines, cutting off with a count once limit characters would be exceeded"""
+    text = ""
+    for shown, line in enumerate(lines):
+        if len(text) + len(line) + 1 > limit - 20:
+            return text + f"... and {len(lines) - shown} more"
+        text += line + "\n"
+    return text
+
+### --- RATE LIMITING --- ###
+
+# Counters share one interface: peek/take to admit a call, retry_after, used,
+# idle, and state/load for persistence. Every operation is O(1).
+
+class SlidingWindowCounter:
+    """At most limit calls per window seconds. Keeps counts for the current and
+    previous fixed windows and weights the previous one by how much of it still
+    overlaps the sliding window, instead of storing a timestamp per call."""
+    def __init__(self, limit, window):
+        self.limit = limit
+        self.window = window
+        self.start = 0.0
+        self.current = 0
+        self.previous = 0
+
+    def roll(self, now):
+        start = now - now % self.window
+        if start != self.start:
+            self.previous = self.current if start - self.start == self.window else 0
+            self.current = 0
+            self.start = start
+
+    def used(self, now):
+        self.roll(now)
+        return self.previous * (1 - (now - self.start) / self.window) + self.current
+
+    def peek(self, now, cost=1):
+        return self.used(now) + cost <= self.limit
+
+    def take(self, now, cost=1):
+        self.roll(now)
+        self.current += cost
+
+    def retry_after(self, now, cost=1):
+        if self.peek(now, cost):
+            return 0.0
+        if self.current + cost > self.limit:
+            # Wait for the next window, then for enough of this one to slide out
+            fraction = max(0.0, 1 - (self.limit - cost) / self.current) if self.current else 0.0
+            return self.start + self.window - now + fraction * self.window
+        fraction = 1 - (self.limit - self.current - cost) / self.previous
+        return self.start + fraction * self.window - now
+
+    def idle(self, now):
+        return self.used(now) <= 0
+
+    def state(self):
+        return {"start": self.start, "current": self.current, "previous": self.previous}
+
+    def load(self, state):
+        self.start, self.current, self.previous = state["start"], state["current"], state["previous"]
+
+class MonthlyCounter:
+    """At most limit calls per calendar month"""
+    def __init__(self, limit):
+        self.limit = limit
+        self.period = ""
+        self.count = 0
+
+    def roll(self, now):
+        period = datetime.fromtimestamp(now).strftime('%Y-%m')
+        if period != self.period:
+            self.period = period
+            self.count = 0
+
+    def used(self, now):
+        self.roll(now)
+        return self.count
+
+    def peek(self, now, cost=1):
+        return self.used(now) + cost <= self.limit
+
+    def take(self, now, cost=1):
+        self.roll(now)
+        self.count += cost
+
+    def retry_after(self, now, cost=1):
+        if self.peek(now, cost):
+            return 0.0
+        month_start = datetime.fromtimestamp(now).replace(day=1, hour=0, minute=0, second=0, microsecond=0)
+        next_month = (month_start + timedelta(days=32)).replace(day=1)
+        return next_month.timestamp() - now
+
+    def idle(self, now):
+        return self.used(now) <= 0
+
+    def state(self):
+        return {"period": self.period, "count": self.count}
+
+    def load(self, state):
+        self.period, self.count = state["period"], state["count"]
+
+class TokenBucket:
+    """Bursts of up to capacity calls, refilled at rate calls per second"""
+    def __init__(self, rate, capacity):
+        self.rate = rate
+        self.capacity = capacity
+        self.tokens = float(capacity)
+        self.updated = time.time()
+
+    def refill(self, now):
+        self.tokens = min(self.capacity, self.tokens + (now - self.updated) * self.rate)
+        self.updated = now
+
+    def used(self, now):
+        self.refill(now)
+        return self.capacity - self.tokens
+
+    def peek(self, now, cost=1):
+        self.refill(now)
+        return self.tokens >= cost
+
+    def take(self, now, cost=1):
+        self.refill(now)
+        self.tokens -= cost
+
+    def retry_after(self, now, cost=1):
+        self.refill(now)
+        return max(cost - self.tokens, 0.0) / self.rate
+
+    def idle(self, now):
+        return self.used(now) <= 0
+
+    def state(self):
+        return {"tokens": self.tokens, "updated": self.updated}
+
+    def load(self, state):
+        self.tokens, self.updated = state["tokens"], state["updated"]
+
+class RateLimiter:
+    """Named quotas checked together: a call is admitted only if every quota has
+    room, and then counts against all of them. Quotas marked per_key keep a
+    separate counter for each key (a user id, a channel id, ...) and don't apply
+    to calls made without a key, such as scheduled jobs.
+
+    quotas: name -> (factory returning a fresh counter, per_key)
+
+    Counters live in memory; save() writes them out when something changed and
+    is meant to be called periodically rather than on every call. Per-key
+    counters that have fully recovered are dropped every
+    RATE_LIMIT_PRUNE_SECONDS, whether or not the limiter is saved."""
+    def __init__(self, quotas, filename=None):
+        self.quotas = quotas
+        self.filename = filename
+        self.counters = {}  # (quota name, key) -> counter
+        self.dirty = False
+        self.pruned_at = time.time()
+        if filename:
+            self.load()
+
+    def counter(self, name, key=None):
+        factory, per_key = self.quotas[name]
+        counter_key = (name, str(key) if per_key and key is not None else "")
+        counter = self.counters.get(counter_key)
+        if counter is None:
+            counter = self.counters[counter_key] = factory()
+        return counter
+
+    def applicable(self, key=None):
+        """Quotas that a call with this key counts against"""
+        return [name for name, (_, per_key) in self.quotas.items() if key is not None or not per_key]
+
+    def check(self, key=None, cost=1):
+        """Admit one call; returns (allowed, name of the quota that refused it)"""
+        now = time.time()
+        if now - self.pruned_at >= RATE_LIMIT_PRUNE_SECONDS:
+            self.prune(now)
+        counters = [(name, self.counter(name, key)) for name in self.applicable(key)]
+        for name, counter in counters:
+            if not counter.peek(now, cost):
+                return False, name
+        for _, counter in counters:
+            counter.take(now, cost)
+        self.dirty = True
+        return True, None
+
+    def retry_after(self, key=None, cost=1):
+        now = time.time()
+        return max((self.counter(name, key).retry_after(now, cost) for name in self.applicable(key)),
+                   default=0.0)
+
+    async def wait(self, key=None, cost=1):
+        """Sleep until every quota has room, then take it"""
+        while True:
+            allowed, _ = self.check(key, cost)
+            if allowed:
+                return
+            await asyncio.sleep(max(self.retry_after(key, cost), 0.05))
 
-def save_weather_usage():
-    with open(WEATHER_USAGE_FILE, 'w') as f:
-        json.dump(weather_call_log, f)
+    def used(self, name, key=None):
+        return self.counter(name, key).used(time.time())
 
-def can_make_weather_call():
-    now = time.time()
-    current_month = datetime.now().strftime('%Y-%m')
-    if weather_call_log.get("last_reset") != current_month:
-        weather_call_log["monthly_count"] = 0
-        weather_call_log["last_reset"] = current_month
+    def prune(self, now):
+        # Per-key counters that have fully recovered carry no information
+        for counter_key in [k for k, counter in self.counters.items() if k[1] and counter.idle(now)]:
+            del self.counters[counter_key]
+        self.pruned_at = now
 
-    if weather_call_log["monthly_count"] >= HARD_LIMIT:
-        return False, "⛔ Weather API limit reached (900,000/month)."
+    def load(self):
+        try:
+            with open(self.filename, 'r') as f:
+                saved = json.load(f).get("quotas", {})
+        except FileNotFoundError:
+            return
+        for name, states in saved.items():
+            if name not in self.quotas:
+                continue
+            for key, state in states.items():
+                self.counter(name, key or None).load(state)
 
-    weather_call_log["minute_window"] = [
-        t for t in weather_call_log["minute_window"] if now - t < 60
-    ]
+    def save(self):
+        if not self.filename or not self.dirty:
+            return
+        self.prune(time.time())
+        quotas = {}
+        for (name, key), counter in self.counters.items():
+            quotas.setdefault(name, {})[key] = counter.state()
+        temp_path = self.filename + ".tmp"
+        with open(temp_path, 'w') as f:
+            json.dump({"quotas": quotas}, f)
+        os.replace(temp_path, self.filename)
+        self.dirty = False
+
+weather_limiter = RateLimiter({
+    "minute": (lambda: SlidingWindowCounter(MAX_CALLS_PER_MINUTE, 60), False),
+    "month": (lambda: MonthlyCounter(HARD_LIMIT), False),
+    "user": (lambda: SlidingWindowCounter(WEATHER_CALLS_PER_USER_HOUR, 3600), True),
+}, WEATHER_USAGE_FILE)
+yahoo_limiter = RateLimiter({
+    "minute": (lambda: SlidingWindowCounter(YAHOO_CALLS_PER_MINUTE, 60), False),
+})
+channel_send_limiter = RateLimiter({
+    "burst": (lambda: TokenBucket(CHANNEL_SENDS_PER_SECOND, CHANNEL_SEND_BURST), True),
+})
+
+# Carry over the monthly count from the old weather_usage.json format
+try:
+    with open(WEATHER_USAGE_FILE, 'r') as f:
+        legacy_usage = json.load(f)
+    if "monthly_count" in legacy_usage:
+        weather_limiter.counter("month").load(
+            {"period": legacy_usage.get("last_reset", ""), "count": legacy_usage["monthly_count"]})
+        weather_limiter.dirty = True
+except FileNotFoundError:
+    pass
 
-    if len(weather_call_log["minute_window"]) >= MAX_CALLS_PER_MINUTE:
-        return False, "⚠️ Too many weather calls this minute. Try again soon."
+WEATHER_LIMIT_MESSAGES = {
+    "month": f"⛔ Weather API limit reached ({HARD_LIMIT:,}/month).",
+    "minute": "⚠️ Too many weather calls this minute. Try again soon.",
+    "user": "⚠️ You've asked for a lot of weather lookups this hour. Try again later.",
+}
 
-    weather_call_log["minute_window"].append(now)
-    weather_call_log["monthly_count"] += 1
-    save_weather_usage()
+def can_make_weather_call(user=None):
+    allowed, quota = weather_limiter.check(user)
+    if not allowed:
+        return False, WEATHER_LIMIT_MESSAGES[quota]
 
-    if weather_call_log["monthly_count"] >= WARN_THRESHOLD:
-        return True, f"⚠️ Approaching monthly weather API limit: {weather_call_log['monthly_count']} calls."
+    monthly_count = weather_limiter.used("month")
+    if monthly_count >= WARN_THRESHOLD:
+        return True, f"⚠️ Approaching monthly weather API limit: {monthly_count} calls."
 
     return True, None
 
+### --- WEATHER --- ###
+
+def normalize_city(city):
+    """'  windsor,Ontario ' and 'Windsor, ontario' -> 'windsor,ontario'"""
+    parts = [" ".join(part.split()) for part in city.lower().split(",")]
+    return ",".join(part for part in parts if part)
+
+class WeatherClient:
+    """OpenWeatherMap over one pooled aiohttp session. Responses (including
+    "city not found", but no other error) are cached per normalized city name
+    for WEATHER_TTL, and concurrent lookups of the same city share a single
+    request, so only real requests count against the monthly quota."""
+    def __init__(self, ttl=WEATHER_TTL, timeout=WEATHER_TIMEOUT):
+        self.ttl = ttl
+        self.timeout = timeout
+        self.session = None
+        self.cache = {}     # normalized city -> (fetched_at, response or None)
+        self.inflight = {}  # normalized city -> task
+
+    async def fetch(self, city, user=None):
+        allowed, message = can_make_weather_call(user)
+        if not allowed:
+            return None, message, False
+        if self.session is None or self.session.closed:
+            self.session = aiohttp.ClientSession(
+                timeout=aiohttp.ClientTimeout(total=self.timeout),
+                connector=aiohttp.TCPConnector(limit=10, ttl_dns_cache=300),
+            )
+        params = {"q": city, "appid": OPENWEATHER_API_KEY, "units": "metric"}
+        async with self.session.get(WEATHER_URL, params=params) as response:
+            data = await response.json(content_type=None)
+        # OpenWeatherMap reports errors in the body; cod is 200 only on success.
+        # "City not found" is the only error worth caching: bad keys, rate
+        # limits and outages are passing and must not stick for WEATHER_TTL.
+        code = str(data.get("cod"))
+        if code == "200":
+            return data, message, True
+        if code == "404":
+            return None, message, True
+        print(f"Weather API error for {city}: {code} {data.get('message')}")
+        return None, "❌ The weather service isn't responding. Try again soon.", False
+
+    async def get(self, city, user=None):
+        """(response or None, message). The message is a quota warning on success,
+        or the reason when there is no response. A request actually sent to the
+        API counts against user's hourly quota."""
+        key = normalize_city(city)
+        cached = self.cache.get(key)
+        if cached and time.time() - cached[0] <= self.ttl:
+            return cached[1], None
+
+        task = self.inflight.get(key)
+        if task is None or task.done():
+            task = asyncio.create_task(self.fetch(city, user))
+            self.inflight[key] = task
+        try:
+            data, message, answered = await asyncio.shield(task)
+        except (aiohttp.ClientError, asyncio.TimeoutError, ValueError) as e:
+            print(f"Error fetching weather for {city}: {e}")
+            return None, "❌ The weather service isn't responding. Try again soon."
+        finally:
+            if task.done() and self.inflight.get(key) is task:
+                del self.inflight[key]
+
+        if answered:
+            self.cache[key] = (time.time(), data)
+        return data, message
+
+    async def close(self):
+        if self.session is not None:
+            await self.session.close()
+
+weather_client = WeatherClient()
+
+### --- STOCK QUOTES --- ###
+
+class Quote:
+    def __init__(self, price, previous_close, fetched_at):
+        self.price = price
+        self.previous_close = previous_close
+        self.fetched_at = fetched_at
+
+    @property
+    def change_pct(self):
+        if not self.previous_close:
+            return None
+        return (self.price - self.previous_close) / self.previous_close * 100
+
+    def describe(self):
+        change = self.change_pct
+        if change is None:
+            return f"${self.price:.2f}"
+        return f"${self.price:.2f} ({'🔺' if change >= 0 else '🔻'}{change:+.2f}%)"
+
+class QuoteEngine:
+    """Shared stock quote cache. Every symbol that needs refreshing is fetched
+    in one batched yf.download, run in a worker thread so the bot keeps
+    responding; each quote is then reused for QUOTE_TTL seconds."""
+    def __init__(self, ttl=QUOTE_TTL):
+        self.ttl = ttl
+        self.quotes = {}  # symbol -> Quote
+        self.lock = asyncio.Lock()
+
+    def is_fresh(self, symbol, max_age):
+        quote = self.quotes.get(symbol)
+        return quote is not None and time.time() - quote.fetched_at <= max_age
+
+    @staticmethod
+    def download(symbols):
+        data = yf.download(symbols, period="5d", interval="1d", auto_adjust=False,
+                           progress=False, threads=True)
+        if data is None or data.empty:
+            return {}
+        closes = data["Close"]
+        if not hasattr(closes, "columns"):  # a lone ticker can come back as a Series
+            closes = closes.to_frame(symbols[0])
+
+        now = time.time()
+        quotes = {}
+        for symbol in symbols:
+            if symbol not in closes.columns:
+                continue
+            series = closes[symbol].dropna()
+            if series.empty:
+                continue
+            previous = float(series.iloc[-2]) if len(series) > 1 else None
+            quotes[symbol] = Quote(float(series.iloc[-1]), previous, now)
+        return quotes
+
+    async def get(self, symbols, max_age=None):
+        """symbol -> Quote (or None if Yahoo had nothing), fetching only stale symbols"""
+        max_age = self.ttl if max_age is None else max_age
+        symbols = [symbol.upper() for symbol in symbols]
+        if any(not self.is_fresh(symbol, max_age) for symbol in symbols):
+            # Callers arriving mid-fetch wait here and then find their quotes fresh
+            async with self.lock:
+                stale = [symbol for symbol in symbols if not self.is_fresh(symbol, max_age)]
+                if stale and not yahoo_limiter.check()[0]:
+                    print(f"Yahoo rate limit reached; serving cached quotes for {', '.join(stale)}")
+                elif stale:
+                    try:
+                        self.quotes.update(await asyncio.to_thread(self.download, stale))
+                    except Exception as e:
+                        # Fall back to whatever older quotes we still have
+                        print(f"Error fetching quotes for {', '.join(stale)}: {e}")
+        return {symbol: self.quotes.get(symbol) for symbol in symbols}
+
+quote_engine = QuoteEngine()
+
+def nth_weekday(year, month, weekday, n):
+    """Date of the nth (1-based; -1 for last) weekday (Mon=0) in a month"""
+    if n > 0:
+        first = date(year, month, 1)
+        return first + timedelta(days=(weekday - first.weekday()) % 7 + 7 * (n - 1))
+    last = (date(year, month, 28) + timedelta(days=4)).replace(day=1) - timedelta(days=1)
+    return last - timedelta(days=(last.weekday() - weekday) % 7)
+
+def easter(year):
+    """Gregorian Easter Sunday (anonymous algorithm)"""
+    a, b, c = year % 19, year // 100, year % 100
+    d, e = b // 4, b % 4
+    g = (8 * b + 13) // 25
+    h = (19 * a + b - d - g + 15) % 30
+    i, k = c // 4, c % 4
+    l = (32 + 2 * e + 2 * i - h - k) % 7
+    m = (a + 11 * h + 19 * l) // 433
+    month = (h + l - 7 * m + 90) // 25
+    return date(year, month, (h + l - 7 * m + 33 * month + 19) % 32)
+
+@lru_cache(maxsize=8)
+def market_holidays(year):
+    """NYSE full-day closures for a year. Holidays on a Saturday are observed the
+    Friday before (except New Year's Day, which then isn't made up), and on a
+    Sunday the Monday after."""
+    fixed = [date(year, 1, 1), date(year, 7, 4), date(year, 12, 25)]
+    if year >= 2022:
+        fixed.append(date(year, 6, 19))  # Juneteenth
+    holidays = set()
+    for day in fixed:
+        if day.weekday() == 5 and day.month != 1:
+            holidays.add(day - timedelta(days=1))
+        elif day.weekday() == 6:
+            holidays.add(day + timedelta(days=1))
+        elif day.weekday() < 5:
+            holidays.add(day)
+    holidays.update({
+        nth_weekday(year, 1, 0, 3),         # Martin Luther King Jr. Day
+        nth_weekday(year, 2, 0, 3),         # Washington's Birthday
+        easter(year) - timedelta(days=2),   # Good Friday
+        nth_weekday(year, 5, 0, -1),        # Memorial Day
+        nth_weekday(year, 9, 0, 1),         # Labor Day
+        nth_weekday(year, 11, 3, 4),        # Thanksgiving
+    })
+    return frozenset(holidays)
+
+def market_is_open(now=None):
+    """Regular NYSE/Nasdaq session, Mon-Fri 9:30-16:00 Eastern, outside exchange
+    holidays (early closes are treated as full days)"""
+    now = now or datetime.now(MARKET_TZ)
+    return (now.weekday() < 5 and MARKET_OPEN <= now.time() < MARKET_CLOSE
+            and now.date() not in market_holidays(now.year))
+
+class ThresholdAlert:
+    """One buy/sell threshold on a symbol. Fires once when the price crosses it,
+    then stays quiet until the price moves back past the hysteresis band."""
+    indicator = None
+
+    def __init__(self, symbol, side, threshold, state="armed"):
+        self.symbol = symbol
+        self.side = side  # "buy" fires below the threshold, "sell" above it
+        self.threshold = threshold
+        self.state = state
+
+    @property
+    def rearm_level(self):
+        band = self.threshold * ALERT_HYSTERESIS_PCT / 100
+        return self.threshold + band if self.side == "buy" else self.threshold - band
+
+    def update(self, price, level=None):
+        """Feed the latest price; returns "triggered", "rearmed" or None"""
+        if self.state == "armed":
+            crossed = price < self.threshold if self.side == "buy" else price > self.threshold
+            if crossed:
+                self.state = "triggered"
+                return "triggered"
+        else:
+            recovered = price > self.rearm_level if self.side == "buy" else price < self.rearm_level
+            if recovered:
+                self.state = "armed"
+                return "rearmed"
+        return None
+
+    def message(self, event, price):
+        if event == "triggered" and self.side == "buy":
+            return f"📉 **{self.symbol}** price is **${price:.2f}**, below buy threshold ${self.threshold}!"
+        if event == "triggered":
+            return f"📈 **{self.symbol}** price is **${price:.2f}**, above sell threshold ${self.threshold}!"
+        return f"↩️ **{self.symbol}** is back at ${price:.2f}; {self.side} alert at ${self.threshold} re-armed."
+
+class IndicatorAlert:
+    """Fires when the price crosses an indicator level such as the 50-day SMA.
+    The state is the side of the level the price was last seen on; a move only
+    counts as a cross once it clears the level by the hysteresis band."""
+    def __init__(self, symbol, indicator, state=None):
+        self.symbol = symbol
+        self.indicator = indicator
+        self.state = state  # "above", "below", or None before the first reading
+        self.level = None
+
+    def update(self, price, level):
+        self.level = level
+        band = level * ALERT_HYSTERESIS_PCT / 100
+        if price > level + band:
+            side = "above"
+        elif price < level - band:
+            side = "below"
+        else:
+            return None
+        previous, self.state = self.state, side
+        # The first reading only records which side we start on
+        return "triggered" if previous is not None and previous != side else None
+
+    def message(self, event, price):
+        name = f"{INDICATOR_RE.match(self.indicator).group(1)}-day SMA"
+        emoji = "📈" if self.state == "above" else "📉"
+        return f"{emoji} **{self.symbol}** crossed {self.state} its {name} (${self.level:.2f}) at **${price:.2f}**!"
+
+class ThresholdEngine:
+    """Per-symbol alert state for the watchlist and the check cadence, saved so a
+    restart doesn't repeat alerts or forget !stockcadence"""
+    def __init__(self, filename=ALERTS_FILE):
+        self.filename = filename
+        self.alerts = {}  # "AAPL:buy" -> ThresholdAlert
+        self.check_minutes = STOCK_CHECK_MINUTES
+        try:
+            with open(filename, 'r') as f:
+                saved_state = json.load(f)
+            # Older files hold just the alerts
+            if "alerts" in saved_state:
+                self.check_minutes = saved_state.get("check_minutes", STOCK_CHECK_MINUTES)
+                saved_state = saved_state["alerts"]
+            for key, saved in saved_state.items():
+                symbol, name = key.split(":")
+                if "indicator" in saved:
+                    self.alerts[key] = IndicatorAlert(symbol, name, saved["state"])
+                else:
+                    self.alerts[key] = ThresholdAlert(symbol, name, saved["threshold"], saved["state"])
+        except FileNotFoundError:
+            pass
+
+    def save(self):
+        alerts = {key: {"indicator": alert.indicator, "state": alert.state} if alert.indicator
+                  else {"threshold": alert.threshold, "state": alert.state}
+                  for key, alert in self.alerts.items()}
+        with open(self.filename, 'w') as f:
+            json.dump({"check_minutes": self.check_minutes, "alerts": alerts}, f, indent=4)
+
+    def sync(self, watchlist):
+        """Match alerts to the watchlist; a new or changed threshold starts armed"""
+        wanted = {}
+        for symbol, limits in watchlist.items():
+            for side, field in (("buy", "buy_below"), ("sell", "sell_above")):
+                threshold = limits.get(field)
+                if threshold is None:
+                    continue
+                key = f"{symbol}:{side}"
+                alert = self.alerts.get(key)
+                if alert is None or alert.indicator or alert.threshold != threshold:
+                    alert = ThresholdAlert(symbol, side, threshold)
+                wanted[key] = alert
+            for indicator in limits.get("indicators", []):
+                key = f"{symbol}:{indicator}"
+                alert = self.alerts.get(key)
+                wanted[key] = alert if alert is not None and alert.indicator else IndicatorAlert(symbol, indicator)
+        changed = wanted.keys() != self.alerts.keys() or any(
+            wanted[key] is not self.alerts[key] for key in wanted)
+        self.alerts = wanted
+        return changed
+
+    def evaluate(self, watchlist, quotes, levels=None):
+        """Feed one round of quotes (and indicator levels keyed by (symbol, indicator));
+        returns the alert lines to post, triggers first"""
+        levels = levels or {}
+        changed = self.sync(watchlist)
+        triggered, rearmed = [], []
+        for alert in self.alerts.values():
+            quote = quotes.get(alert.symbol)
+            level = levels.get((alert.symbol, alert.indicator)) if alert.indicator else None
+            if quote is None or (alert.indicator and level is None):
+                continue
+            event = alert.update(quote.price, level)
+            if event == "triggered":
+                triggered.append(alert.message(event, quote.price))
+            elif event == "rearmed":
+                rearmed.append(alert.message(event, quote.price))
+            changed = changed or event is not None
+        if changed:
+            self.save()
+        return triggered + rearmed
+
+    def state(self, symbol, side):
+        alert = self.alerts.get(f"{symbol}:{side}")
+        return alert.state if alert else None
+
+threshold_engine = ThresholdEngine()
+
+### --- PRICE HISTORY & INDICATORS --- ###
+
+def sma(values, window):
+    """Simple moving average aligned with values; NaN until window values exist"""
+    out = np.full(len(values), np.nan)
+    if len(values) >= window:
+        sums = np.cumsum(np.insert(values, 0, 0.0))
+        out[window - 1:] = (sums[window:] - sums[:-window]) / window
+    return out
+
+def rsi(values, window=14):
+    """RSI from simple averages of gains and losses (Cutler's RSI), which vectorizes
+    where Wilder's recursive smoothing can't"""
+    deltas = np.diff(values)
+    gains = sma(np.clip(deltas, 0, None), window)
+    losses = sma(np.clip(-deltas, 0, None), window)
+    with np.errstate(divide="ignore", invalid="ignore"):
+        out = 100 - 100 / (1 + gains / losses)
+    out = np.where(losses == 0, np.where(gains == 0, 50.0, 100.0), out)
+    return np.concatenate(([np.nan], out))
+
+def pct_change(values, periods):
+    """Percent change over the last `periods` bars, or None without enough history"""
+    if len(values) <= periods:
+        return None
+    return (values[-1] / values[-1 - periods] - 1) * 100
+
+def indicator_value(history, indicator):
+    """Latest value of an indicator like "sma50" from a history array, or None"""
+    window = int(INDICATOR_RE.match(indicator).group(1))
+    closes = history[4]
+    if len(closes) < window:
+        return None
+    return float(closes[-window:].mean())
+
+class PriceHistory:
+    """Daily OHLCV per symbol as a columnar NumPy array: row 0 holds the day
+    (days since 1970-01-01), rows 1-5 open, high, low, close and volume.
+    Saved as PRICE_HISTORY_DIR/<SYMBOL>.npy; a refresh only downloads bars from
+    the last cached day on."""
+    def __init__(self, directory=PRICE_HISTORY_DIR, ttl=HISTORY_TTL):
+        self.directory = directory
+        self.ttl = ttl
+        self.arrays = {}     # symbol -> array
+        self.refreshed = {}  # symbol -> time of last successful refresh
+        self.locks = {}
+
+    def path(self, symbol):
+        return os.path.join(self.directory, f"{symbol}.npy")
+
+    def load(self, symbol):
+        if symbol not in self.arrays:
+            try:
+                self.arrays[symbol] = np.load(self.path(symbol))
+            except FileNotFoundError:
+                self.arrays[symbol] = np.empty((6, 0))
+        return self.arrays[symbol]
+
+    def save(self, symbol, array):
+        os.makedirs(self.directory, exist_ok=True)
+        temp_path = self.path(symbol) + ".tmp"
+        with open(temp_path, 'wb') as f:
+            np.save(f, array)
+        os.replace(temp_path, self.path(symbol))
+
+    @staticmethod
+    def download(symbol, start=None):
+        period = {"start": start} if start else {"period": HISTORY_PERIOD}
+        data = yf.download(symbol, interval="1d", auto_adjust=False, progress=False, **period)
+        if data is None or data.empty:
+            return np.empty((6, 0))
+        if data.columns.nlevels > 1:
+            data = data.xs(symbol, axis=1, level=1)
+        data = data.dropna(subset=["Close"])
+        days = data.index.values.astype("datetime64[D]").astype(np.int64).astype(float)
+        return np.vstack([days] + [data[field].to_numpy(dtype=float)
+                                   for field in ("Open", "High", "Low", "Close", "Volume")])
+
+    def refresh_blocking(self, symbol):
+        cached = self.load(symbol)
+        if cached.shape[1]:
+            # Fetch the last cached bar again too; it may have been taken mid-session
+            last_day = np.datetime64(int(cached[0, -1]), "D")
+            fresh = self.download(symbol, start=str(last_day))
+            if not fresh.shape[1]:
+                return cached
+            merged = np.hstack([cached[:, cached[0] < fresh[0, 0]], fresh])
+        else:
+            merged = self.download(symbol)
+            if not merged.shape[1]:
+                return cached
+        self.arrays[symbol] = merged
+        self.save(symbol, merged)
+        return merged
+
+    async def get(self, symbol):
+        """The symbol's history, topped up first if the last refresh is older than ttl"""
+        symbol = symbol.upper()
+        lock = self.locks.setdefault(symbol, asyncio.Lock())
+        async with lock:
+            if time.time() - self.refreshed.get(symbol, 0) > self.ttl and yahoo_limiter.check()[0]:
+                try:
+                    await asyncio.to_thread(self.refresh_blocking, symbol)
+                    self.refreshed[symbol] = time.time()
+                except Exception as e:
+                    print(f"Error refreshing price history for {symbol}: {e}")
+            return self.load(symbol)
+
+price_history = PriceHistory()
+
+def render_price_chart(symbol, history, days):
+    """PNG line chart of closes over the last `days` bars with the 50 and 200-day SMAs"""
+    closes = history[4]
+    # Averages are taken over the whole history so they start at the left edge
+    lines = [
+        ("Close", closes[-days:], (52, 152, 219)),
+        ("SMA 50", sma(closes, 50)[-days:], (241, 196, 15)),
+        ("SMA 200", sma(closes, 200)[-days:], (155, 89, 182)),
+    ]
+    dates = history[0][-days:]
+
+    width, height, margin = 900, 420, 70
+    image = Image.new("RGB", (width, height), (32, 34, 37))
+    draw = ImageDraw.Draw(image)
+    draw.text((margin, 15), f"{symbol} - last {len(dates)} trading days", fill=(255, 255, 255))
+
+    visible = np.concatenate([values[~np.isnan(values)] for _, values, _ in lines])
+    low, high = float(visible.min()), float(visible.max())
+    span = max(high - low, 0.01)
+    left, top, right, bottom = margin, 45, width - 20, height - 40
+    draw.rectangle((left, top, right, bottom), outline=(79, 84, 92))
+    draw.text((5, top), f"${high:,.2f}", fill=(185, 187, 190))
+    draw.text((5, bottom - 12), f"${low:,.2f}", fill=(185, 187, 190))
+
+    step = (right - left) / max(len(dates) - 1, 1)
+    for i, (label, values, color) in enumerate(lines):
+        points = [(left + j * step, bottom - (value - low) / span * (bottom - top))
+                  for j, value in enumerate(values) if not np.isnan(value)]
+        if len(points) > 1:
+            draw.line(points, fill=color, width=2)
+        draw.text((left + 10 + i * 110, top + 8), label, fill=color)
+
+    footer_y = height - 25
+    draw.text((left, footer_y), str(np.datetime64(int(dates[0]), "D")), fill=(185, 187, 190))
+    draw.text((right - 70, footer_y), str(np.datetime64(int(dates[-1]), "D")), fill=(185, 187, 190))
+
+    buffer = io.BytesIO()
+    image.save(buffer, format="PNG")
+    return buffer.getvalue()
+
 ### --- ENHANCED UI VIEWS --- ###
 
 class MainControlPanel(ui.View):
@@ -160,21 +917,20 @@ class MainControlPanel(ui.View):
                 "📉 Your stock watchlist is empty. Use `!addstock SYMBOL` to add stocks.", ephemeral=True)
             return
 
+        # A batch fetch can take a few seconds, longer than an interaction may wait
+        await interaction.response.defer(ephemeral=True, thinking=True)
         embed = Embed(title="📈 Stock Prices", color=0xe74c3c)
         stock_info = []
 
-        for symbol in list(stocks.keys())[:10]:  # Limit to avoid hitting API too hard
-            try:
-                stock = yf.Ticker(symbol)
-                price = stock.fast_info.get('lastPrice') or stock.info.get('regularMarketPrice')
-                if price is None:
-                    price = "N/A"
-                stock_info.append(f"**{symbol}**: ${price}")
-            except Exception as e:
-                stock_info.append(f"❌ **{symbol}**: Error fetching ({type(e).__name__})")
-
-        embed.description = "\n".join(stock_info)
-        await interaction.response.send_message(embed=embed, ephemeral=True)
+        quotes = await quote_engine.get(list(stocks.keys()))
+        for symbol, quote in quotes.items():
+            if quote is None:
+                stock_info.append(f"❌ **{symbol}**: N/A")
+            else:
+                stock_info.append(f"**{symbol}**: {quote.describe()}")
+
+        embed.description = join_lines(stock_info, 4096)
+        await interaction.followup.send(embed=embed, ephemeral=True)
 
 
 
@@ -200,7 +956,11 @@ class MainControlPanel(ui.View):
             name="📈 Stock Commands",
             value="`!addstock <SYMBOL> [buy_below] [sell_above]` - Add stock to watchlist\n"
                   "`!removestock <SYMBOL>` - Remove stock from watchlist\n"
-                  "`!stocks` - View all stocks in watchlist",
+                  "`!stocks` - View all stocks in watchlist\n"
+                  "`!stockcadence <minutes>` - Change how often alerts are checked (owner only)\n"
+                  "`!addalert <SYMBOL> sma50` / `!removealert` - Alert on moving-average crosses\n"
+                  "`!chart <SYMBOL> [period]` - Price chart\n"
+                  "`!indicators <SYMBOL>` - SMA, RSI and returns",
             inline=False
         )
         
@@ -232,7 +992,7 @@ class MainControlPanel(ui.View):
             value="• Use buttons for quick actions\n"
                   "• Date format: YYYY-MM-DD (e.g., 2025-07-10)\n"
                   "• Stock symbols should be uppercase (e.g., AAPL)\n"
-                  "• The bot checks stocks every 15 minutes\n"
+                  f"• The bot checks stocks every {threshold_engine.check_minutes} minutes while the market is open\n"
                   "• Weather API has monthly limits - use wisely!",
             inline=False
         )
@@ -354,18 +1114,11 @@ class WeatherModal(ui.Modal, title="Get Weather"):
     city = ui.TextInput(label="City", placeholder="Leave empty for Windsor, ON", required=False)
 
     async def on_submit(self, interaction: Interaction):
-        city = self.city.value or "Windsor, Ontario"
+        city = self.city.value or DEFAULT_CITY
         
-        allowed, message = can_make_weather_call()
-        if not allowed:
-            await interaction.response.send_message(message, ephemeral=True)
-            return
-        
-        url = f"http://api.openweathermap.org/data/2.5/weather?q={city}&appid={OPENWEATHER_API_KEY}&units=metric"
-        response = requests.get(url).json()
-        
-        if response.get("cod") != 200:
-            await interaction.response.send_message("❌ Could not get weather for that location.", ephemeral=True)
+        response, message = await weather_client.get(city, interaction.user.id)
+        if response is None:
+            await interaction.response.send_message(message or "❌ Could not get weather for that location.", ephemeral=True)
             return
         
         weather_desc = response['weather'][0]['description'].capitalize()
@@ -531,19 +1284,14 @@ async def edit_task(ctx, category: str, date: str, task_number: int, *, new_task
 async def get_weather(ctx, *, city: str = None):
     """Get current weather for a city or default to Windsor, Ontario if none provided."""
     if not city:
-        city = "Windsor, Ontario"
-    allowed, message = can_make_weather_call()
-    if not allowed:
-        await ctx.send(message)
+        city = DEFAULT_CITY
+    response, message = await weather_client.get(city, ctx.author.id)
+    if response is None:
+        await ctx.send(message or "❌ Could not get weather for that location.")
         return
     elif message:
         await ctx.send(message)
 
-    url = f"http://api.openweathermap.org/data/2.5/weather?q={city}&appid={OPENWEATHER_API_KEY}&units=metric"
-    response = requests.get(url).json()
-    if response.get("cod") != 200:
-        await ctx.send("❌ Could not get weather for that location.")
-        return
     weather_desc = response['weather'][0]['description'].capitalize()
     temp = response['main']['temp']
     humidity = response['main']['humidity']
@@ -554,7 +1302,8 @@ async def get_weather(ctx, *, city: str = None):
 async def add_stock(ctx, symbol: str, buy_below: float = None, sell_above: float = None):
     """Add a stock to watchlist with optional buy/sell thresholds. Usage: !addstock AAPL 150 170"""
     symbol = symbol.upper()
-    stocks[symbol] = {"buy_below": buy_below, "sell_above": sell_above}
+    # Keep any indicator alerts already set on the symbol
+    stocks[symbol] = {**stocks.get(symbol, {}), "buy_below": buy_below, "sell_above": sell_above}
     save_stocks()
     await ctx.send(f"📈 Added stock **{symbol}** to watchlist. Buy below: {buy_below}, Sell above: {sell_above}")
 
@@ -577,9 +1326,109 @@ async def list_stocks(ctx):
         return
     msg = "**Stock Watchlist:**\n"
     for s, v in stocks.items():
-        msg += f"{s} — Buy below: {v['buy_below']}, Sell above: {v['sell_above']}\n"
+        fired = [side for side in ("buy", "sell") if threshold_engine.state(s, side) == "triggered"]
+        msg += f"{s} — Buy below: {v['buy_below']}, Sell above: {v['sell_above']}"
+        if v.get("indicators"):
+            msg += f", Crosses: {', '.join(v['indicators'])}"
+        msg += f" (🔔 {'/'.join(fired)} alert sent, waiting to re-arm)\n" if fired else "\n"
     await ctx.send(msg)
 
+@bot.command(name='addalert')
+async def add_indicator_alert(ctx, symbol: str, indicator: str):
+    """Alert when the price crosses an indicator. Usage: !addalert AAPL sma50"""
+    symbol, indicator = symbol.upper(), indicator.lower()
+    if not INDICATOR_RE.match(indicator) or int(INDICATOR_RE.match(indicator).group(1)) < 2:
+        await ctx.send("❌ Indicator must be a moving average like `sma50` or `sma200`.")
+        return
+    limits = stocks.setdefault(symbol, {"buy_below": None, "sell_above": None})
+    if indicator not in limits.setdefault("indicators", []):
+        limits["indicators"].append(indicator)
+    save_stocks()
+    await ctx.send(f"🔔 Will alert when **{symbol}** crosses its {indicator.upper()}.")
+
+@bot.command(name='removealert')
+async def remove_indicator_alert(ctx, symbol: str, indicator: str):
+    """Stop an indicator alert. Usage: !removealert AAPL sma50"""
+    symbol, indicator = symbol.upper(), indicator.lower()
+    indicators = stocks.get(symbol, {}).get("indicators", [])
+    if indicator not in indicators:
+        await ctx.send("❌ No such alert on that stock.")
+        return
+    indicators.remove(indicator)
+    save_stocks()
+    await ctx.send(f"🗑️ Removed the {indicator.upper()} alert for **{symbol}**.")
+
+@bot.command(name='chart')
+async def price_chart(ctx, symbol: str, period: str = "6m"):
+    """Price chart with 50/200-day averages. Usage: !chart AAPL [1m|3m|6m|1y|2y|5y]"""
+    symbol, period = symbol.upper(), period.lower()
+    if period not in CHART_PERIODS:
+        await ctx.send(f"❌ Period must be one of: {', '.join(CHART_PERIODS)}")
+        return
+    async with ctx.typing():
+        history = await price_history.get(symbol)
+        if history.shape[1] < 2:
+            await ctx.send(f"❌ No price history found for **{symbol}**.")
+            return
+        png = await asyncio.to_thread(render_price_chart, symbol, history, CHART_PERIODS[period])
+    await ctx.send(file=discord.File(io.BytesIO(png), filename=f"{symbol}_{period}.png"))
+
+@bot.command(name='indicators')
+async def show_indicators(ctx, symbol: str):
+    """Moving averages, RSI and returns for a stock. Usage: !indicators AAPL"""
+    symbol = symbol.upper()
+    async with ctx.typing():
+        history = await price_history.get(symbol)
+    if history.shape[1] < 2:
+        await ctx.send(f"❌ No price history found for **{symbol}**.")
+        return
+
+    closes = history[4]
+    price = closes[-1]
+    quote = (await quote_engine.get([symbol]))[symbol]
+    if quote is not None:
+        price = quote.price
+
+    embed = Embed(title=f"📊 {symbol} Indicators", color=0x3498db)
+    embed.add_field(name="Price", value=f"${price:,.2f}", inline=True)
+    current_rsi = rsi(closes)[-1]
+    if not np.isnan(current_rsi):
+        mood = " (overbought)" if current_rsi >= 70 else " (oversold)" if current_rsi <= 30 else ""
+        embed.add_field(name="RSI (14)", value=f"{current_rsi:.1f}{mood}", inline=True)
+    year = closes[-252:]
+    embed.add_field(name="52-Week Range", value=f"${year.min():,.2f} – ${year.max():,.2f}", inline=True)
+
+    averages = []
+    for window in (20, 50, 200):
+        if len(closes) >= window:
+            average = indicator_value(history, f"sma{window}")
+            averages.append(f"SMA {window}: ${average:,.2f} ({'above' if price >= average else 'below'})")
+    if averages:
+        embed.add_field(name="Moving Averages", value="\n".join(averages), inline=False)
+
+    changes = []
+    for label, bars in (("1 day", 1), ("1 week", 5), ("1 month", 21), ("3 months", 63), ("1 year", 252)):
+        change = pct_change(closes, bars)
+        if change is not None:
+            changes.append(f"{label}: {change:+.2f}%")
+    if changes:
+        embed.add_field(name="Change", value="\n".join(changes), inline=False)
+
+    embed.set_footer(text=f"Daily closes through {np.datetime64(int(history[0, -1]), 'D')}")
+    await ctx.send(embed=embed)
+
+@bot.command(name='stockcadence')
+@commands.is_owner()
+async def set_stock_cadence(ctx, minutes: int):
+    """Change how often stock thresholds are checked (bot owner only). Usage: !stockcadence 5"""
+    if minutes < 1:
+        await ctx.send("❌ Cadence must be at least 1 minute.")
+        return
+    threshold_engine.check_minutes = minutes
+    threshold_engine.save()
+    stock_price_check.change_interval(minutes=minutes)
+    await ctx.send(f"⏱️ Stock thresholds will be checked every {minutes} minutes while the market is open.")
+
 ### --- NEW REMINDER COMMANDS --- ###
 
 @bot.command(name='remind')
@@ -643,7 +1492,7 @@ async def show_stats(ctx):
     total_tasks = sum(len(tasks) for cat in schedule.values() for tasks in cat.values())
     total_stocks = len(stocks)
     total_reminders = len(reminders)
-    weather_calls = weather_call_log.get("monthly_count", 0)
+    weather_calls = weather_limiter.used("month")
     
     embed = Embed(title="📊 Bot Statistics", color=0x9b59b6)
     embed.add_field(name="📋 Total Tasks", value=str(total_tasks), inline=True)
@@ -655,32 +1504,38 @@ async def show_stats(ctx):
 
 ### --- BACKGROUND TASKS --- ###
 
-@tasks.loop(minutes=15)
+@tasks.loop(minutes=STOCK_CHECK_MINUTES)
 async def stock_price_check():
-    """Background task to check stock prices and alert if thresholds hit."""
+    """Background task to check stock prices and alert when thresholds are crossed."""
+    # Prices don't move outside the session, so don't spend quote calls on them
+    if not market_is_open():
+        return
     channel = bot.get_channel(CHANNEL_ID)
     if not channel:
         return
 
-    alerts = []
-    for symbol, limits in stocks.items():
-        try:
-            stock = yf.Ticker(symbol)
-            price = stock.info.get('regularMarketPrice')
-            if price is None:
-                continue
-            buy = limits.get('buy_below')
-            sell = limits.get('sell_above')
+    watched = {symbol: limits for symbol, limits in stocks.items()
+               if limits.get('buy_below') is not None or limits.get('sell_above') is not None
+               or limits.get('indicators')}
+    if not watched:
+        return
+
+    quotes = await quote_engine.get(list(watched.keys()))
 
-            if buy is not None and price < buy:
-                alerts.append(f"📉 **{symbol}** price is **${price:.2f}**, below buy threshold ${buy}!")
-            if sell is not None and price > sell:
-                alerts.append(f"📈 **{symbol}** price is **${price:.2f}**, above sell threshold ${sell}!")
-        except Exception as e:
-            print(f"Error fetching stock {symbol}: {e}")
+    # Indicator levels come from the cached daily history, topped up a few times a day
+    with_indicators = [symbol for symbol, limits in watched.items() if limits.get('indicators')]
+    histories = await asyncio.gather(*(price_history.get(symbol) for symbol in with_indicators))
+    levels = {}
+    for symbol, history in zip(with_indicators, histories):
+        for indicator in watched[symbol]['indicators']:
+            level = indicator_value(history, indicator)
+            if level is not None:
+                levels[(symbol, indicator)] = level
 
+    alerts = threshold_engine.evaluate(watched, quotes, levels)
     if alerts:
-        await channel.send("\n".join(alerts))
+        await channel_send_limiter.wait(channel.id)
+        await channel.send(join_lines(["🔔 **Stock alerts**", *alerts], 2000))
 
 @tasks.loop(minutes=1)
 async def check_reminders():
@@ -703,6 +1558,8 @@ async def check_reminders():
         save_reminders()
         for reminder in due_reminders:
             embed = Embed(title="⏰ Reminder!", description=reminder['message'], color=0xf39c12)
+            # Many reminders falling due at once shouldn't be fired off in one burst
+            await channel_send_limiter.wait(channel.id)
             await channel.send(f"<@{bot.user.id}>", embed=embed)
 
 @bot.command(name='daily')
@@ -713,31 +1570,23 @@ async def daily_summary(ctx):
         await ctx.send("❌ Channel not found.")
         return
 
-    city = "Windsor, Ontario"
-    allowed, message = can_make_weather_call()
-    if not allowed:
-        weather_msg = message
-    else:
+    city = DEFAULT_CITY
+    w, message = await weather_client.get(city)
+    if w is not None:
         if message:
             await ctx.send(message)
-        weather_url = f"http://api.openweathermap.org/data/2.5/weather?q={city}&appid={OPENWEATHER_API_KEY}&units=metric"
-        w = requests.get(weather_url).json()
-        if w.get("cod") == 200:
-            weather_desc = w['weather'][0]['description'].capitalize()
-            temp = w['main']['temp']
-            weather_msg = f"🌤 Weather in **{city}**: {weather_desc}, {temp}°C"
-        else:
-            weather_msg = "Could not get weather info."
+        weather_desc = w['weather'][0]['description'].capitalize()
+        temp = w['main']['temp']
+        weather_msg = f"🌤 Weather in **{city}**: {weather_desc}, {temp}°C"
+    else:
+        weather_msg = message or "Could not get weather info."
 
     # Stock summary
-    stock_msg = ""
-    for symbol in stocks:
-        try:
-            price = yf.Ticker(symbol).info.get('regularMarketPrice')
-            if price:
-                stock_msg += f"{symbol}: ${price:.2f}\n"
-        except:
-            stock_msg += f"{symbol}: Error fetching price\n"
+    quotes = await quote_engine.get(list(stocks.keys()))
+    stock_msg = join_lines([
+        f"{symbol}: Error fetching price" if quote is None else f"{symbol}: {quote.describe()}"
+        for symbol, quote in quotes.items()
+    ], 1024)
     if not stock_msg:
         stock_msg = "No stocks in watchlist."
 
@@ -771,6 +1620,11 @@ async def daily_summary(ctx):
     
     await channel.send(embed=embed)
 
+@tasks.loop(seconds=RATE_LIMIT_FLUSH_SECONDS)
+async def flush_rate_limits():
+    """Persist quota counters in one write per interval instead of one per call."""
+    weather_limiter.save()
+
 @tasks.loop(hours=8)
 async def send_status_panel():
     """Send the status panel every 8 hours."""
@@ -789,9 +1643,11 @@ async def on_ready():
     print(f'Servers: {len(bot.guilds)}')
     
     # Start background tasks
+    stock_price_check.change_interval(minutes=threshold_engine.check_minutes)
     stock_price_check.start()
     check_reminders.start()
     send_status_panel.start()
+    flush_rate_limits.start()
     
     # Send initial status panel
     channel = bot.get_channel(CHANNEL_ID)
@@ -811,9 +1667,20 @@ async def on_command_error(ctx, error):
         await ctx.send(f"❌ Missing required argument: {error.param}")
     elif isinstance(error, commands.BadArgument):
         await ctx.send("❌ Invalid argument provided.")
+    elif isinstance(error, commands.NotOwner):
+        await ctx.send("❌ Only the bot owner can use this command.")
     else:
         await ctx.send(f"❌ An error occurred: {str(error)}")
         print(f"Error: {error}")
 
 # Run the bot
-bot.run('MTM5MjkyMDkwMzI5NzI2OTkyMw.GkF8G7.X4Nhcv3R7aeLmgbX4a7ip-rLIN-2AqKuOxWSAE')
\ No newline at end of file
+async def main():
+    async with bot:
+        try:
+            await bot.start('MTM5MjkyMDkwMzI5NzI2OTkyMw.GkF8G7.X4Nhcv3R7aeLmgbX4a7ip-rLIN-2AqKuOxWSAE')
+        finally:
+            await weather_client.close()
+            weather_limiter.save()
+
+if __name__ == "__main__":
+    asyncio.run(main())
\ No newline at end of file
@@ -1,42 +1,917 @@
 import discord
+import aiohttp
 from discord.ext import commands
 from discord.ui import View, Button, Modal, TextInput, Select
 import json
+import os
+import io
+import csv
+import sys
+import argparse
+import tempfile
+import sqlite3
 import asyncio
+import time
+import math
+from abc import ABC, abstractmethod
+from collections import Counter
+from contextlib import contextmanager, nullcontext
 from datetime import datetime, timedelta
 import re
 from typing import Dict, List, Optional
 
-class ProjectData:
-    """Handles project data persistence"""
+PROJECTS_DB = "projects.db"
+PROJECT_STORAGE_BACKEND = "sqlite"  # "sqlite", "journal" (projects.json + write-behind journal) or "json"
+JOURNAL_FLUSH_MS = 200              # Journal records are fsynced in batches this often
+JOURNAL_COMPACT_MS = 60_000         # Fold the journal into projects.json at least this often...
+JOURNAL_COMPACT_OPS = 500           # ...or once this many records have piled up
+BOARD_MESSAGES_FILE = "project_boards.json"  # channel id -> pinned board message id
+BOARD_EDIT_DEBOUNCE = 2.0           # Seconds to gather changes before editing boards
+BOARD_EDIT_MIN_INTERVAL = 5.0       # Minimum seconds between two rounds of board edits
+PROJECT_EVENTS_FILE = "project_events.jsonl"  # Append-only history of every project change
+IMPORT_BATCH_SIZE = 200             # Projects written per storage transaction on import
+EXPORT_SPOOL_BYTES = 1024 * 1024    # Exports larger than this are spooled to a temp file
+IMPORT_CHUNK_BYTES = 64 * 1024      # Attachment bytes downloaded at a time on import
+IMPORT_PROGRESS_SECONDS = 2         # Min time between import progress message edits
+
+class ProjectStorage(ABC):
+    """Interface for where ProjectData keeps projects"""
+    @abstractmethod
+    def load_all(self) -> Dict:
+        ...
+
+    @abstractmethod
+    def create(self, project_id: str, project: Dict):
+        ...
+
+    def create_many(self, projects: Dict):
+        """Create or replace several projects; backends may write them in one go"""
+        for project_id, project in projects.items():
+            self.create(project_id, project)
+
+    @abstractmethod
+    def update(self, project_id: str, updates: Dict, project: Dict):
+        """Persist updates; project is the full in-memory record after applying them"""
+
+    @abstractmethod
+    def delete(self, project_id: str):
+        ...
+
+    def load_id_sequence(self) -> int:
+        """Last project number handed out, for backends that remember it"""
+        return 0
+
+    def save_id_sequence(self, value: int):
+        pass
+
+    def bulk(self):
+        """Context for a run of writes that may be persisted together at the end"""
+        return nullcontext()
+
+    async def close(self):
+        pass
+
+class JsonProjectStorage(ProjectStorage):
+    """Original storage: the whole board rewritten to one JSON file on every change"""
+    META_KEY = "__meta__"  # Non-project entry in projects.json holding the id sequence
+
     def __init__(self, filename="projects.json"):
         self.filename = filename
-        self.projects = self.load_projects()
-    
-    def load_projects(self) -> Dict:
+        self.projects = {}
+        self.id_sequence = 0
+
+    def load_all(self) -> Dict:
         try:
             with open(self.filename, 'r') as f:
-                return json.load(f)
+                self.projects = json.load(f)
         except FileNotFoundError:
-            return {}
-    
-    def save_projects(self):
+            self.projects = {}
+        meta = self.projects.pop(self.META_KEY, {})
+        self.id_sequence = meta.get("id_sequence", 0)
+        return self.projects
+
+    def dump(self) -> Dict:
+        return {**self.projects, self.META_KEY: {"id_sequence": self.id_sequence}}
+
+    def save(self):
         with open(self.filename, 'w') as f:
-            json.dump(self.projects, f, indent=2)
+            json.dump(self.dump(), f, indent=2)
+
+    def load_id_sequence(self) -> int:
+        return self.id_sequence
+
+    def save_id_sequence(self, value: int):
+        # Written out with the create that always follows
+        self.id_sequence = value
+
+    def create(self, project_id: str, project: Dict):
+        self.projects[project_id] = project
+        self.save()
+
+    def create_many(self, projects: Dict):
+        self.projects.update(projects)
+        self.save()
+
+    def update(self, project_id: str, updates: Dict, project: Dict):
+        self.projects[project_id] = project
+        self.save()
+
+    def delete(self, project_id: str):
+        self.projects.pop(project_id, None)
+        self.save()
+
+class WriteBehind:
+    """Background task that calls flush() every interval while it reports more
+    work, for stores that batch their writes. kick() starts it when needed;
+    without a running event loop (e.g. a script) it calls flush_sync() right
+    away instead."""
+    def __init__(self, interval: float, flush, flush_sync):
+        self.interval = interval
+        self.flush = flush            # async, run under the lock; returns True while there's more to do
+        self.flush_sync = flush_sync
+        self.lock = None
+        self.task = None
+
+    def kick(self):
+        if self.task is not None and not self.task.done():
+            return
+        try:
+            loop = asyncio.get_running_loop()
+        except RuntimeError:
+            self.flush_sync()
+            return
+        self.lock = self.lock or asyncio.Lock()
+        self.task = loop.create_task(self.run())
+
+    async def run(self):
+        while True:
+            await asyncio.sleep(self.interval)
+            async with self.lock:
+                if not await self.flush():
+                    return  # Idle; the next kick() restarts the task
+
+    async def stop(self):
+        """Stop the task, waiting out a write in progress rather than cutting it off"""
+        if self.task is not None and not self.task.done():
+            async with self.lock:
+                self.task.cancel()
+            try:
+                await self.task
+            except asyncio.CancelledError:
+                pass
+
+class JournaledJsonProjectStorage(JsonProjectStorage):
+    """projects.json as a snapshot plus an append-only journal of changes.
+
+    Each mutation is serialized into an in-memory batch immediately; a background
+    task appends batches to the journal and fsyncs them, and periodically writes
+    a fresh snapshot and truncates the journal. Without a running event loop
+    (e.g. a script) records are appended to the journal straight away instead.
+    On startup the journal is replayed over the snapshot. Replaying is
+    idempotent, so a crash between writing the snapshot and truncating the
+    journal is harmless."""
+    def __init__(self, filename="projects.json", flush_ms=JOURNAL_FLUSH_MS,
+                 compact_ms=JOURNAL_COMPACT_MS, compact_ops=JOURNAL_COMPACT_OPS):
+        super().__init__(filename)
+        self.journal_path = f"{filename}.journal"
+        self.flush_interval = flush_ms / 1000
+        self.compact_interval = compact_ms / 1000
+        self.compact_ops = compact_ops
+        self.pending = []           # Serialized records not yet written
+        self.journal_ops = 0        # Records in the journal since the last snapshot
+        self.last_compacted = time.monotonic()
+        self.flusher = WriteBehind(self.flush_interval, self.flush, self.append_sync)
+        self.holding = False        # Inside bulk(): queue records, write them on exit
+
+    def load_all(self) -> Dict:
+        super().load_all()
+        replayed = 0
+        try:
+            with open(self.journal_path, 'r') as f:
+                for line in f:
+                    try:
+                        record = json.loads(line)
+                    except json.JSONDecodeError:
+                        break  # Torn final write from a crash; everything before it is intact
+                    self.apply(record)
+                    replayed += 1
+        except FileNotFoundError:
+            pass
+        self.journal_ops = replayed
+        if replayed:
+            print(f"✅ Replayed {replayed} journal records into {self.filename}")
+        return self.projects
+
+    def apply(self, record: Dict):
+        project_id = record.get("id")
+        if record["op"] == "sequence":
+            self.id_sequence = max(self.id_sequence, record["value"])
+        elif record["op"] == "create":
+            self.projects[project_id] = record["project"]
+        elif record["op"] == "update" and project_id in self.projects:
+            self.projects[project_id].update(record["updates"])
+        elif record["op"] == "delete":
+            self.projects.pop(project_id, None)
+
+    def record(self, record: Dict):
+        # Serialize now: callers keep mutating the same dicts afterwards
+        self.pending.append(json.dumps(record) + "\n")
+        if not self.holding:
+            self.flusher.kick()
+
+    @contextmanager
+    def bulk(self):
+        self.holding = True
+        try:
+            yield
+        finally:
+            self.holding = False
+            self.flusher.kick()
+
+    def create(self, project_id: str, project: Dict):
+        self.projects[project_id] = project
+        self.record({"op": "create", "id": project_id, "project": project})
+
+    # Journal records are already batched, so skip the snapshot rewrite
+    create_many = ProjectStorage.create_many
+
+    def update(self, project_id: str, updates: Dict, project: Dict):
+        self.projects[project_id] = project
+        self.record({"op": "update", "id": project_id, "updates": updates})
+
+    def delete(self, project_id: str):
+        self.projects.pop(project_id, None)
+        self.record({"op": "delete", "id": project_id})
+
+    def save_id_sequence(self, value: int):
+        self.id_sequence = value
+        self.record({"op": "sequence", "value": value})
+
+    def write_journal(self, lines: List[str]):
+        with open(self.journal_path, 'a') as f:
+            f.writelines(lines)
+            f.flush()
+            os.fsync(f.fileno())
+
+    def write_snapshot(self, snapshot: str):
+        tmp = f"{self.filename}.tmp"
+        with open(tmp, 'w') as f:
+            f.write(snapshot)
+            f.flush()
+            os.fsync(f.fileno())
+        os.replace(tmp, self.filename)
+        # Only now is it safe to drop the journal
+        with open(self.journal_path, 'w') as f:
+            f.flush()
+            os.fsync(f.fileno())
+
+    def take_snapshot(self) -> str:
+        # Taken together with clearing pending, so the snapshot covers exactly
+        # the records being dropped
+        self.pending = []
+        self.journal_ops = 0
+        self.last_compacted = time.monotonic()
+        return json.dumps(self.dump(), indent=2)
+
+    def should_compact(self) -> bool:
+        return self.journal_ops > 0 and (
+            self.journal_ops >= self.compact_ops
+            or time.monotonic() - self.last_compacted >= self.compact_interval
+        )
+
+    async def flush(self) -> bool:
+        if self.pending:
+            lines, self.pending = self.pending, []
+            self.journal_ops += len(lines)
+            await asyncio.to_thread(self.write_journal, lines)
+        if self.should_compact():
+            await asyncio.to_thread(self.write_snapshot, self.take_snapshot())
+        # Records in the journal still need compacting eventually
+        return bool(self.pending or self.journal_ops)
+
+    def append_sync(self):
+        """Append pending records to the journal now, compacting only when due"""
+        if self.pending:
+            lines, self.pending = self.pending, []
+            self.journal_ops += len(lines)
+            self.write_journal(lines)
+        if self.should_compact():
+            self.write_snapshot(self.take_snapshot())
+
+    def flush_sync(self):
+        """Write everything out now, compacting into projects.json"""
+        if self.pending or self.journal_ops:
+            self.write_snapshot(self.take_snapshot())
+
+    async def close(self):
+        await self.flusher.stop()
+        self.flush_sync()
+
+class SqliteProjectStorage(ProjectStorage):
+    """Projects in normalized SQLite tables; each change is a small single transaction"""
+    COLUMNS = ("name", "description", "dimensions", "coordinates", "estimated_time", "creator",
+               "creator_id", "status", "progress", "created_at", "started_at", "completed_at")
+    TABLE_FIELDS = ("collaborators", "materials", "notes", "material_ledger")  # Stored in tables of their own
+
+    SCHEMA = """
+    CREATE TABLE IF NOT EXISTS projects (
+        id TEXT PRIMARY KEY,
+        name TEXT NOT NULL,
+        description TEXT,
+        dimensions TEXT,
+        coordinates TEXT,
+        estimated_time TEXT,
+        creator TEXT,
+        creator_id INTEGER,
+        status TEXT,
+        progress INTEGER DEFAULT 0,
+        created_at TEXT,
+        started_at TEXT,
+        completed_at TEXT,
+        extra TEXT  -- JSON for any fields without a column of their own
+    );
+    CREATE TABLE IF NOT EXISTS collaborators (
+        project_id TEXT NOT NULL REFERENCES projects(id) ON DELETE CASCADE,
+        position INTEGER NOT NULL,
+        username TEXT NOT NULL,
+        PRIMARY KEY (project_id, username)
+    );
+    CREATE TABLE IF NOT EXISTS materials (
+        project_id TEXT NOT NULL REFERENCES projects(id) ON DELETE CASCADE,
+        position INTEGER NOT NULL,
+        line TEXT NOT NULL,
+        PRIMARY KEY (project_id, position)
+    );
+    CREATE TABLE IF NOT EXISTS notes (
+        id INTEGER PRIMARY KEY AUTOINCREMENT,
+        project_id TEXT NOT NULL REFERENCES projects(id) ON DELETE CASCADE,
+        timestamp TEXT,
+        user TEXT,
+        note TEXT
+    );
+    CREATE INDEX IF NOT EXISTS notes_project ON notes(project_id, id);
+    CREATE TABLE IF NOT EXISTS material_ledger (
+        project_id TEXT NOT NULL REFERENCES projects(id) ON DELETE CASCADE,
+        item_id TEXT NOT NULL,
+        position INTEGER NOT NULL,
+        name TEXT NOT NULL,
+        needed INTEGER NOT NULL DEFAULT 0,
+        gathered INTEGER NOT NULL DEFAULT 0,
+        PRIMARY KEY (project_id, item_id)
+    );
+    CREATE TABLE IF NOT EXISTS meta (
+        key TEXT PRIMARY KEY,
+        value TEXT
+    );
+    """
+
+    def __init__(self, db_path=PROJECTS_DB, import_json: Optional[str] = "projects.json"):
+        self.db_path = db_path
+        self.conn = sqlite3.connect(db_path, check_same_thread=False)
+        self.conn.row_factory = sqlite3.Row
+        self.conn.execute("PRAGMA journal_mode=WAL")
+        self.conn.execute("PRAGMA synchronous=NORMAL")
+        self.conn.execute("PRAGMA foreign_keys=ON")
+        self.conn.executescript(self.SCHEMA)
+        self.migrate_ledgers()
+        if import_json:
+            self.import_json(import_json)
+
+    def import_json(self, filename: str):
+        """One-time copy of an existing projects.json into the database"""
+        if self.conn.execute("SELECT 1 FROM meta WHERE key = 'json_imported'").fetchone():
+            return
+        try:
+            with open(filename, 'r') as f:
+                projects = json.load(f)
+        except FileNotFoundError:
+            projects = {}
+        meta = projects.pop(JsonProjectStorage.META_KEY, {})
+
+        with self.conn:
+            for project_id, project in projects.items():
+                self.insert_project(project_id, project)
+            self.conn.execute(
+                "INSERT INTO meta (key, value) VALUES ('json_imported', ?)",
+                (f"{filename}: {len(projects)} projects at {datetime.now().isoformat()}",)
+            )
+        if meta.get("id_sequence"):
+            self.save_id_sequence(max(self.load_id_sequence(), meta["id_sequence"]))
+        if projects:
+            print(f"✅ Imported {len(projects)} projects from {filename} into {self.db_path}")
+
+    def migrate_ledgers(self):
+        """Move material ledgers out of the extra JSON, where they lived before
+        having a table of their own"""
+        if self.conn.execute("SELECT 1 FROM meta WHERE key = 'ledger_table'").fetchone():
+            return
+        with self.conn:
+            for row in self.conn.execute("SELECT id, extra FROM projects WHERE extra LIKE '%material_ledger%'").fetchall():
+                extra = json.loads(row["extra"])
+                ledger = extra.pop("material_ledger", None)
+                if ledger is None:
+                    continue
+                self.replace_ledger(row["id"], ledger)
+                self.conn.execute("UPDATE projects SET extra = ? WHERE id = ?",
+                                  (json.dumps(extra) if extra else None, row["id"]))
+            self.conn.execute("INSERT INTO meta (key, value) VALUES ('ledger_table', ?)", (datetime.now().isoformat(),))
+
+    def split_fields(self, project: Dict):
+        columns = {key: project[key] for key in self.COLUMNS if key in project}
+        extra = {key: value for key, value in project.items()
+                 if key not in self.COLUMNS and key not in self.TABLE_FIELDS and key != "id"}
+        return columns, extra
+
+    def insert_project(self, project_id: str, project: Dict):
+        columns, extra = self.split_fields(project)
+        names = ["id", *columns, "extra"]
+        self.conn.execute(
+            f"INSERT OR REPLACE INTO projects ({', '.join(names)}) VALUES ({', '.join('?' * len(names))})",
+            (project_id, *columns.values(), json.dumps(extra) if extra else None)
+        )
+        self.replace_collaborators(project_id, project.get("collaborators", []))
+        self.replace_materials(project_id, project.get("materials", []))
+        self.conn.execute("DELETE FROM notes WHERE project_id = ?", (project_id,))
+        self.insert_notes(project_id, project.get("notes", []))
+        self.replace_ledger(project_id, project.get("material_ledger", {}))
+
+    def replace_collaborators(self, project_id: str, collaborators: List[str]):
+        self.conn.execute("DELETE FROM collaborators WHERE project_id = ?", (project_id,))
+        self.conn.executemany(
+            "INSERT OR IGNORE INTO collaborators (project_id, position, username) VALUES (?, ?, ?)",
+            [(project_id, i, username) for i, username in enumerate(collaborators)]
+        )
+
+    def replace_materials(self, project_id: str, materials: List[str]):
+        self.conn.execute("DELETE FROM materials WHERE project_id = ?", (project_id,))
+        self.conn.executemany(
+            "INSERT INTO materials (project_id, position, line) VALUES (?, ?, ?)",
+            [(project_id, i, line) for i, line in enumerate(materials)]
+        )
+
+    def replace_ledger(self, project_id: str, ledger: Dict):
+        self.conn.execute("DELETE FROM material_ledger WHERE project_id = ?", (project_id,))
+        self.conn.executemany(
+            "INSERT INTO material_ledger (project_id, item_id, position, name, needed, gathered) VALUES (?, ?, ?, ?, ?, ?)",
+            [(project_id, item_id, i, entry["name"], entry["needed"], entry["gathered"])
+             for i, (item_id, entry) in enumerate(ledger.items())]
+        )
+
+    def update_ledger(self, project_id: str, ledger: Dict):
+        """Write only the ledger rows that changed; a !gathered touches one item"""
+        stored = {row["item_id"]: tuple(row)[1:] for row in self.conn.execute(
+            "SELECT item_id, position, name, needed, gathered FROM material_ledger WHERE project_id = ?", (project_id,))}
+        changed = []
+        for i, (item_id, entry) in enumerate(ledger.items()):
+            values = (i, entry["name"], entry["needed"], entry["gathered"])
+            if stored.pop(item_id, None) != values:
+                changed.append((project_id, item_id, *values))
+        self.conn.executemany(
+            "INSERT OR REPLACE INTO material_ledger (project_id, item_id, position, name, needed, gathered) "
+            "VALUES (?, ?, ?, ?, ?, ?)", changed
+        )
+        self.conn.executemany(
+            "DELETE FROM material_ledger WHERE project_id = ? AND item_id = ?",
+            [(project_id, item_id) for item_id in stored]
+        )
+
+    def insert_notes(self, project_id: str, notes: List[Dict]):
+        self.conn.executemany(
+            "INSERT INTO notes (project_id, timestamp, user, note) VALUES (?, ?, ?, ?)",
+            [(project_id, note.get("timestamp"), note.get("user"), note.get("note")) for note in notes]
+        )
+
+    def load_all(self) -> Dict:
+        projects = {}
+        for row in self.conn.execute("SELECT * FROM projects ORDER BY rowid"):
+            project = {"id": row["id"]}
+            for key in self.COLUMNS:
+                # Leave unset fields out so callers' .get(key, default) still applies
+                if row[key] is not None:
+                    project[key] = row[key]
+            project.update({"collaborators": [], "materials": [], "notes": []})
+            if row["extra"]:
+                project.update(json.loads(row["extra"]))
+            projects[row["id"]] = project
+
+        for row in self.conn.execute("SELECT project_id, username FROM collaborators ORDER BY project_id, position"):
+            projects[row["project_id"]]["collaborators"].append(row["username"])
+        for row in self.conn.execute("SELECT project_id, line FROM materials ORDER BY project_id, position"):
+            projects[row["project_id"]]["materials"].append(row["line"])
+        for row in self.conn.execute("SELECT project_id, timestamp, user, note FROM notes ORDER BY id"):
+            projects[row["project_id"]]["notes"].append(
+                {"timestamp": row["timestamp"], "user": row["user"], "note": row["note"]}
+            )
+        for row in self.conn.execute("SELECT * FROM material_ledger ORDER BY project_id, position"):
+            # Projects without rows keep deriving their ledger from the material lines
+            projects[row["project_id"]].setdefault("material_ledger", {})[row["item_id"]] = {
+                "name": row["name"], "needed": row["needed"], "gathered": row["gathered"]
+            }
+        return projects
+
+    def create(self, project_id: str, project: Dict):
+        with self.conn:
+            self.insert_project(project_id, project)
+
+    def create_many(self, projects: Dict):
+        with self.conn:
+            for project_id, project in projects.items():
+                self.insert_project(project_id, project)
+
+    def update(self, project_id: str, updates: Dict, project: Dict):
+        columns, extra = self.split_fields(updates)
+        with self.conn:
+            if columns:
+                assignments = ", ".join(f"{key} = ?" for key in columns)
+                self.conn.execute(f"UPDATE projects SET {assignments} WHERE id = ?", (*columns.values(), project_id))
+            if extra:
+                _, all_extra = self.split_fields(project)
+                self.conn.execute("UPDATE projects SET extra = ? WHERE id = ?", (json.dumps(all_extra), project_id))
+
+            if "collaborators" in updates:
+                existing = {row[0] for row in self.conn.execute(
+                    "SELECT username FROM collaborators WHERE project_id = ?", (project_id,))}
+                wanted = updates["collaborators"]
+                if existing.issubset(wanted):
+                    # Usual case: someone was added, so only insert the new names
+                    self.conn.executemany(
+                        "INSERT OR IGNORE INTO collaborators (project_id, position, username) VALUES (?, ?, ?)",
+                        [(project_id, i, name) for i, name in enumerate(wanted) if name not in existing]
+                    )
+                else:
+                    self.replace_collaborators(project_id, wanted)
+
+            if "materials" in updates:
+                self.replace_materials(project_id, updates["materials"])
+
+            if "notes" in updates:
+                notes = updates["notes"]
+                (stored,) = self.conn.execute("SELECT COUNT(*) FROM notes WHERE project_id = ?", (project_id,)).fetchone()
+                if len(notes) >= stored:
+                    # Notes are append-only, so only the new tail needs writing
+                    self.insert_notes(project_id, notes[stored:])
+                else:
+                    self.conn.execute("DELETE FROM notes WHERE project_id = ?", (project_id,))
+                    self.insert_notes(project_id, notes)
+
+            if "material_ledger" in updates:
+                self.update_ledger(project_id, updates["material_ledger"])
+
+    def delete(self, project_id: str):
+        with self.conn:
+            self.conn.execute("DELETE FROM projects WHERE id = ?", (project_id,))
+
+    def load_id_sequence(self) -> int:
+        row = self.conn.execute("SELECT value FROM meta WHERE key = 'id_sequence'").fetchone()
+        return int(row[0]) if row else 0
+
+    def save_id_sequence(self, value: int):
+        with self.conn:
+            self.conn.execute("INSERT OR REPLACE INTO meta (key, value) VALUES ('id_sequence', ?)", (str(value),))
+
+    async def close(self):
+        self.conn.close()
+
+def make_project_storage(filename: str, backend: str = PROJECT_STORAGE_BACKEND) -> ProjectStorage:
+    if backend == "journal":
+        return JournaledJsonProjectStorage(filename)
+    if backend == "json":
+        return JsonProjectStorage(filename)
+    # SQLite by default; an existing JSON board is imported on first run
+    return SqliteProjectStorage(PROJECTS_DB, import_json=filename)
+
+PROJECT_ID_RE = re.compile(r"^proj_(\d+)$")
+PROGRESS_TIERS = ("low", "medium", "high", "completed")
+
+def project_id_key(project_id: str):
+    """Sort key putting proj_999 before proj_1000; ids in other shapes go last"""
+    match = PROJECT_ID_RE.match(project_id)
+    return (0, int(match.group(1)), "") if match else (1, 0, project_id)
+
+def progress_tier(progress) -> str:
+    """Board section for a progress value: <50, 50-74, 75-99 or 100"""
+    progress = int(progress or 0)
+    if progress >= 100:
+        return "completed"
+    if progress >= 75:
+        return "high"
+    if progress >= 50:
+        return "medium"
+    return "low"
+
+ESTIMATE_PART_RE = re.compile(r"(\d+(?:\.\d+)?)\s*(h|hours?|hrs?|d|days?|w|weeks?|months?)\b", re.I)
+ESTIMATE_UNITS = {"h": timedelta(hours=1), "d": timedelta(days=1), "w": timedelta(weeks=1), "m": timedelta(days=30)}
+SPARK_CHARS = "▁▂▃▄▅▆▇█"
+
+def parse_estimate(text: str) -> Optional[timedelta]:
+    """'2 weeks', '3d 12h', '1 month' -> timedelta; None if nothing recognisable"""
+    total = timedelta()
+    for amount, unit in ESTIMATE_PART_RE.findall(text or ""):
+        total += float(amount) * ESTIMATE_UNITS[unit[0].lower()]
+    return total or None
+
+class ProjectStats:
+    """Rollup of one project's events, updated as each event arrives"""
+    def __init__(self, created_at: datetime):
+        self.created_at = created_at
+        self.progress = 0
+        self.status = "planning"
+        self.burnup = [(created_at, 0)]  # (when, progress) at every progress change
+        self.builders = Counter()
+        self.event_count = 0
+        self.last_activity = created_at
+
+    def percent_per_day(self) -> Optional[float]:
+        start, first = self.burnup[0]
+        end, last = self.burnup[-1]
+        days = (end - start).total_seconds() / 86400
+        if days < 1 / 24 or last <= first:
+            return None
+        return (last - first) / days
+
+    def eta(self) -> Optional[datetime]:
+        if self.progress >= 100:
+            return self.burnup[-1][0]
+        rate = self.percent_per_day()
+        if not rate:
+            return None
+        return self.burnup[-1][0] + timedelta(days=(100 - self.progress) / rate)
+
+    def sparkline(self, columns: int = 20) -> str:
+        """Burn-up chart: progress at the end of each of `columns` equal time slices"""
+        start = self.burnup[0][0]
+        span = max((datetime.now() - start).total_seconds(), 1.0)
+        line = ""
+        point = 0
+        for column in range(1, columns + 1):
+            cutoff = start + timedelta(seconds=span * column / columns)
+            while point + 1 < len(self.burnup) and self.burnup[point + 1][0] <= cutoff:
+                point += 1
+            line += SPARK_CHARS[min(self.burnup[point][1] * len(SPARK_CHARS) // 101, len(SPARK_CHARS) - 1)]
+        return line
+
+class ProjectEventLog:
+    """Typed, timestamped record of every project change, with rollups.
+
+    Events are appended to a JSON-lines file in batches by a background task,
+    the same way the journal backend writes its records. The rollups (progress
+    history, rate, builders) are updated as each event is applied, so stats
+    never need the history replayed except once at startup."""
+    def __init__(self, filename: str = PROJECT_EVENTS_FILE, flush_ms=JOURNAL_FLUSH_MS):
+        self.filename = filename
+        self.flush_interval = flush_ms / 1000
+        self.stats = {}          # project_id -> ProjectStats
+        self.builders = Counter()
+        self.total_events = 0
+        self.pending = []        # Serialized events not yet written
+        self.flusher = WriteBehind(self.flush_interval, self.flush, self.write_sync)
+        self.replay()
+
+    def replay(self):
+        try:
+            with open(self.filename, 'r') as f:
+                for line in f:
+                    try:
+                        self.apply(json.loads(line))
+                    except (ValueError, KeyError):
+                        continue  # a torn final line from a crash
+        except FileNotFoundError:
+            pass
+
+    def record(self, project_id: str, kind: str, user: Optional[str] = None, **data):
+        event = {"timestamp": datetime.now().isoformat(), "project_id": project_id, "type": kind, "user": user, **data}
+        self.pending.append(json.dumps(event) + "\n")
+        self.apply(event)
+        self.flusher.kick()
+
+    def write_lines(self, lines: List[str]):
+        with open(self.filename, 'a') as f:
+            f.writelines(lines)
+
+    def write_sync(self):
+        if self.pending:
+            lines, self.pending = self.pending, []
+            self.write_lines(lines)
+
+    async def flush(self) -> bool:
+        if self.pending:
+            lines, self.pending = self.pending, []
+            await asyncio.to_thread(self.write_lines, lines)
+        return bool(self.pending)
+
+    async def close(self):
+        await self.flusher.stop()
+        self.write_sync()
+
+    def apply(self, event: Dict):
+        when = datetime.fromisoformat(event["timestamp"])
+        project_id = event["project_id"]
+        kind = event["type"]
+
+        if kind == "deleted":
+            self.stats.pop(project_id, None)
+        else:
+            if kind in ("created", "imported"):
+                self.stats[project_id] = ProjectStats(datetime.fromisoformat(event.get("created_at") or event["timestamp"]))
+            stats = self.stats.get(project_id)
+            if stats is None:
+                stats = self.stats[project_id] = ProjectStats(when)
+
+            progress = event.get("progress")
+            if progress is not None and progress != stats.progress:
+                stats.progress = progress
+                stats.burnup.append((when, progress))
+            if event.get("status"):
+                stats.status = event["status"].lower()
+            stats.event_count += 1
+            stats.last_activity = when
+            if event.get("user") and kind != "imported":
+                stats.builders[event["user"]] += 1
+
+        if event.get("user") and kind != "imported":
+            self.builders[event["user"]] += 1
+        self.total_events += 1
+
+    def seed(self, project_id: str, project: Dict):
+        """Start a history for a project that predates the event log"""
+        self.record(project_id, "imported", created_at=project.get("created_at"),
+                    progress=int(project.get("progress", 0) or 0), status=project.get("status", "Planning"))
+
+    def record_update(self, project_id: str, updates: Dict, user: Optional[str] = None):
+        """Turn one update_project call into typed events"""
+        stats = self.stats.get(project_id)
+        recorded = False
+        if "progress" in updates and (stats is None or int(updates["progress"]) != stats.progress):
+            self.record(project_id, "progress", user, progress=int(updates["progress"]))
+            recorded = True
+        if "status" in updates and (stats is None or str(updates["status"]).lower() != stats.status):
+            self.record(project_id, "status", user, status=str(updates["status"]))
+            recorded = True
+        if updates.get("notes"):
+            self.record(project_id, "note", user, note=updates["notes"][-1].get("note", ""))
+            recorded = True
+        if updates.get("collaborators"):
+            self.record(project_id, "collaborator", user, collaborator=updates["collaborators"][-1])
+            recorded = True
+        if "materials" in updates:
+            self.record(project_id, "materials", user, count=len(updates["materials"]))
+            recorded = True
+        elif "material_ledger" in updates:
+            self.record(project_id, "gathered", user)
+            recorded = True
+        if not recorded:
+            self.record(project_id, "updated", user, fields=sorted(updates))
+
+class ProjectData:
+    """Handles project data persistence"""
+    def __init__(self, filename="projects.json", storage: Optional[ProjectStorage] = None,
+                 events: Optional[ProjectEventLog] = None):
+        self.filename = filename
+        self.storage = storage or make_project_storage(filename)
+        self.projects = self.load_projects()
+        self.events = events or ProjectEventLog()
+        for project_id, project in self.projects.items():
+            if project_id not in self.events.stats:
+                self.events.seed(project_id, project)
+
+        # Secondary indexes: index name -> key -> set of project ids
+        self.indexes = {"creator_id": {}, "status": {}, "collaborator": {}, "tier": {}}
+        # Keys each project is currently filed under. Callers mutate project
+        # dicts in place before calling update_project, so the old keys can't be
+        # read back from the project itself.
+        self.indexed_keys = {}
+        for project_id, project in self.projects.items():
+            self.index_project(project_id, project)
+
+        # Bumped on every change to a project; values derived from a project
+        # (e.g. rendered board cards) are cached against it
+        self.versions = {}
+        self.derived = {}
+        self.listeners = []
+
+        numbers = [int(m.group(1)) for m in map(PROJECT_ID_RE.match, self.projects) if m]
+        self.id_sequence = max(max(numbers, default=0), self.storage.load_id_sequence())
+    
+    def load_projects(self) -> Dict:
+        return self.storage.load_all()
+
+    def next_project_id(self) -> str:
+        """Allocate a new project id; ids are never handed out twice, even after deletes"""
+        while True:
+            self.id_sequence += 1
+            project_id = f"proj_{self.id_sequence:03d}"
+            if project_id not in self.projects:
+                self.storage.save_id_sequence(self.id_sequence)
+                return project_id
+
+    @staticmethod
+    def index_keys(project: Dict) -> Dict[str, set]:
+        return {
+            "creator_id": {project.get("creator_id")},
+            "status": {str(project.get("status", "Planning")).lower()},
+            "collaborator": {name.lower() for name in project.get("collaborators", [])},
+            "tier": {progress_tier(project.get("progress", 0))},
+        }
+
+    def index_project(self, project_id: str, project: Dict):
+        keys = self.index_keys(project)
+        for index, values in keys.items():
+            for value in values:
+                self.indexes[index].setdefault(value, set()).add(project_id)
+        self.indexed_keys[project_id] = keys
+
+    def unindex_project(self, project_id: str):
+        for index, values in self.indexed_keys.pop(project_id, {}).items():
+            for value in values:
+                ids = self.indexes[index].get(value)
+                if ids is not None:
+                    ids.discard(project_id)
+                    if not ids:
+                        del self.indexes[index][value]
     
-    def create_project(self, project_id: str, project_data: Dict):
+    def touch(self, project_id: str):
+        self.versions[project_id] = self.versions.get(project_id, 0) + 1
+
+    def add_listener(self, callback):
+        """callback(event, project_id) runs after every create/update/delete"""
+        self.listeners.append(callback)
+
+    def notify(self, event: str, project_id: str):
+        for callback in self.listeners:
+            try:
+                callback(event, project_id)
+            except Exception as e:
+                print(f"❌ Project listener failed: {e}")
+
+    def cached(self, project_id: str, kind: str, build):
+        """Value built from one project, reused until that project next changes"""
+        version = self.versions.get(project_id, 0)
+        hit = self.derived.get((kind, project_id))
+        if hit is not None and hit[0] == version:
+            return hit[1]
+        value = build(self.projects[project_id])
+        self.derived[(kind, project_id)] = (version, value)
+        return value
+
+    def create_project(self, project_id: str, project_data: Dict, user: Optional[str] = None):
+        if project_id in self.projects:
+            self.unindex_project(project_id)
         self.projects[project_id] = project_data
-        self.save_projects()
+        self.index_project(project_id, project_data)
+        self.touch(project_id)
+        self.storage.create(project_id, project_data)
+        self.events.record(project_id, "created", user, created_at=project_data.get("created_at"),
+                           progress=int(project_data.get("progress", 0) or 0),
+                           status=project_data.get("status", "Planning"))
+        self.notify("create", project_id)
     
-    def update_project(self, project_id: str, updates: Dict):
+    def upsert_projects(self, projects: Dict, user: Optional[str] = None):
+        """Create or replace a batch of whole projects in one storage write"""
+        numbers = [int(m.group(1)) for m in map(PROJECT_ID_RE.match, projects) if m]
+        if numbers and max(numbers) > self.id_sequence:
+            self.id_sequence = max(numbers)
+            self.storage.save_id_sequence(self.id_sequence)
+        self.storage.create_many(projects)
+
+        for project_id, project in projects.items():
+            previous = self.projects.get(project_id)
+            existed = previous is not None
+            if existed:
+                self.unindex_project(project_id)
+            self.projects[project_id] = project
+            self.index_project(project_id, project)
+            self.touch(project_id)
+            if existed:
+                # Only log what the import actually changed
+                changes = {key: value for key, value in project.items() if previous.get(key) != value}
+                if changes:
+                    self.events.record_update(project_id, changes, user)
+            else:
+                self.events.record(project_id, "imported", user, created_at=project.get("created_at"),
+                                   progress=int(project.get("progress", 0) or 0),
+                                   status=project.get("status", "Planning"))
+            self.notify("update" if existed else "create", project_id)
+
+    def update_project(self, project_id: str, updates: Dict, user: Optional[str] = None):
         if project_id in self.projects:
             self.projects[project_id].update(updates)
-            self.save_projects()
+            self.unindex_project(project_id)
+            self.index_project(project_id, self.projects[project_id])
+            self.touch(project_id)
+            self.storage.update(project_id, updates, self.projects[project_id])
+            self.events.record_update(project_id, updates, user)
+            self.notify("update", project_id)
     
-    def delete_project(self, project_id: str):
+    def delete_project(self, project_id: str, user: Optional[str] = None):
         if project_id in self.projects:
             del self.projects[project_id]
-            self.save_projects()
+            self.unindex_project(project_id)
+            self.versions.pop(project_id, None)
+            for key in [key for key in self.derived if key[1] == project_id]:
+                del self.derived[key]
+            self.storage.delete(project_id)
+            self.events.record(project_id, "deleted", user)
+            self.notify("delete", project_id)
     
     def get_project(self, project_id: str) -> Optional[Dict]:
         return self.projects.get(project_id)
@@ -44,6 +919,512 @@ class ProjectData:
     def get_all_projects(self) -> Dict:
         return self.projects
 
+    def find_ids(self, index: str, key) -> List[str]:
+        """Project ids filed under key in one of the secondary indexes, oldest first"""
+        if index in ("status", "collaborator") and isinstance(key, str):
+            key = key.lower()
+        return sorted(self.indexes[index].get(key, ()), key=project_id_key)
+
+    def find(self, index: str, key) -> Dict:
+        return {project_id: self.projects[project_id] for project_id in self.find_ids(index, key)}
+
+    def board_order(self) -> List[str]:
+        """All project ids in board order: by progress tier, then oldest first"""
+        return [project_id for tier in PROGRESS_TIERS for project_id in self.find_ids("tier", tier)]
+
+SEARCH_TOKEN_RE = re.compile(r"[a-z0-9]+")
+# How much a match in each part of a project counts towards its score
+SEARCH_FIELD_WEIGHTS = {
+    "name": 3.0,
+    "description": 1.0,
+    "coordinates": 1.0,
+    "collaborators": 1.0,
+    "materials": 1.0,
+    "notes": 0.5,
+}
+
+def search_tokens(text: str) -> List[str]:
+    return SEARCH_TOKEN_RE.findall(str(text).lower())
+
+def project_search_fields(project: Dict, notes: bool = True) -> Dict[str, str]:
+    fields = {
+        "name": project.get("name", ""),
+        "description": project.get("description", ""),
+        "coordinates": project.get("coordinates", ""),
+        "collaborators": " ".join(project.get("collaborators", [])),
+        "materials": " ".join(project.get("materials", [])),
+    }
+    if notes:
+        fields["notes"] = " ".join(note.get("note", "") for note in project.get("notes", []))
+    return fields
+
+class ProjectSearchIndex:
+    """Inverted index over project text, ranked with BM25.
+
+    Kept up to date through ProjectData listeners: a change re-indexes only the
+    project that changed, and a query only touches the postings of its terms.
+    Notes only ever get appended, so their term weights are kept per project and
+    an update tokenizes just the notes added since it was last indexed."""
+    K1 = 1.2
+    B = 0.75
+
+    def __init__(self, project_data: ProjectData):
+        self.project_data = project_data
+        self.postings = {}    # term -> {project_id: weighted term frequency}
+        self.doc_terms = {}   # project_id -> terms it's posted under
+        self.doc_lengths = {}
+        self.total_length = 0.0
+        self.note_weights = {}  # project_id -> (notes indexed, last note indexed, term weights)
+        for project_id, project in project_data.get_all_projects().items():
+            self.add(project_id, project)
+        project_data.add_listener(self.on_project_change)
+
+    def index_notes(self, project_id: str, notes: List[Dict]) -> Counter:
+        indexed, last, weights = self.note_weights.get(project_id, (0, None, None))
+        if weights is None or indexed > len(notes) or (indexed and notes[indexed - 1] != last):
+            # Notes were removed or replaced (e.g. by an import); start over
+            indexed, weights = 0, Counter()
+        for note in notes[indexed:]:
+            for token in search_tokens(note.get("note", "")):
+                weights[token] += SEARCH_FIELD_WEIGHTS["notes"]
+        self.note_weights[project_id] = (len(notes), dict(notes[-1]) if notes else None, weights)
+        return weights
+
+    def add(self, project_id: str, project: Dict):
+        weights = Counter(self.index_notes(project_id, project.get("notes", [])))
+        for field, text in project_search_fields(project, notes=False).items():
+            for token in search_tokens(text):
+                weights[token] += SEARCH_FIELD_WEIGHTS[field]
+
+        for term, weight in weights.items():
+            self.postings.setdefault(term, {})[project_id] = weight
+        self.doc_terms[project_id] = set(weights)
+        self.doc_lengths[project_id] = sum(weights.values())
+        self.total_length += self.doc_lengths[project_id]
+
+    def remove(self, project_id: str):
+        for term in self.doc_terms.pop(project_id, ()):
+            docs = self.postings.get(term)
+            if docs is not None:
+                docs.pop(project_id, None)
+                if not docs:
+                    del self.postings[term]
+        self.total_length -= self.doc_lengths.pop(project_id, 0.0)
+
+    def on_project_change(self, event: str, project_id: str):
+        self.remove(project_id)
+        project = self.project_data.get_project(project_id)
+        if event != "delete" and project is not None:
+            self.add(project_id, project)
+        else:
+            self.note_weights.pop(project_id, None)
+
+    def search(self, query: str, limit: int = 10) -> List[tuple]:
+        """[(project_id, score)] best first"""
+        doc_count = len(self.doc_lengths)
+        if not doc_count:
+            return []
+        average_length = self.total_length / doc_count or 1.0
+
+        scores = Counter()
+        for term in set(search_tokens(query)):
+            docs = self.postings.get(term)
+            if not docs:
+                continue
+            idf = math.log(1 + (doc_count - len(docs) + 0.5) / (len(docs) + 0.5))
+            for project_id, tf in docs.items():
+                norm = 1 - self.B + self.B * self.doc_lengths[project_id] / average_length
+                scores[project_id] += idf * tf * (self.K1 + 1) / (tf + self.K1 * norm)
+        return scores.most_common(limit)
+
+    def snippet(self, project_id: str, query: str, width: int = 80) -> str:
+        """Short excerpt around the first place a query term appears"""
+        project = self.project_data.get_project(project_id) or {}
+        terms = set(search_tokens(query))
+        for field, text in project_search_fields(project).items():
+            lowered = text.lower()
+            positions = [m.start() for m in SEARCH_TOKEN_RE.finditer(lowered) if m.group() in terms]
+            if positions:
+                start = max(positions[0] - width // 3, 0)
+                excerpt = text[start:start + width].replace("\n", " ")
+                return f"{field}: {'…' if start else ''}{excerpt}{'…' if start + width < len(text) else ''}"
+        return ""
+
+# "Stone: 1000", "Oak Logs = 3 stacks", "Glass: 1.5k", "64x Torch", "Lanterns x32"
+MATERIAL_NAME_FIRST_RE = re.compile(
+    r"^[-•*\s]*(?P<name>.+?)\s*(?:[:=]|\s[x×])\s*(?P<amount>\d[\d,]*(?:\.\d+)?)\s*(?P<unit>k|stacks?|st)?\s*$", re.I)
+MATERIAL_AMOUNT_FIRST_RE = re.compile(
+    r"^[-•*\s]*(?P<amount>\d[\d,]*(?:\.\d+)?)\s*(?P<unit>k|stacks?|st)?\s*(?:[x×]\s*|of\s+|\s)(?P<name>.+?)\s*$", re.I)
+MATERIAL_UNITS = {"k": 1000, "stack": 64, "stacks": 64, "st": 64}
+INACTIVE_STATUSES = ("completed", "on hold")
+
+def normalize_item_id(name: str) -> str:
+    """'Wood Planks' / 'minecraft:wood_planks' -> 'wood_planks'"""
+    name = name.strip().lower()
+    if name.startswith("minecraft:"):
+        name = name[len("minecraft:"):]
+    return re.sub(r"[^a-z0-9]+", "_", name).strip("_")
+
+def parse_material_line(line: str) -> Optional[tuple]:
+    """(item_id, display name, quantity) for a line like 'Stone: 1000', else None"""
+    match = MATERIAL_NAME_FIRST_RE.match(line) or MATERIAL_AMOUNT_FIRST_RE.match(line)
+    if not match:
+        return None
+    item_id = normalize_item_id(match.group("name"))
+    if not item_id:
+        return None
+    amount = float(match.group("amount").replace(",", ""))
+    unit = (match.group("unit") or "").lower()
+    quantity = int(amount * MATERIAL_UNITS.get(unit, 1))
+    return item_id, match.group("name").strip(), quantity
+
+def build_material_ledger(lines: List[str], previous: Optional[Dict] = None) -> Dict:
+    """item id -> {"name", "needed", "gathered"}; amounts already gathered carry over"""
+    previous = previous or {}
+    ledger = {}
+    for line in lines:
+        parsed = parse_material_line(line)
+        if parsed is None:
+            continue
+        item_id, name, quantity = parsed
+        entry = ledger.setdefault(item_id, {
+            "name": name,
+            "needed": 0,
+            "gathered": previous.get(item_id, {}).get("gathered", 0),
+        })
+        entry["needed"] += quantity
+    return ledger
+
+def material_ledger(project: Dict) -> Dict:
+    # Projects from before the ledger existed only have the raw lines
+    if "material_ledger" in project:
+        return project["material_ledger"]
+    return build_material_ledger(project.get("materials", []))
+
+def format_item_amount(amount: int) -> str:
+    if amount < 64:
+        return f"{amount:,}"
+    stacks, rest = divmod(amount, 64)
+    return f"{amount:,} ({stacks} st{f' + {rest}' if rest else ''})"
+
+class MaterialTotals:
+    """Outstanding materials summed over every active project.
+
+    Each project's contribution is remembered, so a change subtracts the old
+    contribution and adds the new one instead of re-reading every project."""
+    def __init__(self, project_data: ProjectData):
+        self.project_data = project_data
+        self.contributions = {}  # project_id -> {item_id: outstanding amount}
+        self.outstanding = Counter()
+        self.project_counts = Counter()
+        self.names = {}
+        for project_id in project_data.get_all_projects():
+            self.add(project_id)
+        project_data.add_listener(self.on_project_change)
+
+    def add(self, project_id: str):
+        project = self.project_data.get_project(project_id)
+        if project is None or str(project.get("status", "Planning")).lower() in INACTIVE_STATUSES:
+            return
+        ledger = self.project_data.cached(project_id, "material_ledger", material_ledger)
+        contribution = {}
+        for item_id, entry in ledger.items():
+            remaining = entry["needed"] - entry["gathered"]
+            if remaining > 0:
+                contribution[item_id] = remaining
+                self.names.setdefault(item_id, entry["name"])
+        self.outstanding.update(contribution)
+        self.project_counts.update(contribution.keys())
+        self.contributions[project_id] = contribution
+
+    def remove(self, project_id: str):
+        for item_id, amount in self.contributions.pop(project_id, {}).items():
+            self.outstanding[item_id] -= amount
+            self.project_counts[item_id] -= 1
+            if self.project_counts[item_id] <= 0:
+                del self.outstanding[item_id]
+                del self.project_counts[item_id]
+                self.names.pop(item_id, None)
+
+    def on_project_change(self, event: str, project_id: str):
+        self.remove(project_id)
+        if event != "delete":
+            self.add(project_id)
+
+    def shopping_list(self) -> List[tuple]:
+        """[(item_id, name, outstanding, project count)] largest need first"""
+        return [(item_id, self.names[item_id], amount, self.project_counts[item_id])
+                for item_id, amount in self.outstanding.most_common()]
+
+COORD_NUMBER_RE = re.compile(r"-?\d+(?:\.\d+)?")
+COORD_LABELLED_RE = re.compile(r"\b([xyz])\s*[:=]?\s*(-?\d+(?:\.\d+)?)", re.I)
+COORD_WORLD_RE = re.compile(r"(nether|the[_\s]?end|\bend\b)", re.I)
+# Blocks per side of a spatial index cell
+SPATIAL_CELL_SIZE = 256
+NEARBY_DEFAULT_RADIUS = 500
+# "Steve has the following entity data: [12.5d, 64.0d, -30.2d]"
+ENTITY_POS_RE = re.compile(r"\[(-?[\d.]+)d, (-?[\d.]+)d, (-?[\d.]+)d\]")
+
+def normalize_world(name: str) -> str:
+    name = name.lower()
+    if "nether" in name:
+        return "nether"
+    if "end" in name:
+        return "the_end"
+    return "overworld"
+
+def parse_coordinates(text: str) -> Optional[tuple]:
+    """(world, x, y, z) from text like '100, 64, -200', 'X: 100 Z: -200' or
+    'Nether 20 70 -5'; y is None when only x and z are given"""
+    if not text:
+        return None
+    world = COORD_WORLD_RE.search(text)
+    world = normalize_world(world.group(1)) if world else "overworld"
+
+    labelled = {axis.lower(): float(value) for axis, value in COORD_LABELLED_RE.findall(text)}
+    if "x" in labelled and "z" in labelled:
+        return world, labelled["x"], labelled.get("y"), labelled["z"]
+
+    numbers = [float(n) for n in COORD_NUMBER_RE.findall(text)]
+    if len(numbers) == 3:
+        return world, numbers[0], numbers[1], numbers[2]
+    if len(numbers) == 2:
+        return world, numbers[0], None, numbers[1]
+    return None
+
+class ProjectSpatialIndex:
+    """Grid hash of project locations for radius and nearest-project lookups.
+
+    Projects are bucketed into SPATIAL_CELL_SIZE squares per world, so a query
+    only looks at the cells its radius overlaps rather than every project."""
+    def __init__(self, project_data: ProjectData, cell_size: int = SPATIAL_CELL_SIZE):
+        self.project_data = project_data
+        self.cell_size = cell_size
+        self.cells = {}      # (world, cell x, cell z) -> set of project ids
+        self.positions = {}  # project_id -> (world, x, y, z)
+        self.world_counts = Counter()
+        for project_id, project in project_data.get_all_projects().items():
+            self.add(project_id, project)
+        project_data.add_listener(self.on_project_change)
+
+    def cell(self, world: str, x: float, z: float) -> tuple:
+        return world, math.floor(x / self.cell_size), math.floor(z / self.cell_size)
+
+    def add(self, project_id: str, project: Dict):
+        position = parse_coordinates(project.get("coordinates", ""))
+        if position is None:
+            return
+        world, x, _, z = position
+        self.positions[project_id] = position
+        self.cells.setdefault(self.cell(world, x, z), set()).add(project_id)
+        self.world_counts[world] += 1
+
+    def remove(self, project_id: str):
+        position = self.positions.pop(project_id, None)
+        if position is None:
+            return
+        world, x, _, z = position
+        key = self.cell(world, x, z)
+        self.cells[key].discard(project_id)
+        if not self.cells[key]:
+            del self.cells[key]
+        self.world_counts[world] -= 1
+
+    def on_project_change(self, event: str, project_id: str):
+        self.remove(project_id)
+        project = self.project_data.get_project(project_id)
+        if event != "delete" and project is not None:
+            self.add(project_id, project)
+
+    def distance(self, project_id: str, x: float, z: float) -> float:
+        _, px, _, pz = self.positions[project_id]
+        return math.hypot(px - x, pz - z)
+
+    def ring(self, world: str, cx: int, cz: int, r: int):
+        """Project ids in the square ring of cells r steps from (cx, cz)"""
+        if r == 0:
+            yield from self.cells.get((world, cx, cz), ())
+            return
+        for dx in range(-r, r + 1):
+            for dz in (-r, r) if abs(dx) != r else range(-r, r + 1):
+                yield from self.cells.get((world, cx + dx, cz + dz), ())
+
+    def within(self, world: str, x: float, z: float, radius: float) -> List[tuple]:
+        """[(project_id, distance)] within radius blocks (horizontally), closest first"""
+        world = normalize_world(world)
+        _, cx, cz = self.cell(world, x, z)
+        reach = math.ceil(radius / self.cell_size)
+        hits = []
+        if (2 * reach + 1) ** 2 > len(self.cells):
+            # Radius covers more cells than are occupied; walking the occupied ones is cheaper
+            candidates = (pid for key, ids in self.cells.items() if key[0] == world for pid in ids)
+        else:
+            candidates = (pid for r in range(reach + 1) for pid in self.ring(world, cx, cz, r))
+        for project_id in candidates:
+            distance = self.distance(project_id, x, z)
+            if distance <= radius:
+                hits.append((project_id, distance))
+        return sorted(hits, key=lambda hit: hit[1])
+
+    def nearest(self, world: str, x: float, z: float, count: int = 5) -> List[tuple]:
+        """The count closest projects in a world, searching outwards ring by ring"""
+        world = normalize_world(world)
+        total = self.world_counts[world]
+        _, cx, cz = self.cell(world, x, z)
+        hits = []
+        seen = 0
+        r = 0
+        while seen < total:
+            if (2 * r + 1) ** 2 > len(self.cells):
+                # The rings so far cover more cells than are occupied (e.g. a query
+                # far from every project); scanning the occupied cells is cheaper
+                hits = [(pid, self.distance(pid, x, z))
+                        for key, ids in self.cells.items() if key[0] == world for pid in ids]
+                hits.sort(key=lambda hit: hit[1])
+                break
+            for project_id in self.ring(world, cx, cz, r):
+                hits.append((project_id, self.distance(project_id, x, z)))
+                seen += 1
+            hits.sort(key=lambda hit: hit[1])
+            # Anything in a further ring is at least r * cell_size away
+            if len(hits) >= count and hits[count - 1][1] <= r * self.cell_size:
+                break
+            r += 1
+        return hits[:count]
+
+EXPORT_FORMATS = ("ndjson", "csv")
+CSV_FIELDS = ("id", *SqliteProjectStorage.COLUMNS, "collaborators", "materials", "notes", "extra")
+# CSV cells holding JSON rather than plain text
+CSV_JSON_FIELDS = ("collaborators", "materials", "notes", "extra")
+
+def export_format(filename: str, default: str = "ndjson") -> str:
+    extension = os.path.splitext(filename)[1].lower().lstrip(".")
+    if extension in ("json", "jsonl", "ndjson"):
+        return "ndjson"
+    return extension if extension in EXPORT_FORMATS else default
+
+def write_projects(projects: Dict, f, fmt: str) -> int:
+    """Write projects to a text file one record at a time; returns the count"""
+    count = 0
+    if fmt == "csv":
+        writer = csv.DictWriter(f, fieldnames=CSV_FIELDS)
+        writer.writeheader()
+    for project_id in list(projects):
+        project = projects.get(project_id)
+        if project is None:
+            continue
+        if fmt == "csv":
+            row = {key: project.get(key) for key in CSV_FIELDS if key in SqliteProjectStorage.COLUMNS}
+            row["id"] = project_id
+            for key in ("collaborators", "materials", "notes"):
+                row[key] = json.dumps(project.get(key, []))
+            extra = {key: value for key, value in project.items() if key not in CSV_FIELDS}
+            row["extra"] = json.dumps(extra) if extra else ""
+            writer.writerow(row)
+        else:
+            f.write(json.dumps({"id": project_id, **project}) + "\n")
+        count += 1
+    return count
+
+def read_project_records(f, fmt: str):
+    """Yield (line number, record or None, error) from an NDJSON or CSV text file"""
+    if fmt == "csv":
+        reader = csv.DictReader(f)
+        for row in reader:
+            try:
+                record = {key: value for key, value in row.items()
+                          if key and key not in CSV_JSON_FIELDS and value not in ("", None)}
+                for key in ("collaborators", "materials", "notes"):
+                    record[key] = json.loads(row.get(key) or "[]")
+                if row.get("extra"):
+                    record.update(json.loads(row["extra"]))
+            except ValueError as e:
+                yield reader.line_num, None, f"bad JSON cell: {e}"
+                continue
+            yield reader.line_num, record, None
+        return
+
+    for number, line in enumerate(f, 1):
+        if not line.strip():
+            continue
+        try:
+            yield number, json.loads(line), None
+        except ValueError as e:
+            yield number, None, f"invalid JSON: {e}"
+
+def validate_project_record(record) -> Dict:
+    """Check and normalize one imported project; raises ValueError"""
+    if not isinstance(record, dict):
+        raise ValueError("record is not an object")
+    project = dict(record)
+    project_id = str(project.get("id") or "").strip()
+    if not project_id:
+        raise ValueError("missing id")
+    if not str(project.get("name") or "").strip():
+        raise ValueError("missing name")
+    project["id"] = project_id
+
+    try:
+        project["progress"] = int(float(project.get("progress") or 0))
+    except (TypeError, ValueError):
+        raise ValueError(f"progress {project.get('progress')!r} is not a number")
+    if not 0 <= project["progress"] <= 100:
+        raise ValueError("progress must be between 0 and 100")
+    if project.get("creator_id") not in (None, ""):
+        project["creator_id"] = int(project["creator_id"])
+
+    for key in ("collaborators", "materials", "notes"):
+        project.setdefault(key, [])
+        if not isinstance(project[key], list):
+            raise ValueError(f"{key} must be a list")
+
+    project.setdefault("status", "Planning")
+    project.setdefault("created_at", datetime.now().isoformat())
+    datetime.fromisoformat(project["created_at"])
+
+    # The detail view reads timestamp and user straight off each note
+    notes = []
+    for note in project["notes"]:
+        if not isinstance(note, dict) or "note" not in note:
+            raise ValueError("notes must be objects with a note")
+        note = {**note, "timestamp": note.get("timestamp") or project["created_at"], "user": note.get("user") or "Unknown"}
+        datetime.fromisoformat(note["timestamp"])
+        notes.append(note)
+    project["notes"] = notes
+    return project
+
+def project_batches(records, batch_size: int = IMPORT_BATCH_SIZE):
+    """Validate records, yielding ({id: project}, [error strings]) every batch_size projects"""
+    batch = {}
+    errors = []
+    for number, record, error in records:
+        if error is None:
+            try:
+                project = validate_project_record(record)
+            except (ValueError, TypeError) as e:
+                error = str(e)
+        if error is not None:
+            errors.append(f"line {number}: {error}")
+            continue
+        batch[project["id"]] = project
+        if len(batch) >= batch_size:
+            yield batch, errors
+            batch, errors = {}, []
+    if batch or errors:
+        yield batch, errors
+
+def import_projects(project_data: ProjectData, records, user: Optional[str] = None,
+                    batch_size: int = IMPORT_BATCH_SIZE) -> tuple:
+    """Validate and upsert records in batches; returns (imported count, [error strings])"""
+    imported = 0
+    errors = []
+    for batch, batch_errors in project_batches(records, batch_size):
+        if batch:
+            project_data.upsert_projects(batch, user)
+        imported += len(batch)
+        errors.extend(batch_errors)
+    return imported, errors
+
 class CreateProjectModal(Modal, title="Create New Project"):
     def __init__(self, project_data: ProjectData):
         super().__init__()
@@ -86,7 +1467,7 @@ class CreateProjectModal(Modal, title="Create New Project"):
     )
     
     async def on_submit(self, interaction: discord.Interaction):
-        project_id = f"proj_{len(self.project_data.projects) + 1:03d}"
+        project_id = self.project_data.next_project_id()
         
         project_info = {
             "id": project_id,
@@ -107,7 +1488,7 @@ class CreateProjectModal(Modal, title="Create New Project"):
             "notes": []
         }
         
-        self.project_data.create_project(project_id, project_info)
+        self.project_data.create_project(project_id, project_info, interaction.user.display_name)
         
         embed = discord.Embed(
             title="✅ Project Created Successfully!",
@@ -143,8 +1524,10 @@ class AddMaterialModal(Modal, title="Add Materials"):
         
         project = self.project_data.get_project(self.project_id)
         if project:
+            ledger = build_material_ledger(materials_list, material_ledger(project))
             project['materials'] = materials_list
-            self.project_data.update_project(self.project_id, {"materials": materials_list})
+            self.project_data.update_project(self.project_id, {"materials": materials_list, "material_ledger": ledger},
+                                             interaction.user.display_name)
             
             await interaction.response.send_message(
                 f"✅ Materials updated for **{project['name']}**!",
@@ -216,7 +1599,7 @@ class UpdateProgressModal(Modal, title="Update Project Progress"):
                 })
                 updates["notes"] = project["notes"]
             
-            self.project_data.update_project(self.project_id, updates)
+            self.project_data.update_project(self.project_id, updates, interaction.user.display_name)
             
             await interaction.response.send_message(
                 f"✅ Progress updated for **{project['name']}**! ({progress_val}% - {self.status})",
@@ -246,7 +1629,8 @@ class CollaboratorModal(Modal, title="Add Collaborator"):
                 if "collaborators" not in project:
                     project["collaborators"] = []
                 project["collaborators"].append(username)
-                self.project_data.update_project(self.project_id, {"collaborators": project["collaborators"]})
+                self.project_data.update_project(self.project_id, {"collaborators": project["collaborators"]},
+                                                 interaction.user.display_name)
                 
                 await interaction.response.send_message(
                     f"✅ Added **{username}** as collaborator on **{project['name']}**!",
@@ -290,42 +1674,108 @@ class ProjectDetailView(View):
                 await interaction.response.send_message("❌ Only the project creator can delete this project!", ephemeral=True)
                 return
             
-            self.project_data.delete_project(self.project_id)
+            self.project_data.delete_project(self.project_id, interaction.user.display_name)
             await interaction.response.send_message(f"🗑️ Project **{project['name']}** has been deleted!", ephemeral=True)
         else:
             await interaction.response.send_message("❌ Project not found!", ephemeral=True)
 
+PROJECTS_PER_PAGE = 9  # Cards + section headers/padding must stay under Discord's 25 embed fields
+
 class ProjectBoardView(View):
-    def __init__(self, project_data: ProjectData):
+    def __init__(self, project_data: ProjectData, page: int = 0):
         super().__init__(timeout=None)
         self.project_data = project_data
+        self.page = page
+        self.page_ids = []
+        self.total_projects = 0
         self.update_project_buttons()
+
+    @property
+    def page_count(self) -> int:
+        return max(1, -(-self.total_projects // PROJECTS_PER_PAGE))
+
+    def load_page(self):
+        order = self.project_data.board_order()
+        self.total_projects = len(order)
+        self.page = min(max(self.page, 0), self.page_count - 1)
+        start = self.page * PROJECTS_PER_PAGE
+        self.page_ids = order[start:start + PROJECTS_PER_PAGE]
     
     def update_project_buttons(self):
-        # Clear existing buttons except create new
+        self.load_page()
         self.clear_items()
         
-        # Add create new button
+        # Row 0: create, refresh and page controls
         create_button = Button(
             label="➕ Create New Project",
             style=discord.ButtonStyle.success,
-            custom_id="create_project"
+            custom_id="create_project",
+            row=0
         )
         create_button.callback = self.create_project
         self.add_item(create_button)
         
-        # Add refresh button
         refresh_button = Button(
             label="🔄 Refresh Board",
             style=discord.ButtonStyle.secondary,
-            custom_id="refresh_board"
+            custom_id="refresh_board",
+            row=0
         )
         refresh_button.callback = self.refresh_board
         self.add_item(refresh_button)
+
+        prev_button = Button(
+            label="◀ Prev",
+            style=discord.ButtonStyle.secondary,
+            custom_id="board_prev",
+            disabled=self.page == 0,
+            row=0
+        )
+        prev_button.callback = lambda i: self.go_to_page(i, self.page - 1)
+        self.add_item(prev_button)
+
+        self.add_item(Button(
+            label=f"Page {self.page + 1}/{self.page_count}",
+            style=discord.ButtonStyle.secondary,
+            custom_id="board_page_indicator",
+            disabled=True,
+            row=0
+        ))
+
+        next_button = Button(
+            label="Next ▶",
+            style=discord.ButtonStyle.secondary,
+            custom_id="board_next",
+            disabled=self.page >= self.page_count - 1,
+            row=0
+        )
+        next_button.callback = lambda i: self.go_to_page(i, self.page + 1)
+        self.add_item(next_button)
+
+        # Row 1: jump straight to a page (select menus hold 25 options, so
+        # show a window around the current page on very large boards)
+        if self.page_count > 1:
+            first = min(max(self.page - 12, 0), max(self.page_count - 25, 0))
+            jump = Select(
+                placeholder="Jump to page...",
+                custom_id="board_jump",
+                options=[
+                    discord.SelectOption(label=f"Page {n + 1}", value=str(n), default=n == self.page)
+                    for n in range(first, min(first + 25, self.page_count))
+                ],
+                row=1
+            )
+
+            async def jump_callback(interaction: discord.Interaction):
+                await self.go_to_page(interaction, int(jump.values[0]))
+
+            jump.callback = jump_callback
+            self.add_item(jump)
         
-        # Add project buttons (limit to 23 to leave room for create/refresh)
-        projects = list(self.project_data.get_all_projects().items())[:21]
-        for project_id, project in projects:
+        # Rows 2-3: one button per project on this page
+        projects = self.project_data.get_all_projects()
+        for position, project_id in enumerate(self.page_ids):
+            project = projects[project_id]
             # Status emoji
             status_emoji = {
                 "Planning": "📋",
@@ -337,7 +1787,8 @@ class ProjectBoardView(View):
             button = Button(
                 label=f"{status_emoji} {project['name'][:30]}",
                 style=discord.ButtonStyle.primary,
-                custom_id=f"project_{project_id}"
+                custom_id=f"project_{project_id}",
+                row=2 + position // 5
             )
             button.callback = lambda i, pid=project_id: self.view_project(i, pid)
             self.add_item(button)
@@ -350,6 +1801,10 @@ class ProjectBoardView(View):
         self.update_project_buttons()
         embed = self.create_board_embed()
         await interaction.response.edit_message(embed=embed, view=self)
+
+    async def go_to_page(self, interaction: discord.Interaction, page: int):
+        self.page = page
+        await self.refresh_board(interaction)
     
     async def view_project(self, interaction: discord.Interaction, project_id: str):
         project = self.project_data.get_project(project_id)
@@ -361,6 +1816,33 @@ class ProjectBoardView(View):
         view = ProjectDetailView(self.project_data, project_id)
         await interaction.response.send_message(embed=embed, view=view, ephemeral=True)
     
+    def create_board_field(self, project: Dict) -> tuple:
+        """(name, value) for one project's card on the board"""
+        name = project.get("name", "Unnamed")
+        creator = project.get("creator", "Unknown")
+        progress = int(project.get("progress", 0))
+        status = project.get("status", "Planning")
+
+        emoji = {
+            "Planning": "📝",
+            "In Progress": "🚧",
+            "Completed": "✅",
+            "On Hold": "⏸️"
+        }.get(status, "📋")
+
+        # Progress bar
+        filled = "█" * (progress // 10)
+        empty = "░" * (10 - (progress // 10))
+        bar = f"`[{filled}{empty}]` {progress}%"
+
+        value = (
+            f"👤 **{creator}**\n"
+            f"📊 **{status}**\n"
+            f"{bar}"
+        )
+
+        return (f"{emoji} {name}", value)
+
     def create_board_embed(self) -> discord.Embed:
         projects = self.project_data.get_all_projects()
 
@@ -378,46 +1860,12 @@ class ProjectBoardView(View):
             )
             return embed
 
-        # Sort into progress tiers
-        green = []
-        orange = []
-        red = []
-        completed = []
-
-        for pid, project in projects.items():
-            name = project.get("name", "Unnamed")
-            creator = project.get("creator", "Unknown")
-            progress = int(project.get("progress", 0))
-            status = project.get("status", "Planning")
-
-            emoji = {
-                "Planning": "📝",
-                "In Progress": "🚧",
-                "Completed": "✅",
-                "On Hold": "⏸️"
-            }.get(status, "📋")
-
-            # Progress bar
-            filled = "█" * (progress // 10)
-            empty = "░" * (10 - (progress // 10))
-            bar = f"`[{filled}{empty}]` {progress}%"
-
-            value = (
-                f"👤 **{creator}**\n"
-                f"📊 **{status}**\n"
-                f"{bar}"
-            )
-
-            field = (f"{emoji} {name}", value)
-
-            if progress == 100:
-                completed.append(field)
-            elif progress >= 75:
-                red.append(field)
-            elif progress >= 50:
-                orange.append(field)
-            else:
-                green.append(field)
+        # Only this page's cards are built, and those are reused until their project changes
+        tiers = {tier: [] for tier in PROGRESS_TIERS}
+        for pid in self.page_ids:
+            field = self.project_data.cached(pid, "board_card", self.create_board_field)
+            tiers[progress_tier(projects[pid].get("progress", 0))].append(field)
+        green, orange, red, completed = tiers["low"], tiers["medium"], tiers["high"], tiers["completed"]
 
         def add_project_rows(projects_list: List[tuple], label: str):
             if projects_list:
@@ -447,7 +1895,7 @@ class ProjectBoardView(View):
             for name, val in completed:
                 embed.add_field(name=name, value=val, inline=False)
 
-        embed.set_footer(text=f"Total Projects: {len(projects)} • Use buttons below to manage.")
+        embed.set_footer(text=f"Page {self.page + 1}/{self.page_count} • Total Projects: {len(projects)} • Use buttons below to manage.")
         return embed
     
     def create_project_detail_embed(self, project: Dict) -> discord.Embed:
@@ -484,8 +1932,19 @@ class ProjectBoardView(View):
             )
         
         # Materials
+        ledger = material_ledger(project)
         materials = project.get('materials', [])
-        if materials:
+        if ledger:
+            lines = [
+                f"{'✅' if entry['gathered'] >= entry['needed'] else '•'} {entry['name']}: "
+                f"{entry['gathered']:,}/{entry['needed']:,}"
+                for entry in ledger.values()
+            ]
+            materials_text = "\n".join(lines[:10])
+            if len(lines) > 10:
+                materials_text += f"\n... and {len(lines) - 10} more (`!materials {project['id']}`)"
+            embed.add_field(name="🧱 Materials (gathered/needed)", value=materials_text, inline=False)
+        elif materials:
             materials_text = "\n".join(f"• {material}" for material in materials[:10])
             if len(materials) > 10:
                 materials_text += f"\n... and {len(materials) - 10} more"
@@ -511,32 +1970,467 @@ class ProjectBoard(commands.Cog):
     def __init__(self, bot):
         self.bot = bot
         self.project_data = ProjectData()
+
+        # One pinned, auto-updating board message per channel
+        self.boards = self.load_board_messages()
+        self.board_views = {}
+        self.boards_dirty = False
+        self.board_edit_task = None
+        self.last_board_edit = 0.0
+        self.boards_synced = False
+        self.project_data.add_listener(self.on_project_change)
+        self.search_index = ProjectSearchIndex(self.project_data)
+        self.material_totals = MaterialTotals(self.project_data)
+        self.spatial_index = ProjectSpatialIndex(self.project_data)
+
+    async def cog_load(self):
+        # Re-attach the board views so their buttons keep working after a restart
+        for channel_id, message_id in self.boards.items():
+            view = ProjectBoardView(self.project_data)
+            self.board_views[channel_id] = view
+            self.bot.add_view(view, message_id=message_id)
+
+    @commands.Cog.listener()
+    async def on_ready(self):
+        # A board may have been left on another page before the restart, while
+        # its re-attached view starts on page 0; redraw so the buttons match
+        if self.boards and not self.boards_synced:
+            self.boards_synced = True
+            self.boards_dirty = True
+            if self.board_edit_task is None or self.board_edit_task.done():
+                self.board_edit_task = asyncio.create_task(self.flush_board_edits())
+
+    async def cog_unload(self):
+        if self.board_edit_task:
+            self.board_edit_task.cancel()
+        await self.project_data.storage.close()
+        await self.project_data.events.close()
+
+    def load_board_messages(self) -> Dict[str, int]:
+        try:
+            with open(BOARD_MESSAGES_FILE, 'r') as f:
+                return json.load(f)
+        except FileNotFoundError:
+            return {}
+
+    def save_board_messages(self):
+        with open(BOARD_MESSAGES_FILE, 'w') as f:
+            json.dump(self.boards, f, indent=2)
+
+    def forget_board(self, channel_id: str):
+        self.boards.pop(channel_id, None)
+        view = self.board_views.pop(channel_id, None)
+        if view:
+            view.stop()
+        self.save_board_messages()
+
+    def on_project_change(self, event: str, project_id: str):
+        if not self.boards:
+            return
+        self.boards_dirty = True
+        try:
+            asyncio.get_running_loop()
+        except RuntimeError:
+            return  # Changed outside the bot (e.g. a script); nothing to edit
+        if self.board_edit_task is None or self.board_edit_task.done():
+            self.board_edit_task = asyncio.create_task(self.flush_board_edits())
+
+    async def flush_board_edits(self):
+        """Apply pending changes to every board, coalescing bursts into one edit each"""
+        while self.boards_dirty:
+            delay = max(BOARD_EDIT_DEBOUNCE, self.last_board_edit + BOARD_EDIT_MIN_INTERVAL - time.monotonic())
+            await asyncio.sleep(delay)
+            # Changes that land while we're editing set this again and trigger another round
+            self.boards_dirty = False
+            self.last_board_edit = time.monotonic()
+
+            for channel_id, message_id in list(self.boards.items()):
+                view = self.board_views.get(channel_id)
+                channel = self.bot.get_channel(int(channel_id))
+                if view is None or channel is None:
+                    continue
+                view.update_project_buttons()
+                try:
+                    await channel.get_partial_message(message_id).edit(embed=view.create_board_embed(), view=view)
+                except discord.NotFound:
+                    self.forget_board(channel_id)
+                except discord.HTTPException as e:
+                    print(f"❌ Failed to update project board in {channel_id}: {e}")
     
     @commands.command(name="projects")
     async def show_project_board(self, ctx):
         """Display the interactive project board"""
+        channel_id = str(ctx.channel.id)
+        view = self.board_views.get(channel_id)
+
+        # Reuse this channel's pinned board instead of posting another copy
+        if channel_id in self.boards and view is not None:
+            try:
+                message = await ctx.channel.fetch_message(self.boards[channel_id])
+                view.update_project_buttons()
+                await message.edit(embed=view.create_board_embed(), view=view)
+                await ctx.send(f"📌 This channel's project board is pinned here: {message.jump_url}")
+                return
+            except discord.NotFound:
+                self.forget_board(channel_id)
+
         view = ProjectBoardView(self.project_data)
         embed = view.create_board_embed()
-        await ctx.send(embed=embed, view=view)
+        message = await ctx.send(embed=embed, view=view)
+        try:
+            await message.pin()
+        except discord.HTTPException:
+            pass  # Missing Manage Messages permission; the board still live-updates
+
+        self.boards[channel_id] = message.id
+        self.board_views[channel_id] = view
+        self.save_board_messages()
     
     @commands.command(name="myprojects")
     async def my_projects(self, ctx):
         """Show projects created by the user"""
-        user_projects = {
-            pid: project for pid, project in self.project_data.get_all_projects().items()
-            if project.get('creator_id') == ctx.author.id
-        }
+        user_projects = self.project_data.find("creator_id", ctx.author.id)
         
         if not user_projects:
             await ctx.send("🔍 You haven't created any projects yet! Use `!projects` to create one.")
             return
         
+        embed = self.create_project_list_embed(f"📋 {ctx.author.display_name}'s Projects", user_projects)
+        await ctx.send(embed=embed)
+
+    @commands.command(name="projectsearch")
+    async def search_projects(self, ctx, *, query: str):
+        """Search project names, descriptions, coordinates, materials and notes. Usage: !projectsearch castle"""
+        results = self.search_index.search(query)
+        # Embed titles are capped at 256 characters
+        shown = query if len(query) <= 200 else query[:200] + "…"
+        if not results:
+            await ctx.send(f"🔍 No projects match **{shown}**.")
+            return
+
         embed = discord.Embed(
-            title=f"📋 {ctx.author.display_name}'s Projects",
+            title=f"🔍 Search: {shown}",
+            color=discord.Color.blue()
+        )
+        for project_id, score in results:
+            project = self.project_data.get_project(project_id)
+            snippet = self.search_index.snippet(project_id, query)
+            embed.add_field(
+                name=f"{project['name']} ({project_id})",
+                value=f"{project.get('status', 'Planning')} • {project.get('progress', 0)}%"
+                      + (f"\n> {snippet}" if snippet else ""),
+                inline=False
+            )
+        await ctx.send(embed=embed)
+
+    @commands.command(name="materials")
+    async def materials(self, ctx, project_id: Optional[str] = None):
+        """Server-wide list of materials still needed, or one project's ledger. Usage: !materials [project_id]"""
+        if project_id:
+            project = self.project_data.get_project(project_id)
+            if not project:
+                await ctx.send("❌ Project not found!")
+                return
+            ledger = material_ledger(project)
+            if not ledger:
+                await ctx.send(f"🧱 **{project['name']}** has no materials listed.")
+                return
+            lines = [
+                f"{'✅' if entry['gathered'] >= entry['needed'] else '•'} **{entry['name']}** "
+                f"`{item_id}`: {entry['gathered']:,}/{entry['needed']:,}"
+                for item_id, entry in ledger.items()
+            ]
+            title = f"🧱 Materials: {project['name']}"
+            footer = f"Record gathered items with !gathered {project_id} <amount> <item>"
+        else:
+            shopping = self.material_totals.shopping_list()
+            if not shopping:
+                await ctx.send("✅ No active project is waiting on materials.")
+                return
+            lines = [
+                f"• **{name}**: {format_item_amount(amount)}"
+                + (f" — {count} projects" if count > 1 else "")
+                for item_id, name, amount, count in shopping
+            ]
+            title = "🧱 Materials Still Needed"
+            footer = f"{len(shopping)} items across {len(self.material_totals.contributions)} active projects"
+
+        description = ""
+        for shown, line in enumerate(lines):
+            if len(description) + len(line) > 3900:
+                description += f"... and {len(lines) - shown} more"
+                break
+            description += line + "\n"
+
+        embed = discord.Embed(title=title, description=description, color=discord.Color.dark_gold())
+        embed.set_footer(text=footer)
+        await ctx.send(embed=embed)
+
+    @commands.command(name="gathered")
+    async def gathered(self, ctx, project_id: str, amount: int, *, item: str):
+        """Record gathered materials for a project. Usage: !gathered proj_001 640 Stone"""
+        project = self.project_data.get_project(project_id)
+        if not project:
+            await ctx.send("❌ Project not found!")
+            return
+
+        ledger = {item_id: dict(entry) for item_id, entry in material_ledger(project).items()}
+        item_id = normalize_item_id(item)
+        if item_id not in ledger:
+            await ctx.send(f"❌ **{item}** isn't on the materials list for **{project['name']}**.")
+            return
+
+        entry = ledger[item_id]
+        entry["gathered"] = max(entry["gathered"] + amount, 0)
+        self.project_data.update_project(project_id, {"material_ledger": ledger}, ctx.author.display_name)
+
+        remaining = max(entry["needed"] - entry["gathered"], 0)
+        await ctx.send(
+            f"✅ {entry['name']}: {entry['gathered']:,}/{entry['needed']:,} gathered for **{project['name']}**"
+            + (f" ({format_item_amount(remaining)} to go)" if remaining else " — done!")
+        )
+
+    @commands.command(name="nearby")
+    async def nearby(self, ctx, x: float, z: float, radius: float = NEARBY_DEFAULT_RADIUS, world: str = "overworld"):
+        """Projects within a radius of a point. Usage: !nearby <x> <z> [radius] [world]"""
+        await self.send_nearby(ctx, normalize_world(world), x, z, radius, f"{x:.0f}, {z:.0f}")
+
+    @commands.command(name="nearme")
+    async def near_me(self, ctx, player: Optional[str] = None, radius: float = NEARBY_DEFAULT_RADIUS):
+        """Projects near a player in game. Usage: !nearme [player] [radius]"""
+        rcon = getattr(self.bot, "rcon", None)
+        if rcon is None:
+            await ctx.send("❌ Player positions need the server's RCON connection.")
+            return
+
+        player = player or ctx.author.display_name
+        try:
+            position, dimension = await asyncio.gather(
+                rcon.command(f"data get entity {player} Pos"),
+                rcon.command(f"data get entity {player} Dimension"),
+            )
+        except Exception as e:
+            await ctx.send(f"❌ Could not reach the server: {e}")
+            return
+
+        match = ENTITY_POS_RE.search(position)
+        if not match:
+            await ctx.send(f"❌ **{player}** doesn't seem to be online.")
+            return
+        x, _, z = (float(value) for value in match.groups())
+        world = normalize_world(dimension)
+        await self.send_nearby(ctx, world, x, z, radius, f"{player} ({x:.0f}, {z:.0f})")
+
+    async def send_nearby(self, ctx, world: str, x: float, z: float, radius: float, origin: str):
+        hits = self.spatial_index.within(world, x, z, radius)
+        title = f"📍 Projects within {radius:.0f} blocks of {origin}"
+        if not hits:
+            hits = self.spatial_index.nearest(world, x, z)
+            if not hits:
+                await ctx.send(f"🔍 No projects with coordinates in the {world.replace('_', ' ')}.")
+                return
+            title = f"📍 Nothing within {radius:.0f} blocks of {origin} — closest projects"
+
+        embed = discord.Embed(title=title, color=discord.Color.blue())
+        for project_id, distance in hits[:25]:
+            project = self.project_data.get_project(project_id)
+            embed.add_field(
+                name=f"{project['name']} ({project_id})",
+                value=f"{distance:,.0f} blocks • {project.get('coordinates', '')}\n"
+                      f"{project.get('status', 'Planning')} • {project.get('progress', 0)}%",
+                inline=False
+            )
+        if len(hits) > 25:
+            embed.set_footer(text=f"Showing 25 of {len(hits)} projects")
+        await ctx.send(embed=embed)
+
+    @commands.command(name="projectstats")
+    async def project_stats(self, ctx, project_id: Optional[str] = None):
+        """Progress analytics for one project, or the whole board. Usage: !projectstats [project_id]"""
+        events = self.project_data.events
+        if project_id:
+            project = self.project_data.get_project(project_id)
+            stats = events.stats.get(project_id)
+            if not project or stats is None:
+                await ctx.send("❌ Project not found!")
+                return
+            await ctx.send(embed=self.create_project_stats_embed(project, stats))
+            return
+
+        embed = discord.Embed(title="📈 Project Board Stats", color=discord.Color.purple())
+        active = {pid: stats for pid, stats in events.stats.items()
+                  if stats.status not in INACTIVE_STATUSES and pid in self.project_data.projects}
+        completed = len(self.project_data.find("status", "completed"))
+        embed.add_field(name="Projects", value=f"{len(active)} active • {completed} completed", inline=True)
+        embed.add_field(name="Changes Recorded", value=f"{events.total_events:,}", inline=True)
+
+        if events.builders:
+            builders = "\n".join(f"**{name}** — {count} changes" for name, count in events.builders.most_common(5))
+            embed.add_field(name="🏆 Most Active Builders", value=builders, inline=False)
+
+        rates = sorted(
+            ((stats.percent_per_day(), pid) for pid, stats in active.items() if stats.percent_per_day()),
+            reverse=True
+        )
+        if rates:
+            fastest = "\n".join(f"**{self.project_data.projects[pid]['name']}** — {rate:.1f}%/day"
+                                 for rate, pid in rates[:5])
+            embed.add_field(name="⚡ Fastest Moving", value=fastest, inline=False)
+
+        behind = []
+        for pid, stats in active.items():
+            planned = self.planned_finish(self.project_data.projects[pid], stats)
+            eta = stats.eta()
+            if planned and eta and eta > planned:
+                behind.append(f"**{self.project_data.projects[pid]['name']}** — ETA {eta:%Y-%m-%d}, planned {planned:%Y-%m-%d}")
+        if behind:
+            embed.add_field(name="⏰ Behind Schedule", value="\n".join(behind[:10]), inline=False)
+
+        embed.set_footer(text="Use !projectstats <project_id> for one project's burn-up")
+        await ctx.send(embed=embed)
+
+    @staticmethod
+    def planned_finish(project: Dict, stats: ProjectStats) -> Optional[datetime]:
+        estimate = parse_estimate(project.get("estimated_time", ""))
+        if estimate is None:
+            return None
+        started = project.get("started_at")
+        return (datetime.fromisoformat(started) if started else stats.created_at) + estimate
+
+    def create_project_stats_embed(self, project: Dict, stats: ProjectStats) -> discord.Embed:
+        embed = discord.Embed(title=f"📈 {project['name']}", color=discord.Color.purple())
+        embed.add_field(
+            name="Burn-up",
+            value=f"`{stats.sparkline()}` {stats.progress}%\n"
+                  f"since {stats.created_at:%Y-%m-%d}, {len(stats.burnup) - 1} progress updates",
+            inline=False
+        )
+
+        rate = stats.percent_per_day()
+        embed.add_field(name="Average Pace", value=f"{rate:.1f}% per day" if rate else "Not enough history", inline=True)
+
+        eta = stats.eta()
+        planned = self.planned_finish(project, stats)
+        if stats.progress >= 100:
+            eta_text = f"Finished {eta:%Y-%m-%d}"
+        elif eta:
+            eta_text = f"{eta:%Y-%m-%d}"
+        else:
+            eta_text = "Unknown"
+        if eta and planned:
+            slip = (eta - planned).days
+            if slip > 0:
+                eta_text += f"\n{slip} days behind the {project.get('estimated_time')} estimate"
+            else:
+                eta_text += f"\n{-slip} days ahead of the {project.get('estimated_time')} estimate"
+        embed.add_field(name="ETA", value=eta_text, inline=True)
+
+        if stats.builders:
+            builders = "\n".join(f"**{name}** — {count}" for name, count in stats.builders.most_common(5))
+            embed.add_field(name="👷 Builders", value=builders, inline=False)
+
+        embed.set_footer(text=f"{stats.event_count} changes • last activity {stats.last_activity:%Y-%m-%d %H:%M}")
+        return embed
+
+    @commands.command(name="projectexport")
+    async def export_projects(self, ctx, fmt: str = "ndjson"):
+        """Download every project as NDJSON or CSV. Usage: !projectexport [ndjson|csv]"""
+        fmt = fmt.lower()
+        if fmt not in EXPORT_FORMATS:
+            await ctx.send(f"❌ Format must be one of: {', '.join(EXPORT_FORMATS)}")
+            return
+
+        # Records are written straight into the file, which moves to disk once it gets big
+        spool = tempfile.SpooledTemporaryFile(max_size=EXPORT_SPOOL_BYTES)
+        text = io.TextIOWrapper(spool, encoding="utf-8", newline="")
+        # Serialized in a worker thread; write_projects copes with projects
+        # being added or removed while it runs
+        count = await asyncio.to_thread(write_projects, self.project_data.get_all_projects(), text, fmt)
+        text.flush()
+        text.detach()
+        spool.seek(0)
+
+        filename = f"projects_{datetime.now():%Y%m%d_%H%M}.{fmt}"
+        try:
+            await ctx.send(f"📦 Exported {count} projects.", file=discord.File(spool, filename=filename))
+        finally:
+            spool.close()
+
+    @commands.command(name="projectimport")
+    @commands.has_permissions(administrator=True)
+    async def import_projects_command(self, ctx):
+        """Upsert projects from an attached .ndjson or .csv export. Usage: !projectimport (with attachment)"""
+        if not ctx.message.attachments:
+            await ctx.send("❌ Attach an .ndjson or .csv file made by `!projectexport`.")
+            return
+
+        attachment = ctx.message.attachments[0]
+        progress = await ctx.send(f"📥 Importing **{attachment.filename}**...")
+        imported = 0
+        errors = []
+        spool = tempfile.SpooledTemporaryFile(max_size=EXPORT_SPOOL_BYTES)
+        try:
+            try:
+                await self.download_attachment(attachment, spool)
+            except aiohttp.ClientError as e:
+                await progress.edit(content=f"❌ Couldn't download **{attachment.filename}**: {e}")
+                return
+            spool.seek(0)
+            text = io.TextIOWrapper(spool, encoding="utf-8", newline="")
+            batches = project_batches(read_project_records(text, export_format(attachment.filename)))
+            reported = time.monotonic()
+            while True:
+                # Reading and validating happen in a worker thread; only the
+                # upsert itself runs here, one batch at a time
+                item = await asyncio.to_thread(next, batches, None)
+                if item is None:
+                    break
+                batch, batch_errors = item
+                if batch:
+                    self.project_data.upsert_projects(batch, ctx.author.display_name)
+                imported += len(batch)
+                errors.extend(batch_errors)
+                if time.monotonic() - reported >= IMPORT_PROGRESS_SECONDS:
+                    reported = time.monotonic()
+                    await progress.edit(content=f"📥 Importing **{attachment.filename}**... {imported} projects so far")
+        finally:
+            spool.close()
+
+        message = f"📥 Imported {imported} projects from **{attachment.filename}**."
+        if errors:
+            message += f"\n⚠️ Skipped {len(errors)} records:\n" + "\n".join(f"• {error}" for error in errors[:10])
+            if len(errors) > 10:
+                message += f"\n... and {len(errors) - 10} more"
+        await progress.edit(content=message)
+
+    @staticmethod
+    async def download_attachment(attachment: discord.Attachment, f):
+        """Copy an attachment into f a chunk at a time rather than all in memory"""
+        async with aiohttp.ClientSession() as session:
+            async with session.get(attachment.url) as response:
+                response.raise_for_status()
+                async for chunk in response.content.iter_chunked(IMPORT_CHUNK_BYTES):
+                    f.write(chunk)
+
+    @commands.command(name="projectstatus")
+    async def projects_by_status(self, ctx, *, status: str):
+        """List projects with a given status. Usage: !projectstatus In Progress"""
+        projects = self.project_data.find("status", status)
+        if not projects:
+            await ctx.send(f"🔍 No projects with status **{status}**.")
+            return
+
+        embed = self.create_project_list_embed(f"📋 Projects: {status.title()}", projects)
+        await ctx.send(embed=embed)
+
+    def create_project_list_embed(self, title: str, projects: Dict) -> discord.Embed:
+        embed = discord.Embed(
+            title=title,
             color=discord.Color.blue()
         )
         
-        for project_id, project in user_projects.items():
+        # Embeds hold at most 25 fields
+        for project_id, project in list(projects.items())[:25]:
             status_emoji = {
                 "Planning": "📋",
                 "In Progress": "⚡",
@@ -549,8 +2443,58 @@ class ProjectBoard(commands.Cog):
                 value=f"Status: {project.get('status', 'Planning')}\nProgress: {project.get('progress', 0)}%",
                 inline=True
             )
-        
-        await ctx.send(embed=embed)
+
+        if len(projects) > 25:
+            embed.set_footer(text=f"Showing 25 of {len(projects)} projects")
+        return embed
 
 async def setup(bot):
-    await bot.add_cog(ProjectBoard(bot))
\ No newline at end of file
+    await bot.add_cog(ProjectBoard(bot))
+
+def main(argv=None):
+    parser = argparse.ArgumentParser(description="Import or export the project board")
+    parser.add_argument("--backend", default=PROJECT_STORAGE_BACKEND, choices=("sqlite", "journal", "json"))
+    parser.add_argument("--projects-file", default="projects.json")
+    commands_parser = parser.add_subparsers(dest="action", required=True)
+
+    export_parser = commands_parser.add_parser("export", help="write every project to a file or stdout")
+    export_parser.add_argument("output", nargs="?", default="-")
+    export_parser.add_argument("--format", choices=EXPORT_FORMATS)
+
+    import_parser = commands_parser.add_parser("import", help="upsert projects from a file or stdin")
+    import_parser.add_argument("input", nargs="?", default="-")
+    import_parser.add_argument("--format", choices=EXPORT_FORMATS)
+    import_parser.add_argument("--batch-size", type=int, default=IMPORT_BATCH_SIZE)
+    args = parser.parse_args(argv)
+
+    storage = make_project_storage(args.projects_file, args.backend)
+    project_data = ProjectData(args.projects_file, storage)
+    try:
+        if args.action == "export":
+            fmt = args.format or export_format(args.output)
+            if args.output == "-":
+                count = write_projects(project_data.get_all_projects(), sys.stdout, fmt)
+            else:
+                with open(args.output, "w", encoding="utf-8", newline="") as f:
+                    count = write_projects(project_data.get_all_projects(), f, fmt)
+            print(f"Exported {count} projects", file=sys.stderr)
+        else:
+            fmt = args.format or export_format(args.input)
+            f = sys.stdin if args.input == "-" else open(args.input, "r", encoding="utf-8", newline="")
+            try:
+                # No event loop here, so let the journal backend write once at the end
+                with storage.bulk():
+                    imported, errors = import_projects(project_data, read_project_records(f, fmt),
+                                                       batch_size=args.batch_size)
+            finally:
+                if f is not sys.stdin:
+                    f.close()
+            for error in errors:
+                print(f"skipped {error}", file=sys.stderr)
+            print(f"Imported {imported} projects", file=sys.stderr)
+    finally:
+        asyncio.run(storage.close())
+        asyncio.run(project_data.events.close())
+
+if __name__ == "__main__":
+    main()
\ No newline at end of file
@@ -0,0 +1,64 @@
+import io
+
+import pytest
+
+import project_board
+
+
+def make_data(tmp_path, name):
+    directory = tmp_path / name
+    directory.mkdir()
+    return project_board.ProjectData(
+        str(directory / "projects.json"),
+        project_board.JsonProjectStorage(str(directory / "projects.json")),
+        project_board.ProjectEventLog(str(directory / "events.jsonl")),
+    )
+
+
+PROJECTS = {
+    "proj_001": {
+        "name": "Castle, \"north\" wing", "description": "Line one\nline two", "coordinates": "100 64 -200",
+        "creator": "alex", "creator_id": 42, "status": "In Progress", "progress": 60,
+        "created_at": "2024-01-01T10:00:00", "collaborators": ["sam"], "materials": ["Stone: 1000"],
+        "notes": [{"timestamp": "2024-01-02T10:00:00", "user": "sam", "note": "walls up"}],
+        "material_ledger": {"stone": {"name": "Stone", "needed": 1000, "gathered": 250}},
+    },
+    "proj_002": {
+        "name": "Farm", "status": "Planning", "progress": 0, "created_at": "2024-02-01T10:00:00",
+        "collaborators": [], "materials": [], "notes": [],
+    },
+}
+
+
+@pytest.mark.parametrize("fmt", project_board.EXPORT_FORMATS)
+def test_export_import_round_trip(tmp_path, fmt):
+    source = make_data(tmp_path, "source")
+    for project_id, project in PROJECTS.items():
+        source.create_project(project_id, dict(project))
+
+    f = io.StringIO(newline="")
+    assert project_board.write_projects(source.get_all_projects(), f, fmt) == 2
+    f.seek(0)
+
+    target = make_data(tmp_path, "target")
+    imported, errors = project_board.import_projects(target, project_board.read_project_records(f, fmt), batch_size=1)
+    assert (imported, errors) == (2, [])
+    for project_id, project in PROJECTS.items():
+        restored = target.get_project(project_id)
+        for key, value in project.items():
+            assert restored[key] == value, key
+    assert target.next_project_id() == "proj_003"
+
+
+def test_import_reports_bad_records(tmp_path):
+    lines = io.StringIO(
+        '{"id": "proj_001", "name": "Castle"}\n'
+        'not json\n'
+        '{"id": "proj_002"}\n'
+        '{"id": "proj_003", "name": "Tower", "progress": 150}\n'
+    )
+    data = make_data(tmp_path, "data")
+    imported, errors = project_board.import_projects(data, project_board.read_project_records(lines, "ndjson"))
+    assert imported == 1
+    assert [error.split(":")[0] for error in errors] == ["line 2", "line 3", "line 4"]
+    assert list(data.get_all_projects()) == ["proj_001"]
@@ -0,0 +1,124 @@
+import json
+
+import project_board
+
+
+def make_data(tmp_path, storage):
+    return project_board.ProjectData(
+        str(tmp_path / "projects.json"),
+        storage,
+        project_board.ProjectEventLog(str(tmp_path / "events.jsonl")),
+    )
+
+
+def journaled(tmp_path, **kwargs):
+    return project_board.JournaledJsonProjectStorage(str(tmp_path / "projects.json"), **kwargs)
+
+
+def test_journal_replays_over_snapshot(tmp_path):
+    data = make_data(tmp_path, journaled(tmp_path))
+    data.create_project("proj_001", {"name": "Castle", "progress": 0})
+    data.create_project("proj_002", {"name": "Farm", "progress": 0})
+    data.update_project("proj_001", {"progress": 40})
+    data.delete_project("proj_002")
+
+    # Nothing compacted yet: the snapshot is missing and the journal holds every change
+    assert not (tmp_path / "projects.json").exists()
+    assert len((tmp_path / "projects.json.journal").read_text().splitlines()) >= 4
+
+    projects = journaled(tmp_path).load_all()
+    assert list(projects) == ["proj_001"]
+    assert projects["proj_001"]["progress"] == 40
+
+
+def test_journal_ignores_torn_final_line(tmp_path):
+    data = make_data(tmp_path, journaled(tmp_path))
+    data.create_project("proj_001", {"name": "Castle"})
+    with open(tmp_path / "projects.json.journal", "a") as f:
+        f.write('{"op": "create", "id": "proj_0')
+
+    assert list(journaled(tmp_path).load_all()) == ["proj_001"]
+
+
+def test_journal_compacts_into_snapshot(tmp_path):
+    data = make_data(tmp_path, journaled(tmp_path, compact_ops=3))
+    for i in range(1, 4):
+        data.create_project(f"proj_{i:03d}", {"name": f"P{i}"})
+
+    snapshot = json.loads((tmp_path / "projects.json").read_text())
+    assert {"proj_001", "proj_002", "proj_003"} <= set(snapshot)
+    assert (tmp_path / "projects.json.journal").read_text() == ""
+    assert len(journaled(tmp_path).load_all()) == 3
+
+
+def test_id_sequence_survives_deleting_newest(tmp_path):
+    for storage in (project_board.JsonProjectStorage, project_board.JournaledJsonProjectStorage):
+        directory = tmp_path / storage.__name__
+        directory.mkdir()
+        data = make_data(directory, storage(str(directory / "projects.json")))
+        ids = [data.next_project_id() for _ in range(3)]
+        for project_id in ids:
+            data.create_project(project_id, {"name": project_id})
+        data.delete_project(ids[-1])
+
+        restarted = make_data(directory, storage(str(directory / "projects.json")))
+        assert restarted.next_project_id() == "proj_004"
+
+
+def test_sqlite_imports_json_board(tmp_path):
+    data = make_data(tmp_path, project_board.JsonProjectStorage(str(tmp_path / "projects.json")))
+    data.create_project(data.next_project_id(), {
+        "name": "Castle", "progress": 50, "collaborators": ["alex", "sam"],
+        "materials": ["Stone: 64"], "notes": [{"timestamp": "2024-01-01T00:00:00", "user": "alex", "note": "moat"}],
+        "custom": "kept",
+    })
+
+    storage = project_board.SqliteProjectStorage(str(tmp_path / "projects.db"), import_json=str(tmp_path / "projects.json"))
+    projects = storage.load_all()
+    assert list(projects) == ["proj_001"]
+    project = projects["proj_001"]
+    assert project["collaborators"] == ["alex", "sam"]
+    assert project["notes"][0]["note"] == "moat"
+    assert project["custom"] == "kept"
+    assert storage.load_id_sequence() == 1
+
+
+def test_find_ids_sorts_numerically(tmp_path):
+    data = make_data(tmp_path, project_board.JsonProjectStorage(str(tmp_path / "projects.json")))
+    for project_id in ("proj_1000", "proj_999", "proj_002"):
+        data.create_project(project_id, {"name": project_id, "status": "Planning"})
+
+    assert data.find_ids("status", "planning") == ["proj_002", "proj_999", "proj_1000"]
+
+
+def test_sqlite_ledger_rows(tmp_path):
+    db = str(tmp_path / "projects.db")
+    storage = project_board.SqliteProjectStorage(db, import_json=None)
+    data = make_data(tmp_path, storage)
+    ledger = project_board.build_material_ledger(["Stone: 1000", "Glass: 64"])
+    data.create_project("proj_001", {"name": "Castle", "materials": ["Stone: 1000", "Glass: 64"], "material_ledger": ledger})
+
+    ledger = {item_id: dict(entry) for item_id, entry in ledger.items()}
+    ledger["stone"]["gathered"] = 250
+    data.update_project("proj_001", {"material_ledger": ledger})
+
+    rows = storage.conn.execute(
+        "SELECT item_id, needed, gathered FROM material_ledger WHERE project_id = 'proj_001' ORDER BY position").fetchall()
+    assert [tuple(row) for row in rows] == [("stone", 1000, 250), ("glass", 64, 0)]
+    assert storage.conn.execute("SELECT extra FROM projects").fetchone()[0] is None
+    assert project_board.SqliteProjectStorage(db, import_json=None).load_all()["proj_001"]["material_ledger"] == ledger
+
+
+def test_sqlite_moves_ledger_out_of_extra(tmp_path):
+    db = str(tmp_path / "projects.db")
+    storage = project_board.SqliteProjectStorage(db, import_json=None)
+    ledger = {"stone": {"name": "Stone", "needed": 10, "gathered": 3}}
+    # As written before the ledger had its own table
+    storage.conn.execute("INSERT INTO projects (id, name, extra) VALUES ('proj_001', 'Castle', ?)",
+                         (json.dumps({"material_ledger": ledger, "custom": 1}),))
+    storage.conn.execute("DELETE FROM meta WHERE key = 'ledger_table'")
+    storage.conn.commit()
+
+    project = project_board.SqliteProjectStorage(db, import_json=None).load_all()["proj_001"]
+    assert project["material_ledger"] == ledger
+    assert project["custom"] == 1
@@ -0,0 +1,40 @@
+import project_board
+
+
+def make_index(tmp_path, projects):
+    data = project_board.ProjectData(
+        str(tmp_path / "projects.json"),
+        project_board.JsonProjectStorage(str(tmp_path / "projects.json")),
+        project_board.ProjectEventLog(str(tmp_path / "events.jsonl")),
+    )
+    for project_id, project in projects.items():
+        data.create_project(project_id, project)
+    return data, project_board.ProjectSearchIndex(data)
+
+
+def test_name_match_outranks_note_match(tmp_path):
+    _, index = make_index(tmp_path, {
+        "proj_001": {"name": "Farm", "notes": [{"note": "castle view from here"}]},
+        "proj_002": {"name": "Castle"},
+        "proj_003": {"name": "Bridge"},
+    })
+    assert [project_id for project_id, _ in index.search("castle")] == ["proj_002", "proj_001"]
+    assert index.search("nothing") == []
+
+
+def test_new_notes_are_searchable_and_deletes_drop_out(tmp_path):
+    data, index = make_index(tmp_path, {
+        "proj_001": {"name": "Castle", "notes": [{"note": "moat dug"}]},
+        "proj_002": {"name": "Farm"},
+    })
+    notes = data.get_project("proj_001")["notes"] + [{"note": "drawbridge built"}]
+    data.update_project("proj_001", {"notes": notes})
+    assert [project_id for project_id, _ in index.search("drawbridge")] == ["proj_001"]
+    assert [project_id for project_id, _ in index.search("moat")] == ["proj_001"]
+
+    # Matches a freshly built index
+    rebuilt = project_board.ProjectSearchIndex(data)
+    assert index.postings == rebuilt.postings
+
+    data.delete_project("proj_001")
+    assert index.search("moat") == []
@@ -0,0 +1,33 @@
+import project_board
+
+
+def make_index(tmp_path, coordinates):
+    data = project_board.ProjectData(
+        str(tmp_path / "projects.json"),
+        project_board.JsonProjectStorage(str(tmp_path / "projects.json")),
+        project_board.ProjectEventLog(str(tmp_path / "events.jsonl")),
+    )
+    index = project_board.ProjectSpatialIndex(data)
+    for i, coords in enumerate(coordinates):
+        project_id = f"proj_{i + 1:03d}"
+        data.create_project(project_id, {"id": project_id, "name": project_id, "coordinates": coords})
+    return index
+
+
+def test_nearest_far_from_every_project(tmp_path):
+    index = make_index(tmp_path, ["10 64 20"])
+    rings = []
+    ring = index.ring
+    index.ring = lambda *args: rings.append(args) or ring(*args)
+    hits = index.nearest("overworld", 1_000_000, 0)
+    # Falls back to scanning the one occupied cell instead of walking ~4000 rings
+    assert len(rings) <= 2
+    assert [project_id for project_id, _ in hits] == ["proj_001"]
+
+
+def test_nearest_matches_brute_force(tmp_path):
+    coordinates = [f"{x} 64 {z}" for x in range(-3000, 3000, 700) for z in range(-3000, 3000, 900)]
+    index = make_index(tmp_path, coordinates)
+    hits = index.nearest("overworld", 123, -456, count=5)
+    expected = sorted(((pid, index.distance(pid, 123, -456)) for pid in index.positions), key=lambda hit: hit[1])[:5]
+    assert hits == expected